@@ -4,20 +4,49 @@ Structure: Mirrors ASP.NET MVC Pattern
 - Routes → Controllers
 - render_template → Views
 - Data processing → Models/Services
+- pandas and plotly load on first use (parsing, figures), so pages, videos and
+  health checks never import them; see warmup.py for pre-fork preloading
 """
 
-from flask import Flask, render_template, request, jsonify, send_file, send_from_directory, Response
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
+from flask import Flask, render_template, request, jsonify, send_file, Response, url_for, g, abort
 from pathlib import Path
 import os
-import re
 from werkzeug.utils import secure_filename
 from datetime import datetime
-import pytz
 import json
-import mimetypes
+import logging
+import cProfile
+import io
+import pstats
+import threading
+import time
+import multiprocessing
+from concurrent.futures import Future, InvalidStateError
+import numpy as np
+from functools import lru_cache
+
+from eda_service import (process_eda_file, window_stats, parse_video_start_time_from_filename,
+                         video_offset_for)
+from eda_index import TimeIndex
+from eda_lod import LODPyramid
+from eda_analysis import analyze, AnalysisError, EPOCH_SECONDS
+from eda_session import (Session, SessionStream, SessionVideo, SessionStore, SessionError, video_start_ns,
+                         aligned_window, resampled_window)
+from eda_live import LiveRegistry, LiveError
+from eda_export import ExportWindow, ExportError
+from dataset_cache import DatasetCache, HashingSink, PathLeases, prune_folder
+from upload_stream import stream_multipart, FileSink, UploadError
+from jobs import JobQueue, JobError, Continuation, DONE, FAILED
+from chunked_upload import ChunkedUploads, ChunkError
+from video_probe import probe_video, ProbeError
+import video_faststart
+import eda_export
+import batch
+import metrics
+import wire_format
+import static_assets
+import video_delivery
+import warmup
 
 app = Flask(__name__)
 app.config['UPLOAD_FOLDER'] = 'uploads'
@@ -25,11 +54,60 @@ app.config['VIDEO_FOLDER'] = 'static/videos'
 app.config['MAX_CONTENT_LENGTH'] = 2 * 1024 * 1024 * 1024  # 2GB max file size
 app.config['ALLOWED_EXTENSIONS'] = {'csv'}
 app.config['ALLOWED_VIDEO_EXTENSIONS'] = {'mp4', 'webm', 'ogg', 'mov', 'avi'}
+app.config['PLOT_MAX_POINTS'] = 4000  # Cap on points per plot/payload (LOD decimation)
+app.config['PLOT_MAX_SCR_MARKERS'] = 500  # Largest SCRs marked per plot/payload
+app.config['DATASET_CACHE_MAX_BYTES'] = 512 * 1024 * 1024  # In-memory parsed datasets (LRU)
+app.config['DATASET_CACHE_FOLDER'] = 'uploads'  # .edac columnar files next to the CSVs (None to disable)
+app.config['UPLOAD_FOLDER_MAX_BYTES'] = 2 * 1024 * 1024 * 1024  # Oldest uploads pruned beyond this
+app.config['JOB_WORKERS'] = 2  # Background upload-processing threads
+app.config['JOB_HISTORY'] = 100  # Finished jobs kept for status/result polling
+app.config['VIDEO_FASTSTART'] = True  # Move an uploaded MP4/MOV's moov ahead of mdat before publishing it
+app.config['SESSION_HISTORY'] = 100  # Multi-stream sessions kept in memory (LRU)
+app.config['LIVE_MAX_STREAMS'] = 16  # Live ingestion streams open at once (each holds a few MB of rings)
+app.config['LIVE_HEARTBEAT_SECONDS'] = 15  # Keep-alive comment on idle server-sent event connections
+app.config['LIVE_MAX_SUBSCRIBERS'] = 8  # Event connections across all streams; each holds a server thread (EDA_THREADS)
+app.config['LIVE_MAX_SUBSCRIBERS_PER_STREAM'] = 4  # Event connections per live stream
+app.config['LIVE_MAX_CONNECTION_SECONDS'] = 600  # An event connection is ended after this; the browser reconnects
+app.config['BATCH_ROOT'] = 'studies'  # /api/batch only reads and writes below this directory
+app.config['BATCH_WORKERS'] = None  # Worker processes per batch run (None = all cores)
+app.config['PROFILE_REQUESTS'] = False  # Opt-in: ?profile=1 runs that one request under cProfile
+app.config['PROFILE_FOLDER'] = 'profiles'  # Where profiled requests' .prof files are kept
+app.config['PROFILE_REPORT_LINES'] = 40  # Functions listed in a profile's text report
 
 # Ensure upload folder exists
 Path(app.config['UPLOAD_FOLDER']).mkdir(exist_ok=True)
 Path(app.config['VIDEO_FOLDER']).mkdir(parents=True, exist_ok=True)
 
+# Parsed datasets keyed by the SHA-256 of the uploaded CSV (content-addressed)
+dataset_cache = DatasetCache(app.config['DATASET_CACHE_MAX_BYTES'], app.config['DATASET_CACHE_FOLDER'])
+
+# CSVs of upload jobs that haven't been parsed yet; prune_folder leaves them alone
+upload_leases = PathLeases()
+
+# Upload processing runs in the background; clients poll /api/jobs/<id>
+job_queue = JobQueue(app.config['JOB_WORKERS'], app.config['JOB_HISTORY'],
+                     on_stage=lambda job, name, seconds: metrics.observe('job_stage_seconds', seconds,
+                                                                         kind=job.kind, stage=name))
+
+# Resumable chunked video uploads, assembled in place in the video folder
+chunked_uploads = ChunkedUploads(app.config['VIDEO_FOLDER'])
+
+# Multi-stream sessions: several EDA datasets and camera videos on one time axis
+session_store = SessionStore(app.config['SESSION_HISTORY'])
+
+# Live ingestion: sample batches appended during a session, pushed to browsers as server-sent events
+live_streams = LiveRegistry(app.config['LIVE_MAX_STREAMS'], app.config['LIVE_MAX_SUBSCRIBERS'],
+                            app.config['LIVE_MAX_SUBSCRIBERS_PER_STREAM'])
+
+# Published videos' stat results, validators and MIME types (range requests skip the filesystem)
+video_catalog = video_delivery.VideoCatalog(app.config['VIDEO_FOLDER'])
+
+# Diagnostics go through logging (debug level is off by default); timings and sizes go to metrics
+log = logging.getLogger(__name__)
+
+# cProfile can only drive one profiler at a time, so profiled requests take turns
+profile_lock = threading.Lock()
+
 def allowed_file(filename):
     """Check if file extension is allowed"""
     return '.' in filename and \
@@ -40,242 +118,159 @@ def allowed_video(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in app.config['ALLOWED_VIDEO_EXTENSIONS']
 
-def process_eda_file(filepath):
+def analysis_for(dataset_id, entry):
     """
-    Process EDA CSV file and extract data
-    Similar to a Service/Repository pattern in ASP.NET
+    Tonic/phasic decomposition and SCRs for a cached dataset, computed once per entry
+    None if the recording can't be analyzed (no usable sample period); callers
+    then skip the SCR stats and overlay instead of failing
     """
+    def build(e):
+        with metrics.timer('stage_seconds', stage='analyze'):
+            return analyze(e['dataset'].epoch_ns, e['dataset'].values)
     try:
-        # First, try to read with headers
-        df = pd.read_csv(filepath)
-        
-        # Check if the file has no headers (all columns are numeric)
-        if all(df.columns.astype(str).str.match(r'^\d+\.?\d*$')):
-            print("DEBUG: File has no headers, treating as headerless data")
-            # Re-read without headers
-            df = pd.read_csv(filepath, header=None)
-            
-            # If there's only one column, assume it's EDA data with metadata in first rows
-            if len(df.columns) == 1:
-                # Check if first value is a UNIX timestamp (very large number)
-                first_val = df.iloc[0, 0]
-                
-                if first_val > 1000000000:  # Likely a UNIX timestamp
-                    print(f"DEBUG: First value is UNIX timestamp: {first_val}")
-                    base_timestamp = first_val
-                    
-                    # Second value might be sampling rate (Hz)
-                    sampling_rate = df.iloc[1, 0] if len(df) > 1 else 4.0
-                    print(f"DEBUG: Sampling rate: {sampling_rate} Hz")
-                    
-                    # Skip first 2 rows (metadata)
-                    df = df.iloc[2:].reset_index(drop=True)
-                    eda_column = 0
-                    
-                    # Generate timestamps based on sampling rate
-                    # Convert Hz to seconds between samples
-                    seconds_per_sample = 1.0 / sampling_rate
-                    
-                    # Create timestamps for each sample
-                    timestamps = [base_timestamp + (i * seconds_per_sample) for i in range(len(df))]
-                    df['datetime'] = pd.to_datetime(timestamps, unit='s', utc=True)
-                    df['datetime'] = df['datetime'].dt.tz_convert('US/Eastern')
-                else:
-                    # No metadata, just EDA values
-                    eda_column = 0
-                    # Generate timestamps based on row index (assuming 1-minute intervals)
-                    df['datetime'] = pd.date_range(start='2025-01-01 00:00:00', periods=len(df), freq='1min')
-                    df['datetime'] = df['datetime'].dt.tz_localize('UTC').dt.tz_convert('US/Eastern')
-            else:
-                # Multiple columns - assume first is timestamp, second is EDA
-                timestamp_column = 0
-                eda_column = 1 if len(df.columns) > 1 else 0
-                
-                # Try to parse first column as timestamp
-                try:
-                    # Check if it's UNIX timestamp
-                    if df[timestamp_column].dtype in ['int64', 'float64']:
-                        df['datetime'] = pd.to_datetime(df[timestamp_column], unit='s', utc=True)
-                        df['datetime'] = df['datetime'].dt.tz_convert('US/Eastern')
-                    else:
-                        df['datetime'] = pd.to_datetime(df[timestamp_column], utc=True)
-                        df['datetime'] = df['datetime'].dt.tz_convert('US/Eastern')
-                except:
-                    # If timestamp parsing fails, use index
-                    df['datetime'] = pd.date_range(start='2025-01-01 00:00:00', periods=len(df), freq='1min')
-                    df['datetime'] = df['datetime'].dt.tz_localize('UTC').dt.tz_convert('US/Eastern')
-        else:
-            # File has headers - use existing logic
-            # Detect EDA column (flexible naming)
-            eda_column = None
-            possible_columns = ['eda_scl_usiemens', 'eda', 'EDA', 'skin_conductance', 'scl', 'electrodermal']
-            
-            for col in possible_columns:
-                if col in df.columns:
-                    eda_column = col
-                    break
-            
-            if not eda_column:
-                # Try to find any column with 'eda' in the name
-                for col in df.columns:
-                    if 'eda' in str(col).lower():
-                        eda_column = col
-                        break
-            
-            if not eda_column:
-                # Show available columns to help user
-                available_cols = ', '.join(df.columns.tolist())
-                return None, f"No EDA column found in CSV file. Available columns: {available_cols}"
-            
-            # Detect timestamp column
-            timestamp_column = None
-            timestamp_unix_column = None
-            possible_ts = ['timestamp_iso', 'timestamp', 'time', 'datetime']
-            
-            # Check for UNIX timestamp column first
-            if 'timestamp_unix' in df.columns:
-                timestamp_unix_column = 'timestamp_unix'
-            
-            for col in possible_ts:
-                if col in df.columns:
-                    timestamp_column = col
-                    break
-            
-            # Convert timestamps to EST 12-hour format
-            est = pytz.timezone('US/Eastern')
-            
-            if timestamp_unix_column:
-                # Convert UNIX timestamps (milliseconds) to datetime in EST
-                df['datetime'] = pd.to_datetime(df[timestamp_unix_column], unit='ms', utc=True)
-                df['datetime'] = df['datetime'].dt.tz_convert(est)
-            elif timestamp_column:
-                # Parse ISO or other timestamp formats
-                try:
-                    df['datetime'] = pd.to_datetime(df[timestamp_column], utc=True)
-                    df['datetime'] = df['datetime'].dt.tz_convert(est)
-                except:
-                    df['datetime'] = pd.to_datetime(df[timestamp_column])
-                    # If no timezone info, assume UTC and convert to EST
-                    if df['datetime'].dt.tz is None:
-                        df['datetime'] = df['datetime'].dt.tz_localize('UTC').dt.tz_convert(est)
-            else:
-                # Use index as timestamp
-                df['datetime'] = pd.date_range(start='2025-01-01 00:00:00', periods=len(df), freq='1min')
-                df['datetime'] = df['datetime'].dt.tz_localize('UTC').dt.tz_convert('US/Eastern')
-        
-        # Format datetime as 12-hour EST time
-        if hasattr(df['datetime'].iloc[0], 'strftime'):
-            df['time_display'] = df['datetime'].dt.strftime('%I:%M:%S %p EST')
-            df['date_display'] = df['datetime'].dt.strftime('%m/%d/%Y')
-        else:
-            df['time_display'] = df['datetime'].astype(str)
-            df['date_display'] = 'N/A'
-        
-        # Convert EDA to numeric
-        df[eda_column] = pd.to_numeric(df[eda_column], errors='coerce')
-        
-        # Remove missing values
-        df_clean = df[df[eda_column].notna()].copy()
-        
-        if len(df_clean) == 0:
-            return None, "No valid EDA data found in file"
-        
-        # Calculate statistics
-        stats = {
-            'mean': float(df_clean[eda_column].mean()),
-            'std': float(df_clean[eda_column].std()),
-            'min': float(df_clean[eda_column].min()),
-            'max': float(df_clean[eda_column].max()),
-            'count': len(df_clean),
-            'missing': len(df) - len(df_clean),
-            'start_time': df_clean['time_display'].iloc[0] if len(df_clean) > 0 else 'N/A',
-            'end_time': df_clean['time_display'].iloc[-1] if len(df_clean) > 0 else 'N/A',
-            'date': df_clean['date_display'].iloc[0] if len(df_clean) > 0 else 'N/A'
-        }
-        
-        # Calculate seconds from start for video sync
-        first_datetime = df_clean['datetime'].iloc[0]
-        df_clean['seconds_from_start'] = (df_clean['datetime'] - first_datetime).dt.total_seconds()
-        
-        # Prepare data for plotting
-        plot_data = {
-            'timestamps': df_clean['time_display'].tolist(),
-            'timestamps_raw': df_clean['datetime'].astype(str).tolist(),
-            'seconds_from_start': df_clean['seconds_from_start'].tolist(),
-            'eda_values': df_clean[eda_column].tolist(),
-            'participant_id': df_clean['participant_full_id'].iloc[0] if 'participant_full_id' in df_clean.columns else 'Unknown',
-            'first_datetime': first_datetime  # Store for offset calculation
+        return dataset_cache.derived(dataset_id, entry, 'analysis', build)
+    except AnalysisError as e:
+        log.warning("Skipping analysis of dataset %s: %s", dataset_id, e)
+        return None
+
+def scr_markers(analysis, lo, hi):
+    """SCR peak indices and amplitudes in samples [lo, hi), the largest ones if over the marker cap"""
+    window = analysis.scr_range(lo, hi)
+    peaks, amplitudes = analysis.scr_peaks[window], analysis.scr_amplitudes[window]
+    cap = app.config['PLOT_MAX_SCR_MARKERS']
+    if len(peaks) > cap:
+        keep = np.sort(np.argpartition(amplitudes, -cap)[-cap:])
+        peaks, amplitudes = peaks[keep], amplitudes[keep]
+    return peaks, amplitudes
+
+def analysis_stats(dataset, analysis, lo, hi):
+    """SCR count/rate/amplitude and mean SCL over samples [lo, hi) (empty without an analysis)"""
+    if analysis is None:
+        return {}
+    duration = (int(dataset.epoch_ns[hi - 1]) - int(dataset.epoch_ns[lo])) / 1e9 if hi > lo else 0
+    return analysis.scr_summary(lo, hi, duration)
+
+def window_points(dataset, lod, start=None, end=None, max_points=None, binary=False, analysis=None,
+                  stats_index=None):
+    """
+    Decimated slice of a dataset between start and end seconds
+    Stats cover every raw sample in the window, not just the decimated points,
+    and come from the dataset's WindowStatsIndex when given (no rescan)
+    With an analysis, the tonic level at each point and the window's SCR peaks
+    are included for the plot overlay
+    Returns (meta, columns): JSON lists by default, or typed arrays for a binary
+    frame, where display strings are left for the client to derive
+    """
+    level, indices = lod.query(start, end, max_points or app.config['PLOT_MAX_POINTS'])
+    lo, hi = lod.index.sample_range(start, end)
+    meta = {
+        'level': level,
+        'start': start,
+        'end': end,
+        'stats': window_stats(dataset, lo, hi, stats_index),
+        'time_origin': dataset.first_datetime.tz_localize(None).isoformat(),
+        'utc_offset_seconds': dataset.first_datetime.utcoffset().total_seconds()
+    }
+    if analysis is not None:
+        meta['stats'].update(analysis_stats(dataset, analysis, lo, hi))
+        peaks, amplitudes = scr_markers(analysis, lo, hi)
+        meta['scr'] = {
+            'seconds': dataset.seconds_at(peaks).tolist(),
+            'values': dataset.values[peaks].tolist(),
+            'amplitudes': amplitudes.tolist()
         }
-        
-        return {'data': plot_data, 'stats': stats}, None
-        
-    except Exception as e:
-        import traceback
-        print(f"ERROR in process_eda_file: {traceback.format_exc()}")
-        return None, f"Error processing file: {str(e)}"
+    
+    if not binary:
+        meta.update({
+            'indices': indices.tolist(),
+            'timestamps': dataset.time_display(indices).tolist(),
+            'timestamps_seconds': dataset.seconds_at(indices).tolist(),
+            'eda_values': dataset.values[indices].tolist()
+        })
+        if analysis is not None:
+            meta['tonic'] = analysis.tonic[indices].tolist()
+        return meta, None
+    
+    # Evenly sampled data: seconds are index * period, so only indices are sent
+    period_ns = getattr(dataset.epoch_ns, 'period_ns', None)
+    columns = [
+        ('indices', indices.astype(np.uint32), wire_format.DELTA),
+        ('eda_values', dataset.values[indices].astype(np.float32), wire_format.RAW)
+    ]
+    if analysis is not None:
+        columns.append(('tonic', analysis.tonic[indices], wire_format.RAW))
+    if period_ns:
+        meta['sample_period'] = period_ns / 1e9
+    else:
+        columns.append(('timestamps_seconds', dataset.seconds_at(indices), wire_format.RAW))
+    return meta, columns
 
-def create_eda_plot(data, stats, video_url=None, video_offset=0, video_duration=None):
+def wants_binary():
+    """Client asked for the compact binary frame instead of JSON lists"""
+    return request.args.get('format') == 'binary'
+
+def binary_response(meta, columns):
+    """Binary wire frame, gzip-compressed when the client accepts it"""
+    with metrics.timer('stage_seconds', stage='serialize_binary'):
+        frame = wire_format.encode_frame(meta, columns)
+        body, encoding = wire_format.compress(frame, request.headers.get('Accept-Encoding'))
+    response = Response(body, mimetype=wire_format.CONTENT_TYPE)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
+
+def json_response(payload):
+    """jsonify with its serialization time recorded (the large sample payloads)"""
+    with metrics.timer('stage_seconds', stage='serialize_json'):
+        return jsonify(payload)
+
+@lru_cache(maxsize=None)
+def plot_template():
+    """
+    The plotly_white template resolved to plain JSON once per process
+    plotly.js has no named templates, so the layout part travels with each figure
     """
-    Create interactive Plotly visualization with optional video sync
+    import plotly.io as pio
+    return {'layout': pio.templates['plotly_white'].layout.to_plotly_json()}
+
+def create_eda_plot(dataset, stats, video_url=None, video_offset=0, video_duration=None, lod=None, analysis=None,
+                    stats_index=None):
+    """
+    Build the interactive Plotly figure with optional video sync
     If video is provided, only show EDA data for the video duration window
+    The trace is drawn from the LOD pyramid, so it never holds more than
+    PLOT_MAX_POINTS points no matter how long the recording is
+    With an analysis, the tonic level (SCL) and SCR peaks are overlaid
+    Returns a plain figure dict for Plotly.newPlot; plotly.js itself is served
+    once as a cached static bundle (see static_assets)
     Similar to a View Helper in ASP.NET
     """
-    timestamps = data['timestamps']  # 12-hour EST formatted strings
-    eda_values = data['eda_values']
-    seconds_from_start = data['seconds_from_start']
-    participant_id = data['participant_id']
+    lod = lod or LODPyramid(dataset.values, TimeIndex(dataset.epoch_ns))
+    participant_id = dataset.participant_id
+    start, end = None, None
+    lo, hi = 0, len(dataset)
     
     # Filter data to video duration if video is uploaded
     if video_url and video_duration:
         # Calculate the time window for the video
         # video_offset is how many seconds the video started after data collection
-        video_start_in_data = video_offset  # seconds from data start
-        video_end_in_data = video_offset + video_duration
-        
-        # Filter to only data points within video duration
-        filtered_indices = [
-            i for i, sec in enumerate(seconds_from_start)
-            if video_start_in_data <= sec <= video_end_in_data
-        ]
+        start = video_offset  # seconds from data start
+        end = video_offset + video_duration
         
-        if filtered_indices:
-            timestamps = [timestamps[i] for i in filtered_indices]
-            eda_values = [eda_values[i] for i in filtered_indices]
-            seconds_from_start = [seconds_from_start[i] for i in filtered_indices]
-            
+        lo, hi = lod.index.sample_range(start, end)
+        if hi > lo:
             # Update stats for filtered data
-            stats = stats.copy()
-            stats['mean'] = sum(eda_values) / len(eda_values) if eda_values else 0
-            stats['min'] = min(eda_values) if eda_values else 0
-            stats['max'] = max(eda_values) if eda_values else 0
-            stats['count'] = len(eda_values)
-            stats['start_time'] = timestamps[0] if timestamps else 'N/A'
-            stats['end_time'] = timestamps[-1] if timestamps else 'N/A'
-    
-    # Create figure
-    fig = go.Figure()
-    
-    # Add EDA trace
-    fig.add_trace(go.Scatter(
-        x=timestamps,
-        y=eda_values,
-        mode='lines',
-        name='EDA Signal',
-        line=dict(color='steelblue', width=2),
-        fill='tozeroy',
-        fillcolor='rgba(70, 130, 180, 0.2)',
-        customdata=list(range(len(timestamps))),  # Add index for video sync
-        hovertemplate='<b>Time:</b> %{x}<br><b>EDA:</b> %{y:.3f} µS<extra></extra>'
-    ))
-    
-    # Add mean line
-    fig.add_hline(
-        y=stats['mean'],
-        line_dash="dash",
-        line_color="red",
-        annotation_text=f"Mean: {stats['mean']:.3f} µS",
-        annotation_position="right"
-    )
+            stats = {**stats, **window_stats(dataset, lo, hi, stats_index)}
+            stats['start_time'], stats['end_time'] = dataset.time_display([lo, hi - 1])
+        else:
+            start, end = None, None
+            lo, hi = 0, len(dataset)
+    
+    level, indices = lod.query(start, end, app.config['PLOT_MAX_POINTS'])
+    # Naive EST wall-clock times as epoch milliseconds, so Plotly's date axis shows local time
+    timestamps_ms = dataset.datetimes(indices).tz_localize(None).values.astype('datetime64[ms]').astype(np.int64)
+    eda_values = np.round(dataset.values[indices], 6)
     
     # Update layout with session info
     title_text = f'Electrodermal Activity - {participant_id}'
@@ -285,55 +280,134 @@ def create_eda_plot(data, stats, video_url=None, video_offset=0, video_duration=
         else:
             title_text += f"<br><sub>Session: {stats['date']} ({stats['start_time']} - {stats['end_time']})</sub>"
     
-    fig.update_layout(
-        title=title_text,
-        xaxis_title='Time (EST)',
-        yaxis_title='EDA (µSiemens)',
-        hovermode='x unified',
-        template='plotly_white',
-        height=400,
-        margin=dict(l=50, r=50, t=100, b=50)
-    )
-    
-    # Configure x-axis to show every Nth label to avoid crowding
-    total_points = len(timestamps)
-    if total_points > 50:
-        # Show approximately 10-15 labels
-        tick_interval = max(1, total_points // 12)
-        fig.update_xaxes(
-            tickmode='linear',
-            tick0=0,
-            dtick=tick_interval,
-            tickangle=-45
-        )
-    
-    # Add range slider
-    fig.update_xaxes(rangeslider_visible=True)
-    
-    # Return HTML with Plotly.js included
-    return fig.to_html(full_html=False, include_plotlyjs=True, div_id='plotly-chart')
-
-
-def parse_video_start_time_from_filename(filename):
-    """
-    Parse video start time from filename format:
-    Example: "SYS1Cam3--2018-05-14_10_22_27_frames_1-9470.mp4"
-    Returns: "10:22:27" (HH:MM:SS format) or None if not found
-    """
-    # Pattern to match YYYY-MM-DD_HH_MM_SS in the filename
-    # This handles both underscore and dash separators
-    pattern = r'(\d{4})-(\d{2})-(\d{2})[_-](\d{2})[_-](\d{2})[_-](\d{2})'
-    match = re.search(pattern, filename)
-    
-    if match:
-        year, month, day, hour, minute, second = match.groups()
-        # Return just the time portion in HH:MM:SS format
-        time_str = f"{hour}:{minute}:{second}"
-        print(f"DEBUG: Parsed video start time from filename '{filename}': {time_str}")
-        return time_str
-    else:
-        print(f"DEBUG: Could not parse video start time from filename '{filename}'")
-        return None
+    traces = [{
+            'type': 'scatter',
+            'x': timestamps_ms.tolist(),
+            'y': eda_values.tolist(),
+            'mode': 'lines',
+            'name': 'EDA Signal',
+            'line': {'color': 'steelblue', 'width': 2},
+            'fill': 'tozeroy',
+            'fillcolor': 'rgba(70, 130, 180, 0.2)',
+            'customdata': indices.tolist(),  # Sample index for video sync
+            'hovertemplate': '<b>Time:</b> %{x|%I:%M:%S %p}<br><b>EDA:</b> %{y:.3f} µS<extra></extra>'
+        }]
+    if analysis is not None:
+        peaks, amplitudes = scr_markers(analysis, lo, hi)
+        peak_ms = dataset.datetimes(peaks).tz_localize(None).values.astype('datetime64[ms]').astype(np.int64)
+        traces += [{
+            'type': 'scatter',
+            'x': timestamps_ms.tolist(),
+            'y': np.round(analysis.tonic[indices].astype(np.float64), 6).tolist(),
+            'mode': 'lines',
+            'name': 'Tonic (SCL)',
+            'line': {'color': 'darkorange', 'width': 1.5},
+            'hovertemplate': '<b>SCL:</b> %{y:.3f} µS<extra></extra>'
+        }, {
+            'type': 'scatter',
+            'x': peak_ms.tolist(),
+            'y': np.round(dataset.values[peaks], 6).tolist(),
+            'mode': 'markers',
+            'name': 'SCR peaks',
+            'marker': {'color': 'crimson', 'symbol': 'triangle-up', 'size': 7},
+            'customdata': np.round(amplitudes, 4).tolist(),
+            'hovertemplate': '<b>SCR:</b> +%{customdata:.3f} µS<extra></extra>'
+        }]
+    
+    # The figure is emitted as a dict directly: building go.Figure objects and
+    # running to_html/to_json costs more than the whole LOD query
+    return {
+        'data': traces,
+        'layout': {
+            'title': {'text': title_text},
+            # Date axis with 12-hour labels; Plotly picks tick spacing from the range
+            # Range slider on; zooming fetches finer LOD levels client-side
+            'xaxis': {
+                'title': {'text': 'Time (EST)'},
+                'type': 'date',
+                'tickformat': '%I:%M:%S %p',
+                'nticks': 15,
+                'tickangle': -45,
+                'rangeslider': {'visible': True}
+            },
+            'yaxis': {'title': {'text': 'EDA (µSiemens)'}},
+            'hovermode': 'x unified',
+            'template': plot_template(),
+            'height': 400,
+            'margin': {'l': 50, 'r': 50, 't': 100, 'b': 50},
+            # Mean line across the full plot width
+            'shapes': [{
+                'type': 'line', 'xref': 'x domain', 'x0': 0, 'x1': 1,
+                'yref': 'y', 'y0': stats['mean'], 'y1': stats['mean'],
+                'line': {'color': 'red', 'dash': 'dash'}
+            }],
+            'annotations': [{
+                'text': f"Mean: {stats['mean']:.3f} µS", 'showarrow': False,
+                'xref': 'x domain', 'x': 1, 'xanchor': 'left',
+                'yref': 'y', 'y': stats['mean'], 'yanchor': 'middle'
+            }]
+        },
+        'config': {'responsive': True}
+    }
+
+
+# ========== INSTRUMENTATION (Middleware in ASP.NET) ==========
+
+def save_profile(profiler, endpoint):
+    """Write a finished request profile to PROFILE_FOLDER; returns its file name"""
+    folder = Path(app.config['PROFILE_FOLDER'])
+    folder.mkdir(parents=True, exist_ok=True)
+    name = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{endpoint}_{os.urandom(4).hex()}.prof"
+    profiler.dump_stats(str(folder / name))
+    return name
+
+def profile_report(path, lines=None):
+    """pstats text report of a stored profile, heaviest cumulative time first"""
+    out = io.StringIO()
+    stats = pstats.Stats(str(path), stream=out)
+    stats.sort_stats('cumulative').print_stats(lines or app.config['PROFILE_REPORT_LINES'])
+    return out.getvalue()
+
+@app.before_request
+def start_request_instrumentation():
+    """
+    Start the request timer; with PROFILE_REQUESTS on, ?profile=1 (store) or
+    ?profile=report (store and return the text report) runs the request under cProfile
+    Only the request thread is profiled; background job stages show up in /metrics
+    """
+    g.request_start = time.perf_counter()
+    if (app.config['PROFILE_REQUESTS'] and request.args.get('profile') in ('1', 'report')
+            and profile_lock.acquire(blocking=False)):
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+@app.after_request
+def record_request_instrumentation(response):
+    """Request time and response size per endpoint; stores the profile if one was taken"""
+    endpoint = request.endpoint or 'unmatched'
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        profile_lock.release()
+        name = save_profile(profiler, endpoint)
+        if request.args.get('profile') == 'report':
+            response = Response(profile_report(Path(app.config['PROFILE_FOLDER']) / name), mimetype='text/plain')
+        response.headers['X-Profile'] = url_for('profile_detail', name=name)
+    
+    metrics.observe('http_request_seconds', time.perf_counter() - g.request_start,
+                    endpoint=endpoint, method=request.method)
+    if response.content_length is not None:
+        metrics.observe('http_response_bytes', response.content_length, buckets=metrics.BYTES_BUCKETS,
+                        endpoint=endpoint)
+    return response
+
+@app.teardown_request
+def stop_request_profiler(error=None):
+    """Release the profiler if the view raised before after_request ran"""
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.disable()
+        profile_lock.release()
 
 
 # ========== ROUTES (Controllers in ASP.NET) ==========
@@ -343,152 +417,876 @@ def index():
     """
     Home page - equivalent to HomeController.Index() in ASP.NET
     """
-    return render_template('index.html')
+    # Parquet is offered only where the optional pyarrow is installed
+    return render_template('index.html', export_formats=eda_export.available_formats())
+
+class UploadForm:
+    """
+    Parts of an upload that arrive after the CSV (video, video start time)
+    The processing job parses the CSV right away and resumes once ready resolves;
+    with a chunked video upload that happens when the video is finalized
+    """
+
+    def __init__(self):
+        self.fields = {}
+        self.video_filename = None  # Name as uploaded (start time may be encoded in it)
+        self.video_path = None
+        self.video_url = None
+        self.error = None
+        self.ready = Future()
+
+    def complete(self, error=None):
+        """Mark the form as fully received (first call wins)"""
+        if self.ready.done():
+            return
+        self.error = self.error or error
+        try:
+            self.ready.set_result(self)
+        except InvalidStateError:
+            pass
+
+    def attach_video(self, session):
+        """Use a finalized chunked upload as this form's video"""
+        self.video_filename = session.filename
+        self.video_path = session.path
+        self.video_url = f"/static/videos/{session.stored_name}"
+
+def attach_chunked_video(form, upload_id):
+    """Complete the form once the referenced chunked video upload is finalized"""
+    session = chunked_uploads.get(upload_id)
+    if session is None:
+        form.complete(error='Unknown video upload; please upload the video again')
+        return
+    
+    def on_video_done(future):
+        error = future.exception()
+        if error is None:
+            form.attach_video(session)
+        form.complete(error=str(error) if error else None)
+    session.completed.add_done_callback(on_video_done)
+
+def open_upload_part(form, name, filename, timestamp):
+    """Sink for one streamed file part of /upload, or None to skip it"""
+    if name == 'file':
+        if not filename:
+            form.error = 'No file selected'
+            return None
+        if not allowed_file(filename):
+            form.error = 'Invalid file type. Please upload a CSV file.'
+            return None
+        return HashingSink(app.config['UPLOAD_FOLDER'])
+    
+    if name == 'video' and filename and allowed_video(filename):
+        video_filename = f"{timestamp}_{secure_filename(filename)}"
+        form.video_filename = filename
+        form.video_path = os.path.join(app.config['VIDEO_FOLDER'], video_filename)
+        form.video_url = f"/static/videos/{video_filename}"
+        return FileSink(form.video_path)
+    return None
+
+def probe_video_file(path):
+    """Container metadata for a stored video, or None if its headers can't be read"""
+    try:
+        return probe_video(path)
+    except (ProbeError, OSError) as e:
+        log.warning("Could not probe video %s: %s", path, e)
+        return None
+
+def faststart_video_file(path):
+    """Relocate moov to the front so playback and seeking start early; the original is kept on failure"""
+    try:
+        if video_faststart.faststart(path):
+            log.debug("Moved moov to the front of %s", path)
+    except (ProbeError, OSError) as e:
+        log.warning("Could not faststart video %s: %s", path, e)
+
+def prepare_chunked_video(session):
+    """Faststart an assembled chunked upload while it is still a .part file, before its URL exists"""
+    if app.config['VIDEO_FASTSTART'] and video_faststart.supports(session.stored_name):
+        faststart_video_file(session.part_path)
+
+def video_summary(probe):
+    """Probe fields sent with the upload response (the sample table stays server-side)"""
+    return {key: value for key, value in probe.items() if key != 'sample_table'}
+
+def process_upload(job, dataset_id, filepath, form):
+    """
+    Background job for one upload: parse (or reuse) the dataset, then build
+    the response once the rest of the form has arrived
+    Runs while the video is still streaming to disk (in the request body or in chunks)
+    """
+    try:
+        with job.stage('parse'):
+            # Re-uploads of the same CSV skip parsing entirely
+            entry = dataset_cache.get(dataset_id)
+            cache_hit = entry is not None
+            if entry is None:
+                result, error = process_eda_file(filepath)
+                if error:
+                    raise JobError(error)
+                # Index build (time index, LOD levels, prefix sums) plus the .edac write
+                with metrics.timer('stage_seconds', stage='store'):
+                    entry = dataset_cache.put(dataset_id, result['dataset'], result['stats'])
+    finally:
+        upload_leases.release(filepath)
+    
+    with job.stage('analyze'):
+        # Tonic/phasic split and SCRs, cached with the entry (free on re-uploads)
+        analysis_for(dataset_id, entry)
+        
+        # Keep uploads/ (CSVs and the parsed-array tier) within its byte budget
+        # Other jobs' CSVs that are still waiting to be parsed are leased and skipped
+        prune_folder(app.config['UPLOAD_FOLDER'], app.config['UPLOAD_FOLDER_MAX_BYTES'],
+                     keep=upload_leases.paths() | {filepath})
+    
+    # Don't hold a worker while the video is still arriving
+    return Continuation('receive', form.ready, render_upload, dataset_id, entry, cache_hit, form)
+
+def render_upload(job, dataset_id, entry, cache_hit, form):
+    """Second half of process_upload, queued once the form is complete"""
+    if form.error:
+        raise JobError(form.error)
+    
+    # Before the response publishes the video URL: served videos are immutable
+    # (chunked uploads were already rewritten in finalize, so this is a no-op for them)
+    if form.video_path and app.config['VIDEO_FASTSTART'] and video_faststart.supports(form.video_path):
+        with job.stage('faststart'):
+            faststart_video_file(form.video_path)
+    
+    with job.stage('render'):
+        return build_upload_response(dataset_id, entry, cache_hit, form)
+
+def build_upload_response(dataset_id, entry, cache_hit, form):
+    """Upload response metadata and figure; sample points are added per request format"""
+    dataset = entry['dataset']
+    lod = entry['lod']
+    stats = entry['stats']
+    video_url = form.video_url
+    video_start_time = form.fields.get('video_start_time')
+    video_offset_seconds = 0
+    video_duration = None
+    video_probe = None
+    video_format_warning = None
+    parsed_time = None  # Track if we auto-detected the time
+    
+    if video_url:
+        # Exact duration and frame rate from the container headers, so the
+        # plot can be filtered here instead of waiting on the browser's metadata
+        video_probe = probe_video_file(form.video_path)
+        if video_probe:
+            video_duration = video_probe['duration']
+        
+        # Try to parse video start time from filename first
+        parsed_time = parse_video_start_time_from_filename(form.video_filename)
+        if parsed_time and not video_start_time:
+            video_start_time = parsed_time
+        log.debug("Video %s: probe %s, start time %s", form.video_path, video_probe and video_probe['container'],
+                  video_start_time or 'unknown')
+        
+        # Check if video format is browser-compatible
+        ext = video_url.rsplit('.', 1)[1].lower()
+        if ext == 'avi':
+            video_format_warning = (
+                "⚠️ AVI format has limited browser support. "
+                "If the video doesn't play, try a different browser (Firefox sometimes works better with AVI). "
+                "MP4 format is recommended for best compatibility across all browsers."
+            )
+        elif ext not in ['mp4', 'webm', 'ogg']:
+            video_format_warning = f"⚠️ {ext.upper()} format may not play in all browsers. MP4 is recommended for best compatibility."
+        
+        # Calculate video offset if start time provided
+        if video_start_time:
+            video_offset_seconds = video_offset_for(dataset, video_start_time)
+    
+    # Create visualization - without a probed duration the client filters to the video window
+    analysis = analysis_for(dataset_id, entry)
+    with metrics.timer('stage_seconds', stage='plot'):
+        figure = create_eda_plot(dataset, stats, video_url, video_offset_seconds, video_duration=video_duration,
+                                 lod=lod, analysis=analysis, stats_index=entry['window_stats'])
+    
+    # Prepare response with video info message
+    video_info_message = None
+    if video_url and parsed_time:
+        video_info_message = f"✅ Video start time auto-detected from filename: {parsed_time}"
+    elif video_url and video_start_time:
+        video_info_message = f"✅ Using manually entered video start time: {video_start_time}"
+    
+    return {
+        'success': True,
+        'dataset_id': dataset_id,
+        'cache_hit': cache_hit,
+        'stats': stats,
+        'analysis': analysis_stats(dataset, analysis, 0, len(dataset)),
+        'figure': figure,
+        'participant_id': dataset.participant_id,
+        'video_url': video_url,
+        'video_offset_seconds': video_offset_seconds,
+        'video_probe': video_summary(video_probe) if video_probe else None,
+        'video_info_message': video_info_message,
+        'data_points': len(dataset),
+        'video_warning': video_format_warning  # Warning about unsupported formats
+    }
 
 @app.route('/upload', methods=['POST'])
 def upload_file():
     """
     Handle file upload - equivalent to [HttpPost] action in ASP.NET
+    The body is streamed part by part: the CSV's processing job starts as soon
+    as that part has arrived, while the video is still being written to disk.
+    Responds 202 with a job id; progress and stage timings are polled from
+    /api/jobs/<id> and the payload is fetched from /api/jobs/<id>/result
     """
-    if 'file' not in request.files:
-        return jsonify({'error': 'No file provided'}), 400
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    if request.content_length:
+        metrics.observe('upload_bytes', request.content_length, buckets=metrics.BYTES_BUCKETS)
+    form = UploadForm()
+    job = job_queue.create('upload')
+    submitted = []
     
-    file = request.files['file']
-    video_file = request.files.get('video')  # Optional video file
-    video_start_time = request.form.get('video_start_time')  # Optional video start time
+    def start_job(name, sink):
+        if name == 'file' and not submitted:
+            upload_leases.acquire(sink.path)  # Released by process_upload once parsed
+            submitted.append(job_queue.submit(job, process_upload, sink.digest, sink.path, form))
     
-    if file.filename == '':
-        return jsonify({'error': 'No file selected'}), 400
+    try:
+        with job.stage('upload'), metrics.timer('stage_seconds', stage='save'):
+            form.fields = stream_multipart(
+                request.stream, request.content_type,
+                lambda name, filename: open_upload_part(form, name, filename, timestamp),
+                on_file_complete=start_job)
+    except UploadError as e:
+        form.error = str(e)
+    except Exception as e:
+        log.exception("Upload failed")
+        form.error = f'Server error: {str(e)}'
+    finally:
+        # Never leave a started job waiting on the form
+        upload_id = form.fields.get('video_upload_id')
+        if upload_id and not form.error:
+            attach_chunked_video(form, upload_id)  # Video arrives through /api/uploads
+        else:
+            form.complete()
     
-    if not allowed_file(file.filename):
-        return jsonify({'error': 'Invalid file type. Please upload a CSV file.'}), 400
+    if not submitted:
+        error = form.error or 'No file provided'
+        job_queue.discard(job)
+        return jsonify({'error': error}), 400
     
+    return jsonify({
+        'job_id': job.id,
+        'status_url': url_for('job_status', job_id=job.id),
+        'result_url': url_for('job_result', job_id=job.id)
+    }), 202
+
+@app.route('/api/uploads', methods=['POST'])
+def create_video_upload():
+    """
+    Start a chunked video upload
+    Body: {"filename", "size", optional "chunk_size", optional "sha256" of the whole file}
+    The response lists the chunk layout; chunks are then PUT by index
+    """
+    body = request.get_json(silent=True) or {}
+    filename = body.get('filename') or ''
+    if not allowed_video(filename):
+        return jsonify({'error': 'Invalid video type. Supported: ' +
+                        ', '.join(sorted(app.config['ALLOWED_VIDEO_EXTENSIONS']))}), 400
+    if not isinstance(body.get('size'), int) or body['size'] > app.config['MAX_CONTENT_LENGTH']:
+        return jsonify({'error': 'Video size is missing or too large'}), 400
+    
+    stored_name = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{secure_filename(filename)}"
     try:
-        # Save CSV file securely
-        filename = secure_filename(file.filename)
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"{timestamp}_{filename}"
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
-        
-        # Process the file
-        result, error = process_eda_file(filepath)
-        
-        if error:
-            return jsonify({'error': error}), 400
-        
-        # Handle video upload if provided
-        video_url = None
-        video_offset_seconds = 0
-        video_format_warning = None
-        parsed_time = None  # Track if we auto-detected the time
-        
-        if video_file and video_file.filename != '' and allowed_video(video_file.filename):
-            video_filename = secure_filename(video_file.filename)
-            video_filename = f"{timestamp}_{video_filename}"
-            video_path = os.path.join(app.config['VIDEO_FOLDER'], video_filename)
-            video_file.save(video_path)
-            video_url = f"/static/videos/{video_filename}"
-            print(f"DEBUG: Video saved to {video_path}")
-            
-            # Try to parse video start time from filename first
-            parsed_time = parse_video_start_time_from_filename(video_file.filename)
-            if parsed_time and not video_start_time:
-                video_start_time = parsed_time
-                print(f"DEBUG: Using auto-detected video start time: {video_start_time}")
-            elif video_start_time:
-                print(f"DEBUG: Using manually provided video start time: {video_start_time}")
-            else:
-                print(f"DEBUG: No video start time available (neither auto-detected nor manual)")
-            
-            # Check if video format is browser-compatible
-            ext = video_filename.rsplit('.', 1)[1].lower()
-            if ext == 'avi':
-                video_format_warning = (
-                    "⚠️ AVI format has limited browser support. "
-                    "If the video doesn't play, try a different browser (Firefox sometimes works better with AVI). "
-                    "MP4 format is recommended for best compatibility across all browsers."
-                )
-            elif ext not in ['mp4', 'webm', 'ogg']:
-                video_format_warning = f"⚠️ {ext.upper()} format may not play in all browsers. MP4 is recommended for best compatibility."
-            
-            # Calculate video offset if start time provided
-            if video_start_time and result['data'].get('timestamps_raw'):
-                try:
-                    # Parse video start time in EST
-                    est = pytz.timezone('US/Eastern')
-                    
-                    # Get the date from the first data point
-                    first_data_time_str = result['data']['timestamps_raw'][0]
-                    first_data_time = pd.to_datetime(first_data_time_str)
-                    
-                    # If timezone-naive, localize to EST
-                    if first_data_time.tzinfo is None:
-                        first_data_time = est.localize(first_data_time)
-                    else:
-                        # Convert to EST if different timezone
-                        first_data_time = first_data_time.astimezone(est)
-                    
-                    video_date = first_data_time.date()
-                    
-                    # Parse the video start time (could be HH:MM:SS or HH:MM)
-                    if len(video_start_time.split(':')) == 2:
-                        video_start_time += ':00'  # Add seconds if not provided
-                    
-                    # Create a datetime object for video start (timezone-naive first)
-                    video_start_dt = datetime.strptime(f"{video_date} {video_start_time}", '%Y-%m-%d %H:%M:%S')
-                    # Then localize to EST
-                    video_start_dt = est.localize(video_start_dt)
-                    
-                    # Calculate offset in seconds: how many seconds after data start did video start?
-                    # Positive = video started after data collection began
-                    # Negative = video started before data collection (unusual)
-                    video_offset_seconds = (video_start_dt - first_data_time).total_seconds()
-                    
-                    print(f"DEBUG: Data start time: {first_data_time}")
-                    print(f"DEBUG: Video start time: {video_start_dt}")
-                    print(f"DEBUG: Video offset: {video_offset_seconds} seconds ({video_offset_seconds/60:.2f} minutes)")
-                    
-                except Exception as e:
-                    import traceback
-                    print(f"WARNING: Could not parse video start time: {e}")
-                    print(f"TRACEBACK: {traceback.format_exc()}")
-                    video_offset_seconds = 0
-        
-        # Create visualization - video duration will be determined client-side
-        plot_html = create_eda_plot(result['data'], result['stats'], video_url, video_offset_seconds, video_duration=None)
-        
-        # Debug: Print plot HTML length
-        print(f"DEBUG: Plot HTML generated, length: {len(plot_html)} characters")
-        print(f"DEBUG: Stats: {result['stats']}")
-        print(f"DEBUG: Video URL: {video_url}")
-        
-        # Prepare response with video info message
-        video_info_message = None
-        if video_url and parsed_time:
-            video_info_message = f"✅ Video start time auto-detected from filename: {parsed_time}"
-        elif video_url and video_start_time:
-            video_info_message = f"✅ Using manually entered video start time: {video_start_time}"
+        session = chunked_uploads.create(stored_name, filename, body['size'],
+                                         chunk_size=body.get('chunk_size'), sha256=body.get('sha256'))
+    except (ChunkError, TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(session.to_dict()), 201
+
+@app.route('/api/uploads/<upload_id>')
+def video_upload_status(upload_id):
+    """Chunk layout and the chunks still missing, for resuming an upload"""
+    session = chunked_uploads.get(upload_id)
+    if session is None:
+        return jsonify({'error': 'Unknown upload'}), 404
+    return jsonify(session.to_dict())
+
+@app.route('/api/uploads/<upload_id>/chunks/<int:index>', methods=['PUT'])
+def put_video_chunk(upload_id, index):
+    """
+    Store one chunk; the raw body is written straight into its slot of the video
+    X-Chunk-SHA256 must carry the hex SHA-256 of the chunk. Chunks may be sent
+    in any order and concurrently; resending a chunk overwrites it
+    """
+    session = chunked_uploads.get(upload_id)
+    if session is None:
+        return jsonify({'error': 'Unknown upload'}), 404
+    try:
+        session.write_chunk(index, request.stream, request.headers.get('X-Chunk-SHA256'))
+    except ChunkError as e:
+        return jsonify({'error': str(e)}), 400
+    except FileNotFoundError:
+        return jsonify({'error': 'Upload was cancelled'}), 404
+    return jsonify({'index': index, 'received_count': session.chunk_count - len(session.missing()),
+                    'chunk_count': session.chunk_count})
+
+@app.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+def complete_video_upload(upload_id):
+    """Verify every chunk arrived, faststart it and move the video into place"""
+    session = chunked_uploads.get(upload_id)
+    if session is None:
+        return jsonify({'error': 'Unknown upload'}), 404
+    try:
+        session.finalize(prepare=prepare_chunked_video)
+    except ChunkError as e:
+        return jsonify({'error': str(e), 'missing': session.missing()}), 409
+    return jsonify({'upload_id': upload_id, 'video_url': f"/static/videos/{session.stored_name}"})
+
+@app.route('/api/uploads/<upload_id>', methods=['DELETE'])
+def cancel_video_upload(upload_id):
+    """Abandon an upload and delete its partial data"""
+    if chunked_uploads.discard(upload_id) is None:
+        return jsonify({'error': 'Unknown upload'}), 404
+    return '', 204
+
+@app.route('/api/videos/<filename>/probe')
+def video_probe_info(filename):
+    """
+    Duration, frame rate and the full sample table (stts) of a stored video
+    Read from container headers only; cached per file
+    """
+    video_path = os.path.join(app.config['VIDEO_FOLDER'], secure_filename(filename))
+    if secure_filename(filename) != filename or not os.path.isfile(video_path):
+        return jsonify({'error': 'Video not found'}), 404
+    try:
+        return jsonify(probe_video(video_path))
+    except ProbeError as e:
+        return jsonify({'error': str(e)}), 415
+
+def resolve_batch_path(path):
+    """Absolute path for a directory inside BATCH_ROOT, or None if it escapes it"""
+    root = os.path.realpath(app.config['BATCH_ROOT'])
+    resolved = os.path.realpath(os.path.join(root, path))
+    return resolved if resolved == root or resolved.startswith(root + os.sep) else None
+
+def run_batch_job(job, input_dir, output_dir, workers):
+    """Job body for /api/batch: one process pool per run, sized by workers"""
+    with job.stage('batch'):
+        # spawn: forking a process that runs Flask and job threads is unsafe
+        report = batch.run_batch(input_dir, output_dir, workers, app.config['PLOT_MAX_POINTS'],
+                                 mp_context=multiprocessing.get_context('spawn'))
+    return report
+
+@app.route('/api/batch', methods=['POST'])
+def start_batch():
+    """
+    Process every EDA CSV in a study directory, pairing each with its camera file
+    Body: {"input_dir", optional "output_dir", optional "workers"}; paths are
+    relative to BATCH_ROOT. Returns 202 with the job to poll; the result is the
+    batch report (per-recording rows and throughput)
+    """
+    body = request.get_json(silent=True) or {}
+    relative_input = str(body.get('input_dir') or '')
+    input_dir = resolve_batch_path(relative_input)
+    if input_dir is None or not os.path.isdir(input_dir):
+        return jsonify({'error': 'input_dir must be an existing directory inside the batch root'}), 400
+    output_dir = resolve_batch_path(str(body.get('output_dir') or os.path.join(relative_input, 'batch_output')))
+    if output_dir is None:
+        return jsonify({'error': 'output_dir must be inside the batch root'}), 400
+    workers = body.get('workers') or app.config['BATCH_WORKERS']
+    if workers is not None and (not isinstance(workers, int) or workers < 1):
+        return jsonify({'error': 'workers must be a positive integer'}), 400
+    
+    job = job_queue.create('batch')
+    job_queue.submit(job, run_batch_job, input_dir, output_dir, workers)
+    return jsonify({
+        'job_id': job.id,
+        'status_url': url_for('job_status', job_id=job.id),
+        'result_url': url_for('job_result', job_id=job.id)
+    }), 202
+
+@app.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    """Status, current stage and stage timings of a background job"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/jobs/<job_id>/result')
+def job_result(job_id):
+    """
+    Payload of a finished upload job: response metadata plus the decimated
+    overview of the recording, as JSON or a binary frame (?format=binary)
+    Batch jobs return their report as JSON
+    """
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    if job.status == FAILED:
+        return jsonify({'error': job.error}), 400
+    if job.status != DONE:
+        return jsonify({'error': 'Job has not finished yet', 'status': job.status}), 409
+    if job.kind == 'batch':
+        return jsonify(job.result)
+    
+    response = dict(job.result)
+    entry = dataset_cache.get(response['dataset_id'], count=False)
+    if entry is None:
+        return jsonify({'error': 'Dataset is no longer available; please upload it again'}), 410
+    
+    # Overview of the whole recording, decimated to PLOT_MAX_POINTS
+    binary = wants_binary()
+    overview, columns = window_points(entry['dataset'], entry['lod'], binary=binary,
+                                      analysis=analysis_for(response['dataset_id'], entry),
+                                      stats_index=entry['window_stats'])
+    response.update({
+        'time_origin': overview['time_origin'],
+        'utc_offset_seconds': overview['utc_offset_seconds'],
+        'sample_period': overview.get('sample_period'),
+        'lod_level': overview['level'],
+        'scr': overview.get('scr')
+    })
+    
+    if binary:
+        # Sample columns as typed-array buffers; the client derives display timestamps
+        return binary_response(response, columns)
+    
+    response.update({
+        'timestamps': overview['timestamps'],  # Send formatted timestamps
+        'timestamps_seconds': overview['timestamps_seconds'],  # Send seconds for sync
+        'eda_values': overview['eda_values'],  # Send values for client-side display
+        'tonic': overview.get('tonic')
+    })
+    return json_response(response)
+
+@app.route('/api/datasets/<dataset_id>/window')
+def dataset_window(dataset_id):
+    """
+    Decimated points plus stats for a time window (seconds from data start)
+    Called when the user zooms the chart or the video window is known
+    Both ends are found by binary search, so cost does not grow with recording length
+    """
+    entry = dataset_cache.get(dataset_id, count=False)
+    if entry is None:
+        return jsonify({'error': 'Unknown dataset'}), 404
+    
+    start = request.args.get('start', type=float)
+    end = request.args.get('end', type=float)
+    max_points = min(request.args.get('max_points', app.config['PLOT_MAX_POINTS'], type=int),
+                     app.config['PLOT_MAX_POINTS'])
+    
+    binary = wants_binary()
+    with metrics.timer('stage_seconds', stage='window'):
+        meta, columns = window_points(entry['dataset'], entry['lod'], start, end, max_points, binary=binary,
+                                      analysis=analysis_for(dataset_id, entry), stats_index=entry['window_stats'])
+    return binary_response(meta, columns) if binary else json_response(meta)
+
+@app.route('/api/datasets/<dataset_id>/stats')
+def dataset_stats(dataset_id):
+    """
+    Mean/std/min/max/count plus SCR summary for a window (seconds from data start)
+    Answered from the dataset's prefix sums and LOD buckets, so it costs the same
+    for a one-second window as for the whole recording
+    """
+    entry = dataset_cache.get(dataset_id, count=False)
+    if entry is None:
+        return jsonify({'error': 'Unknown dataset'}), 404
+    
+    start = request.args.get('start', type=float)
+    end = request.args.get('end', type=float)
+    lo, hi = entry['index'].sample_range(start, end)
+    dataset = entry['dataset']
+    stats = window_stats(dataset, lo, hi, entry['window_stats'])
+    if hi > lo:
+        stats['start_time'], stats['end_time'] = dataset.time_display([lo, hi - 1])
+    stats.update(analysis_stats(dataset, analysis_for(dataset_id, entry), lo, hi))
+    return jsonify({'start': start, 'end': end, 'stats': stats})
+
+@app.route('/api/datasets/<dataset_id>/analysis')
+def dataset_analysis(dataset_id):
+    """
+    Phasic/tonic analysis for a time window (seconds from data start; whole recording by default)
+    Every SCR in the window (onset, peak, amplitude, rise time) plus per-epoch statistics
+    """
+    entry = dataset_cache.get(dataset_id, count=False)
+    if entry is None:
+        return jsonify({'error': 'Unknown dataset'}), 404
+    
+    dataset = entry['dataset']
+    analysis = analysis_for(dataset_id, entry)
+    if analysis is None:
+        return jsonify({'error': 'This recording has no usable sample period to analyze'}), 422
+    start = request.args.get('start', type=float)
+    end = request.args.get('end', type=float)
+    lo, hi = entry['index'].sample_range(start, end)
+    scrs = analysis.scr_range(lo, hi)
+    
+    # Epochs overlapping the window
+    epochs = analysis.epochs
+    first_seconds = float(dataset.seconds_at(lo)) if hi > lo else 0
+    last_seconds = float(dataset.seconds_at(hi - 1)) if hi > lo else -1
+    shown = (epochs['start_seconds'] + EPOCH_SECONDS > first_seconds) & (epochs['start_seconds'] <= last_seconds)
+    
+    return jsonify({
+        'start': start,
+        'end': end,
+        'sample_period': analysis.sample_period,
+        'summary': {**window_stats(dataset, lo, hi, entry['window_stats']), **analysis_stats(dataset, analysis, lo, hi)},
+        'scr': {
+            'onset_seconds': dataset.seconds_at(analysis.scr_onsets[scrs]).tolist(),
+            'peak_seconds': dataset.seconds_at(analysis.scr_peaks[scrs]).tolist(),
+            'amplitudes': analysis.scr_amplitudes[scrs].tolist(),
+            'rise_times': analysis.scr_rise_times[scrs].tolist()
+        },
+        # NaN (empty epochs) becomes null
+        'epochs': {name: [None if v != v else v for v in column[shown].tolist()]
+                   for name, column in epochs.items()}
+    })
+
+@app.route('/api/datasets/<dataset_id>/nearest')
+def dataset_nearest(dataset_id):
+    """
+    Raw sample closest to t (seconds from data start) - used while scrubbing video
+    """
+    entry = dataset_cache.get(dataset_id, count=False)
+    if entry is None:
+        return jsonify({'error': 'Unknown dataset'}), 404
+    
+    t = request.args.get('t', type=float)
+    if t is None:
+        return jsonify({'error': 'Missing or invalid t parameter'}), 400
+    
+    dataset = entry['dataset']
+    i = entry['index'].nearest(t)
+    return jsonify({
+        'index': i,
+        'seconds': float(dataset.seconds_at(i)),
+        'eda_value': float(dataset.values[i]),
+        'timestamp': dataset.time_display(slice(i, i + 1))[0]
+    })
+
+@app.route('/api/datasets/<dataset_id>/export')
+def export_dataset(dataset_id):
+    """
+    Download the video-aligned window as ?format=csv|parquet|npz, streamed in chunks
+    ?offset= (video start, seconds from data start) and ?duration= (to the end of
+    the data by default) select the window; ?frame_rate= gives one row per video
+    frame instead of one per sample (?interpolation=nearest|linear)
+    """
+    entry = dataset_cache.get(dataset_id, count=False)
+    if entry is None:
+        return jsonify({'error': 'Unknown dataset'}), 404
+    
+    fmt = request.args.get('format', 'csv')
+    try:
+        window = ExportWindow(entry['dataset'], entry['index'], request.args.get('offset', 0.0, type=float),
+                              request.args.get('duration', type=float), request.args.get('frame_rate', type=float),
+                              request.args.get('interpolation', 'nearest'))
+        chunks = eda_export.encode(window, fmt)
+    except ExportError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    def counted(chunks):
+        # Streamed bodies have no Content-Length for after_request to record
+        sent = 0
+        with metrics.timer('stage_seconds', stage='export'):
+            for chunk in chunks:
+                sent += len(chunk)
+                yield chunk
+        metrics.observe('export_bytes', sent, buckets=metrics.BYTES_BUCKETS, format=fmt)
+    
+    filename = secure_filename(eda_export.export_filename(window, fmt)) or f"eda_export.{fmt}"
+    return Response(counted(chunks), mimetype=eda_export.FORMATS[fmt], headers={
+        'Content-Disposition': f'attachment; filename="{filename}"',
+        'X-Export-Rows': str(window.rows)
+    })
+
+def session_entries(session):
+    """Cache entries of a session's streams in order, or None if one is no longer available"""
+    entries = [dataset_cache.get(stream.dataset_id, count=False) for stream in session.streams]
+    return None if any(entry is None for entry in entries) else entries
+
+def session_items(body, key, text_fields):
+    """body[key] as a list of objects whose text_fields are strings when present; SessionError otherwise"""
+    items = body.get(key) or []
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        raise SessionError(f"{key} must be a list of objects")
+    for item in items:
+        for field in text_fields:
+            if item.get(field) is not None and not isinstance(item[field], str):
+                raise SessionError(f"{key}: {field} must be a string")
+    return items
+
+@app.route('/api/sessions', methods=['POST'])
+def create_session():
+    """
+    Put several uploaded EDA datasets and videos on one time axis
+    Body: {"streams": [{"dataset_id", optional "label"}],
+           "videos": [{"filename" (as stored), optional "start_time", optional "label"}]}
+    A video's start comes from start_time (ISO datetime, or HH:MM[:SS] EST on
+    the first recording's date) or else from the timestamp in its filename
+    """
+    body = request.get_json(silent=True) or {}
+    if not isinstance(body, dict):
+        return jsonify({'error': 'Body must be a JSON object'}), 400
+    try:
+        streams = []
+        for item in session_items(body, 'streams', ('dataset_id', 'label')):
+            entry = dataset_cache.get(item.get('dataset_id') or '', count=False)
+            if entry is None:
+                raise SessionError(f"Unknown dataset {item.get('dataset_id')!r}; upload it first")
+            streams.append(SessionStream(item['dataset_id'], entry['dataset'], item.get('label')))
         
-        return jsonify({
-            'success': True,
-            'stats': result['stats'],
-            'plot_html': plot_html,
-            'participant_id': result['data']['participant_id'],
-            'video_url': video_url,
-            'video_offset_seconds': video_offset_seconds,
-            'video_info_message': video_info_message,
-            'data_points': len(result['data']['timestamps']),
-            'timestamps': result['data']['timestamps'],  # Send formatted timestamps
-            'timestamps_seconds': result['data']['seconds_from_start'],  # Send seconds for sync
-            'eda_values': result['data']['eda_values'],  # Send values for client-side display
-            'video_warning': video_format_warning  # Warning about unsupported formats
-        })
+        reference = min(streams, key=lambda s: s.start_ns) if streams else None
+        videos = []
+        for item in session_items(body, 'videos', ('filename', 'start_time', 'label')):
+            filename = item.get('filename') or ''
+            video = video_catalog.lookup(secure_filename(filename))
+            if video is None or secure_filename(filename) != filename:
+                raise SessionError(f"Unknown video {filename!r}")
+            probe = probe_video_file(video.path) or {}
+            videos.append(SessionVideo(filename, url_for('serve_video', filename=filename),
+                                       video_start_ns(filename, item.get('start_time'), reference),
+                                       probe.get('duration'), probe.get('frame_rate'), item.get('label')))
         
-    except Exception as e:
-        import traceback
-        print(f"ERROR: {traceback.format_exc()}")
-        return jsonify({'error': f'Server error: {str(e)}'}), 500
+        session = session_store.add(Session(streams, videos))
+    except SessionError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(session.to_dict()), 201
+
+@app.route('/api/sessions/<session_id>')
+def session_info(session_id):
+    """Streams and videos of a session with their offsets on the shared axis"""
+    session = session_store.get(session_id)
+    if session is None:
+        return jsonify({'error': 'Unknown session'}), 404
+    return jsonify(session.to_dict())
+
+@app.route('/api/sessions/<session_id>/window')
+def session_window(session_id):
+    """
+    Every stream of a session for one window (seconds on the session axis)
+    Default: each stream decimated by its own LOD pyramid (max_points each)
+    ?mode=resample&points=N: all streams as cell means on one common grid
+    """
+    session = session_store.get(session_id)
+    if session is None:
+        return jsonify({'error': 'Unknown session'}), 404
+    entries = session_entries(session)
+    if entries is None:
+        return jsonify({'error': 'A dataset of this session is no longer available; please upload it again'}), 410
+    
+    start = request.args.get('start', type=float)
+    end = request.args.get('end', type=float)
+    max_points = min(request.args.get('max_points', app.config['PLOT_MAX_POINTS'], type=int),
+                     app.config['PLOT_MAX_POINTS'])
+    with metrics.timer('stage_seconds', stage='session_window'):
+        if request.args.get('mode') == 'resample':
+            points = min(request.args.get('points', max_points, type=int), app.config['PLOT_MAX_POINTS'])
+            try:
+                result = resampled_window(session, entries, start, end, max(1, points))
+            except SessionError as e:
+                return jsonify({'error': str(e)}), 400
+        else:
+            result = aligned_window(session, entries, start, end, max_points)
+    return json_response(result)
+
+@app.route('/api/sessions/<session_id>', methods=['DELETE'])
+def delete_session(session_id):
+    """Forget a session (its datasets and videos stay)"""
+    if session_store.discard(session_id) is None:
+        return jsonify({'error': 'Unknown session'}), 404
+    return '', 204
+
+@app.route('/api/live', methods=['POST'])
+def create_live_stream():
+    """
+    Open a live stream for a device bridge to append to
+    Body: {optional "participant_id", optional "rate" (Hz; lets batches omit timestamps)}
+    """
+    body = request.get_json(silent=True) or {}
+    rate = body.get('rate')
+    if rate is not None and (not isinstance(rate, (int, float)) or rate <= 0):
+        return jsonify({'error': 'rate must be a positive number of samples per second'}), 400
+    try:
+        stream = live_streams.create(str(body.get('participant_id') or 'Live'), rate)
+    except LiveError as e:
+        return jsonify({'error': str(e)}), 409
+    return jsonify(stream.to_dict()), 201
+
+@app.route('/api/live/<stream_id>/samples', methods=['POST'])
+def append_live_samples(stream_id):
+    """
+    Append one batch: {"values": [...], optional "timestamps": [epoch seconds]}
+    Without timestamps the batch continues at the stream's rate
+    """
+    stream = live_streams.get(stream_id)
+    if stream is None:
+        return jsonify({'error': 'Unknown live stream'}), 404
+    body = request.get_json(silent=True) or {}
+    timestamps = body.get('timestamps')
+    try:
+        with np.errstate(over='ignore'):  # Out-of-range times become inf and are rejected by append
+            timestamps_ns = None if timestamps is None else np.round(np.asarray(timestamps, dtype=np.float64) * 1e9)
+        with metrics.timer('stage_seconds', stage='live_append'):
+            event = stream.append(body.get('values') or [], timestamps_ns)
+    except (LiveError, TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    metrics.count('live_samples_total', len(body['values']))
+    return jsonify({'event_id': event['id'], 'stats': event['stats']})
+
+@app.route('/api/live/<stream_id>')
+def live_stream_info(stream_id):
+    """Running stats and the latest event id of a live stream"""
+    stream = live_streams.get(stream_id)
+    if stream is None:
+        return jsonify({'error': 'Unknown live stream'}), 404
+    return jsonify(stream.to_dict())
+
+@app.route('/api/live/<stream_id>/window')
+def live_stream_window(stream_id):
+    """
+    Decimated points of the last ?seconds= of a live stream (all retained data by default)
+    Taken from the raw tail or the finest LOD level that covers the window;
+    last_event_id tells the client where its event subscription should resume
+    """
+    stream = live_streams.get(stream_id)
+    if stream is None:
+        return jsonify({'error': 'Unknown live stream'}), 404
+    max_points = min(request.args.get('max_points', app.config['PLOT_MAX_POINTS'], type=int),
+                     app.config['PLOT_MAX_POINTS'])
+    last_event_id = stream.event_id
+    level, seconds, values = stream.window(request.args.get('seconds', type=float), max(2, max_points))
+    return json_response({'level': level, 'seconds': seconds, 'eda_values': values,
+                          'last_event_id': last_event_id, **stream.to_dict()})
+
+def sse_message(event, data, event_id=None):
+    """One server-sent event; data is already JSON-encoded"""
+    return (f"id: {event_id}\n" if event_id is not None else '') + f"event: {event}\ndata: {data}\n\n"
+
+@app.route('/api/live/<stream_id>/events')
+def live_stream_events(stream_id):
+    """
+    Server-sent events: one 'batch' per appended batch (decimated points plus
+    running stats), 'reset' when the client fell behind the backlog (reload the
+    window), 'end' when the stream is closed. Resumes after Last-Event-ID (or
+    ?last_event_id=); without one, only batches from now on are sent
+    Each connection holds a server thread, so connections are capped (503 when
+    full) and ended after LIVE_MAX_CONNECTION_SECONDS; EventSource reconnects
+    on its own and resumes from Last-Event-ID
+    """
+    stream = live_streams.get(stream_id)
+    if stream is None:
+        return jsonify({'error': 'Unknown live stream'}), 404
+    last_id = request.headers.get('Last-Event-ID', type=int)
+    if last_id is None:
+        last_id = request.args.get('last_event_id', stream.event_id, type=int)
+    heartbeat = app.config['LIVE_HEARTBEAT_SECONDS']
+    deadline = time.monotonic() + app.config['LIVE_MAX_CONNECTION_SECONDS']
+    try:
+        live_streams.subscribe(stream)
+    except LiveError as e:
+        return jsonify({'error': str(e)}), 503
+    
+    def generate(last_id):
+        yield "retry: 2000\n\n"
+        while time.monotonic() < deadline:
+            events = stream.events_after(last_id, heartbeat)
+            if events is None:
+                last_id = stream.event_id
+                yield sse_message('reset', json.dumps({'last_event_id': last_id}))
+                continue
+            for event_id, data in events:
+                yield sse_message('batch', data, event_id)
+                last_id = event_id
+            if stream.closed and stream.event_id <= last_id:
+                yield sse_message('end', json.dumps(stream.stats()))
+                return
+            if not events:
+                yield ': keep-alive\n\n'  # Also how a closed client connection is noticed
+    
+    response = Response(generate(last_id), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # Released however the connection ends (disconnect, deadline, 'end', or never iterated)
+    response.call_on_close(lambda: live_streams.unsubscribe(stream))
+    return response
+
+@app.route('/api/live/<stream_id>', methods=['DELETE'])
+def delete_live_stream(stream_id):
+    """Close a live stream; subscribers get a final 'end' event"""
+    if live_streams.discard(stream_id) is None:
+        return jsonify({'error': 'Unknown live stream'}), 404
+    return '', 204
+
+@app.route('/api/cache')
+def cache_stats():
+    """
+    Dataset cache counters (hits, misses, evictions, resident bytes)
+    """
+    return jsonify(dataset_cache.stats())
+
+@app.route('/metrics')
+def metrics_endpoint():
+    """
+    Stage timings, request latencies, payload sizes and video bytes served as
+    histograms and counters, plus cache/job gauges
+    Prometheus text exposition by default; ?format=json for bucket-estimated percentiles
+    """
+    gauges = {f"dataset_cache_{key}": value for key, value in dataset_cache.stats().items()}
+    gauges.update({f"jobs_{status}": n for status, n in job_queue.stats().items()})
+    gauges['live_streams'] = len(live_streams)
+    if request.args.get('format') == 'json':
+        return jsonify({'metrics': metrics.REGISTRY.snapshot(), 'gauges': gauges})
+    return Response(metrics.REGISTRY.render_prometheus(gauges), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/profiles')
+def profile_list():
+    """Stored request profiles, newest first (PROFILE_REQUESTS must be on)"""
+    if not app.config['PROFILE_REQUESTS']:
+        abort(404)
+    folder = Path(app.config['PROFILE_FOLDER'])
+    paths = sorted(folder.glob('*.prof'), key=lambda p: p.stat().st_mtime, reverse=True) if folder.is_dir() else []
+    return jsonify({'profiles': [{'name': p.name, 'url': url_for('profile_detail', name=p.name),
+                                  'bytes': p.stat().st_size} for p in paths]})
+
+@app.route('/api/profiles/<name>')
+def profile_detail(name):
+    """
+    Text report of a stored profile (?lines=N), or the raw .prof file with
+    ?format=raw for snakeviz / pstats
+    """
+    if not app.config['PROFILE_REQUESTS']:
+        abort(404)
+    path = Path(app.config['PROFILE_FOLDER']) / secure_filename(name)
+    if not name.endswith('.prof') or not path.is_file():
+        return jsonify({'error': 'Unknown profile'}), 404
+    if request.args.get('format') == 'raw':
+        return send_file(path.resolve(), mimetype='application/octet-stream', as_attachment=True)
+    return Response(profile_report(path, request.args.get('lines', type=int)), mimetype='text/plain')
+
+@app.context_processor
+def asset_urls():
+    """Fingerprinted vendor script URLs for templates"""
+    return {'plotly_js_url': url_for('vendor_asset', filename=static_assets.plotly_bundle().filename)}
+
+@app.route('/assets/<filename>')
+def vendor_asset(filename):
+    """
+    Serve a fingerprinted vendor bundle (plotly.js) with immutable caching
+    The name changes whenever the content does, so browsers never revalidate;
+    the ETag still answers conditional requests with 304
+    """
+    bundle = static_assets.bundle_for(filename)
+    if bundle is None:
+        return jsonify({'error': 'Asset not found'}), 404
+    
+    gzip_ok = 'gzip' in (request.headers.get('Accept-Encoding') or '')
+    response = Response(bundle.gzip_body if gzip_ok else bundle.body, mimetype=bundle.mimetype)
+    if gzip_ok:
+        response.headers['Content-Encoding'] = 'gzip'
+    response.headers['Vary'] = 'Accept-Encoding'
+    response.headers['Cache-Control'] = static_assets.CACHE_CONTROL
+    response.set_etag(bundle.etag('gzip' if gzip_ok else None))
+    return response.make_conditional(request)
 
 @app.route('/about')
 def about():
@@ -497,33 +1295,33 @@ def about():
     """
     return render_template('about.html')
 
+@app.route('/healthz')
+def healthz():
+    """
+    Liveness check for load balancers and process managers
+    Touches no datasets and imports nothing heavy; lists which heavy modules this worker has loaded
+    """
+    return jsonify({'status': 'ok', 'pid': os.getpid(), 'heavy_modules': warmup.loaded()})
+
 
 @app.route('/static/videos/<filename>')
 def serve_video(filename):
     """
-    Serve video files with proper MIME types and headers for AVI support
+    Serve video files with proper MIME types (including AVI) for playback and seeking
+    Strong ETag plus immutable caching; single and multi-range requests, HEAD
+    and conditional requests are answered from the cached stat result, and
+    ranges go out through the server's zero-copy file wrapper (see video_delivery)
     """
-    video_path = os.path.join(app.config['VIDEO_FOLDER'], filename)
-    
-    # Determine MIME type based on file extension
-    ext = filename.rsplit('.', 1)[1].lower() if '.' in filename else ''
-    mime_types = {
-        'mp4': 'video/mp4',
-        'webm': 'video/webm',
-        'ogg': 'video/ogg',
-        'avi': 'video/x-msvideo',
-        'mov': 'video/quicktime'
-    }
-    
-    mimetype = mime_types.get(ext, 'application/octet-stream')
+    video = video_catalog.lookup(filename)
+    if video is None:
+        return jsonify({'error': 'Video not found'}), 404
     
-    # Use send_file with explicit mimetype and support for range requests
-    return send_file(
-        video_path,
-        mimetype=mimetype,
-        as_attachment=False,
-        conditional=True  # Enables range request support for video seeking
-    )
+    response = video_delivery.serve(video, request)
+    # Content-Length is the range (or multipart) length for 206 responses and unset for 304s
+    if request.method != 'HEAD':
+        metrics.count('video_bytes_served_total', response.content_length or 0)
+    metrics.count('video_requests_total', status=response.status_code)
+    return response
 
 
 if __name__ == '__main__':
@@ -0,0 +1,209 @@
+"""
+Batch Processing
+Process a whole study directory of EDA recordings (and camera videos) at once
+- Each recording is parsed in its own worker process (ProcessPoolExecutor), so
+  throughput scales with cores instead of being bound by one interpreter
+- Videos are paired with recordings by the start timestamp in their filename
+- Writes per-participant stats and precomputed plot data, plus a study summary
+
+Usage (from the webapp/ directory):
+    python batch.py path/to/study -o path/to/output --workers 8
+"""
+
+import argparse
+import csv
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from eda_index import TimeIndex
+from eda_lod import LODPyramid
+from eda_service import (process_eda_file, window_stats, parse_video_start_datetime_from_filename)
+from video_probe import probe_video, ProbeError
+
+CSV_EXTENSIONS = {'.csv'}
+VIDEO_EXTENSIONS = {'.mp4', '.webm', '.ogg', '.mov', '.avi'}
+PLOT_MAX_POINTS = 4000
+PAIRING_TOLERANCE_SECONDS = 300  # Videos may start this long before the recording
+SUMMARY_FIELDS = ['name', 'participant_id', 'csv', 'rows', 'missing', 'mean', 'std', 'min', 'max', 'start_time',
+                  'end_time', 'date', 'video', 'video_offset_seconds', 'video_duration', 'window_mean',
+                  'window_min', 'window_max', 'window_count', 'seconds', 'error']
+
+
+def discover(input_dir, exclude=None):
+    """(csv paths, video paths) anywhere under input_dir except exclude, in a stable order"""
+    csv_paths, video_paths = [], []
+    exclude = os.path.realpath(exclude) if exclude else None
+    for root, dirs, names in os.walk(input_dir):
+        # Skip the output directory so re-runs don't pick up summary.csv
+        dirs[:] = [d for d in dirs if os.path.realpath(os.path.join(root, d)) != exclude]
+        for name in sorted(names):
+            ext = os.path.splitext(name)[1].lower()
+            if ext in CSV_EXTENSIONS:
+                csv_paths.append(os.path.join(root, name))
+            elif ext in VIDEO_EXTENSIONS:
+                video_paths.append(os.path.join(root, name))
+    return sorted(csv_paths), sorted(video_paths)
+
+
+def video_candidates(video_paths):
+    """Videos whose filename carries a start timestamp, with probed durations"""
+    candidates = []
+    for path in video_paths:
+        start = parse_video_start_datetime_from_filename(os.path.basename(path))
+        if start is None:
+            continue
+        try:
+            duration = probe_video(path)['duration']
+        except (ProbeError, OSError):
+            duration = None
+        candidates.append({'path': path, 'start': start.timestamp(), 'duration': duration})
+    return candidates
+
+
+def pick_video(candidates, start_epoch, end_epoch):
+    """The video starting closest to the recording start while overlapping it, or None"""
+    overlapping = [c for c in candidates
+                   if start_epoch - PAIRING_TOLERANCE_SECONDS <= c['start'] <= end_epoch]
+    return min(overlapping, key=lambda c: abs(c['start'] - start_epoch), default=None)
+
+
+def output_name(csv_path, input_dir):
+    """Output stem unique within the study: the CSV path relative to input_dir"""
+    relative = os.path.splitext(os.path.relpath(csv_path, input_dir))[0]
+    return relative.replace(os.sep, '__')
+
+
+def process_recording(csv_path, input_dir, output_dir, candidates, max_points=PLOT_MAX_POINTS):
+    """
+    Worker: parse one recording, pair it with a video and write its outputs
+    Returns the summary row; failures are reported in the row instead of raised
+    """
+    start = time.perf_counter()
+    name = output_name(csv_path, input_dir)
+    row = {'name': name, 'csv': csv_path}
+
+    result, error = process_eda_file(csv_path)
+    if error:
+        row.update({'error': error, 'seconds': round(time.perf_counter() - start, 4)})
+        return row
+
+    dataset, stats = result['dataset'], result['stats']
+    index = TimeIndex(dataset.epoch_ns)
+    lod = LODPyramid(dataset.values, index)
+    row.update({'participant_id': dataset.participant_id, 'rows': len(dataset), **stats})
+
+    # Pair with the camera file whose filename timestamp falls in this recording
+    start_epoch = int(dataset.epoch_ns[0]) / 1e9
+    video = pick_video(candidates, start_epoch, int(dataset.epoch_ns[-1]) / 1e9)
+    window = None
+    if video:
+        offset = video['start'] - start_epoch
+        row.update({'video': video['path'], 'video_offset_seconds': offset, 'video_duration': video['duration']})
+        if video['duration']:
+            lo, hi = index.sample_range(offset, offset + video['duration'])
+            window = window_stats(dataset, lo, hi)
+            row.update({f'window_{key}': value for key, value in window.items()})
+
+    # Precomputed overview: the same min/max-decimated points the plot would request
+    level, indices = lod.query(None, None, max_points)
+    plot = {
+        'level': level,
+        'time_origin': dataset.first_datetime.tz_localize(None).isoformat(),
+        'indices': indices.tolist(),
+        'timestamps_seconds': dataset.seconds_at(indices).tolist(),
+        'eda_values': dataset.values[indices].tolist()
+    }
+
+    with open(os.path.join(output_dir, name + '.stats.json'), 'w') as f:
+        json.dump({**row, 'video_window': window}, f, indent=2)
+    with open(os.path.join(output_dir, name + '.plot.json'), 'w') as f:
+        json.dump(plot, f)
+
+    row['seconds'] = round(time.perf_counter() - start, 4)
+    return row
+
+
+def run_batch(input_dir, output_dir, workers=None, max_points=PLOT_MAX_POINTS, mp_context=None,
+              progress=None):
+    """
+    Process every CSV under input_dir across a process pool
+    progress(done, total, row) is called in the parent as recordings finish
+    Returns a report with per-recording rows and throughput figures
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    csv_paths, video_paths = discover(input_dir, exclude=output_dir)
+    candidates = video_candidates(video_paths)
+    workers = workers or os.cpu_count() or 1
+    total_bytes = sum(os.path.getsize(p) for p in csv_paths)
+
+    start = time.perf_counter()
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context) as pool:
+        futures = [pool.submit(process_recording, path, input_dir, output_dir, candidates, max_points)
+                   for path in csv_paths]
+        for future in as_completed(futures):
+            rows.append(future.result())
+            if progress:
+                progress(len(rows), len(futures), rows[-1])
+    elapsed = time.perf_counter() - start
+
+    rows.sort(key=lambda r: r['name'])
+    claims = {}
+    for r in rows:
+        if r.get('video'):
+            claims.setdefault(r['video'], []).append(r['name'])
+    report = {
+        'input_dir': input_dir,
+        'output_dir': output_dir,
+        'workers': workers,
+        'recordings': len(rows),
+        'failed': sum(1 for r in rows if r.get('error')),
+        'videos': len(video_paths),
+        'paired': sum(1 for r in rows if r.get('video')),
+        # A video overlapping several recordings is paired with each; list them for review
+        'shared_videos': {video: names for video, names in claims.items() if len(names) > 1},
+        'seconds': round(elapsed, 4),
+        'recordings_per_second': len(rows) / elapsed if elapsed else None,
+        'rows_per_second': sum(r.get('rows', 0) for r in rows) / elapsed if elapsed else None,
+        'mb_per_second': total_bytes / 1e6 / elapsed if elapsed else None,
+        'results': rows
+    }
+
+    with open(os.path.join(output_dir, 'summary.csv'), 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+    with open(os.path.join(output_dir, 'summary.json'), 'w') as f:
+        json.dump({k: v for k, v in report.items() if k != 'results'}, f, indent=2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('input_dir', help='Directory of EDA CSVs and camera videos (searched recursively)')
+    parser.add_argument('-o', '--output', default=None, help='Output directory (default: <input_dir>/batch_output)')
+    parser.add_argument('--workers', type=int, default=None, help='Worker processes (default: all cores)')
+    parser.add_argument('--max-points', type=int, default=PLOT_MAX_POINTS, help='Points per precomputed plot')
+    args = parser.parse_args()
+
+    output_dir = args.output or os.path.join(args.input_dir, 'batch_output')
+
+    def progress(done, total, row):
+        status = row.get('error') or f"{row.get('rows', 0):,} rows" + (
+            f", video {Path(row['video']).name}" if row.get('video') else '')
+        print(f"[{done}/{total}] {row['name']}: {status}")
+
+    report = run_batch(args.input_dir, output_dir, args.workers, args.max_points, progress=progress)
+    print(f"\n{report['recordings']} recordings ({report['failed']} failed, {report['paired']} paired with video) "
+          f"in {report['seconds']:.2f} s on {report['workers']} workers")
+    if report['recordings_per_second']:
+        print(f"{report['recordings_per_second']:.1f} recordings/s, {report['rows_per_second']:,.0f} rows/s, "
+              f"{report['mb_per_second']:.1f} MB/s")
+    print(f"Summary written to {os.path.join(output_dir, 'summary.csv')}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+"""
+Analysis Benchmark
+Times the tonic/phasic decomposition and SCR detection stage (eda_analysis)
+on the bundled EDA.csv and on longer recordings built by tiling it, and checks
+that chunked processing matches a single pass over the whole series
+
+Usage (from the webapp/ directory):
+    python benchmarks/bench_analysis.py --repeat 10 --tile 10 100
+"""
+
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from eda_analysis import CHUNK_SAMPLES, analyze  # noqa: E402
+from eda_ingest import load_eda_dataset  # noqa: E402
+
+BUNDLED_CSV = Path(__file__).resolve().parents[2] / 'EDA.csv'
+
+
+def time_call(fn, *args, repeat=3):
+    """Best wall-clock time over a few runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_scratch(fn, *args):
+    """Peak bytes allocated while fn runs, excluding its retained result"""
+    tracemalloc.start()
+    result = fn(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - result.nbytes
+
+
+def tiled(epoch_ns, values, times):
+    """A recording times as long: the samples repeated on a continuous time axis"""
+    period = int(np.median(np.diff(epoch_ns)))
+    n = len(values) * times
+    return epoch_ns[0] + np.arange(n, dtype=np.int64) * period, np.tile(values, times)
+
+
+def bench(label, epoch_ns, values, repeat):
+    rows = len(values)
+    seconds = time_call(analyze, epoch_ns, values, repeat=repeat)
+    result = analyze(epoch_ns, values)
+    scratch = peak_scratch(analyze, epoch_ns, values)
+    print(f"{label:<22} {rows:>11,} rows  {seconds * 1e3:>9.1f} ms  {rows / seconds:>13,.0f} rows/s  "
+          f"{len(result.scr_peaks):>7,} SCRs  scratch {scratch / 1e6:>7.1f} MB")
+
+
+def check_chunking(epoch_ns, values):
+    """Chunk boundaries must not change the result"""
+    whole = analyze(epoch_ns, values, chunk_samples=len(values))
+    for chunk in (997, 4096, CHUNK_SAMPLES):
+        part = analyze(epoch_ns, values, chunk_samples=chunk)
+        same = (np.array_equal(whole.tonic, part.tonic) and np.array_equal(whole.scr_peaks, part.scr_peaks)
+                and np.array_equal(whole.scr_onsets, part.scr_onsets))
+        print(f"chunk {chunk:>6,} samples: {'matches' if same else 'DIFFERS from'} single pass")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--csv', default=str(BUNDLED_CSV))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--tile', type=int, nargs='+', default=[10, 100],
+                        help='Also run on the recording repeated this many times')
+    args = parser.parse_args()
+
+    dataset = load_eda_dataset(args.csv)
+    epoch_ns = np.asarray(dataset.epoch_ns, dtype=np.int64)
+    values = np.asarray(dataset.values)
+
+    bench(Path(args.csv).name, epoch_ns, values, args.repeat)
+    for times in args.tile:
+        bench(f"{Path(args.csv).name} x{times}", *tiled(epoch_ns, values, times), repeat=max(1, args.repeat // 2))
+    print()
+    check_chunking(epoch_ns, values)
+
+
+if __name__ == '__main__':
+    main()
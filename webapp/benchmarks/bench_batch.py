@@ -0,0 +1,65 @@
+"""
+Batch Scaling Benchmark
+Runs batch.run_batch over a synthetic study with 1, 2, 4 ... worker processes
+and reports throughput and speedup over a single worker
+
+Usage (from the webapp/ directory):
+    python benchmarks/bench_batch.py --files 64 --rows 200000
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from batch import run_batch  # noqa: E402
+from bench_ingest import write_empatica_csv  # noqa: E402
+
+
+def worker_counts(max_workers):
+    counts, n = [], 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    return counts + [max_workers]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--files', type=int, default=32, help='Recordings in the synthetic study')
+    parser.add_argument('--rows', type=int, default=200_000, help='Samples per recording')
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix='eda_batch_bench_')
+    try:
+        study = os.path.join(tmp, 'study')
+        os.makedirs(study)
+        template = os.path.join(tmp, 'template.csv')
+        write_empatica_csv(template, args.rows)
+        for i in range(args.files):
+            shutil.copyfile(template, os.path.join(study, f'P{i:03d}_EDA.csv'))
+        size_mb = args.files * os.path.getsize(template) / 1e6
+        print(f"{args.files} recordings x {args.rows:,} rows ({size_mb:.1f} MB), "
+              f"{os.cpu_count()} cores\n")
+
+        print(f"{'workers':>7} {'seconds':>9} {'files/s':>9} {'rows/s':>13} {'MB/s':>8} {'speedup':>8}")
+        baseline = None
+        for workers in worker_counts(args.max_workers):
+            report = run_batch(study, os.path.join(tmp, f'out_{workers}'), workers)
+            if report['failed']:
+                raise SystemExit(f"{report['failed']} recordings failed")
+            baseline = baseline or report['seconds']
+            print(f"{workers:>7} {report['seconds']:>9.2f} {report['recordings_per_second']:>9.1f} "
+                  f"{report['rows_per_second']:>13,.0f} {report['mb_per_second']:>8.1f} "
+                  f"{baseline / report['seconds']:>7.2f}x")
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
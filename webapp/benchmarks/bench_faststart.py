@@ -0,0 +1,140 @@
+"""
+Faststart Benchmark
+Builds synthetic camera-style MP4s (moov written after mdat), moves moov to
+the front with video_faststart, checks every chunk offset still lands on its
+chunk, and reports remux throughput and how many bytes a sequential reader
+(a browser playing a progressive download) needs before the first frame
+
+Usage (from the webapp/ directory):
+    python benchmarks/bench_faststart.py --size-mb 64 512 --chunks 20000 --mbps 50
+"""
+
+import argparse
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from video_faststart import faststart, moov_layout  # noqa: E402
+from video_probe import probe_video  # noqa: E402
+
+TIMESCALE = 30000
+FRAME_TICKS = 1001  # 29.97 fps
+MARKER = b'EDACHUNK'
+
+
+def box(kind, *payload):
+    body = b''.join(payload)
+    return struct.pack('>I4s', len(body) + 8, kind) + body
+
+
+def moov_box(chunk_offsets, chunk_size, co64):
+    """moov for one video track with one sample per chunk"""
+    count = len(chunk_offsets)
+    duration = count * FRAME_TICKS
+    matrix = struct.pack('>9I', 0x10000, 0, 0, 0, 0x10000, 0, 0, 0, 0x40000000)
+    mvhd = box(b'mvhd', struct.pack('>IIIII', 0, 0, 0, TIMESCALE, duration), struct.pack('>IH10x', 0x10000, 0x100),
+               matrix, bytes(24), struct.pack('>I', 2))
+    tkhd = box(b'tkhd', struct.pack('>IIIIII8xHHHH', 3, 0, 0, 1, 0, duration, 0, 0, 0, 0), matrix,
+               struct.pack('>II', 1920 << 16, 1080 << 16))
+    mdhd = box(b'mdhd', struct.pack('>IIIIIHH', 0, 0, 0, TIMESCALE, duration, 0x55c4, 0))
+    hdlr = box(b'hdlr', struct.pack('>II4s12x', 0, 0, b'vide'), b'VideoHandler\x00')
+    avc1 = box(b'avc1', bytes(6), struct.pack('>H16xHH', 1, 1920, 1080), bytes(50))
+    stsd = box(b'stsd', struct.pack('>II', 0, 1), avc1)
+    stts = box(b'stts', struct.pack('>III', 0, 1, count), struct.pack('>I', FRAME_TICKS))
+    stsc = box(b'stsc', struct.pack('>IIIII', 0, 1, 1, 1, 1))
+    stsz = box(b'stsz', struct.pack('>III', 0, chunk_size, count))
+    offsets = np.asarray(chunk_offsets, dtype='>u8' if co64 else '>u4').tobytes()
+    stco = box(b'co64' if co64 else b'stco', struct.pack('>II', 0, count), offsets)
+    stbl = box(b'stbl', stsd, stts, stsc, stsz, stco)
+    minf = box(b'minf', box(b'vmhd', bytes(12)), stbl)
+    trak = box(b'trak', tkhd, box(b'mdia', mdhd, hdlr, minf))
+    return box(b'moov', mvhd, trak)
+
+
+def write_camera_mp4(path, size_mb, chunks, co64=False):
+    """ftyp, mdat (chunks tagged with their index), then moov: the layout camera exports use"""
+    ftyp = box(b'ftyp', b'isom', struct.pack('>I', 512), b'isomiso2avc1mp41')
+    chunk_size = (size_mb << 20) // chunks
+    media_start = len(ftyp) + 8
+    filler = np.random.default_rng(0).integers(0, 256, chunk_size, dtype=np.uint8).tobytes()
+    with open(path, 'wb') as f:
+        f.write(ftyp)
+        f.write(struct.pack('>I4s', chunks * chunk_size + 8, b'mdat'))
+        for i in range(chunks):
+            tag = MARKER + struct.pack('>Q', i)
+            f.write(tag + filler[len(tag):])
+        f.write(moov_box(media_start + np.arange(chunks, dtype=np.int64) * chunk_size, chunk_size, co64))
+
+
+def verify(path, expected):
+    """moov first, same probe results, and every chunk offset still points at its tagged chunk"""
+    if moov_layout(path) is not None:
+        raise SystemExit("moov is still after mdat")
+    probe = probe_video(path)
+    if (probe['duration'], probe['frame_count']) != (expected['duration'], expected['frame_count']):
+        raise SystemExit(f"probe changed: {probe} vs {expected}")
+
+    with open(path, 'rb') as f:
+        data = f.read(1 << 20)
+    moov = data.index(b'moov') - 4
+    table = data.find(b'stco', moov)
+    wide = table < 0
+    table = data.index(b'co64', moov) if wide else table
+    (count,) = struct.unpack_from('>I', data, table + 8)
+    offsets = np.frombuffer(data, dtype='>u8' if wide else '>u4', count=count, offset=table + 12)
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        for i in np.linspace(0, count - 1, min(count, 2000)).astype(np.int64):
+            tag = os.pread(fd, 16, int(offsets[i]))
+            if tag != MARKER + struct.pack('>Q', int(i)):
+                raise SystemExit(f"chunk {i} offset {offsets[i]} no longer points at its data")
+    finally:
+        os.close(fd)
+    return moov + struct.unpack_from('>I', data, moov)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size-mb', type=int, nargs='+', default=[64, 512])
+    parser.add_argument('--chunks', type=int, default=20_000, help='Chunks (frames) per file')
+    parser.add_argument('--mbps', type=float, default=50, help='Link speed for the first-frame estimate')
+    parser.add_argument('--co64', action='store_true', help='Write 64-bit chunk offsets')
+    args = parser.parse_args()
+    bytes_per_second = args.mbps * 1e6 / 8
+
+    tmp = tempfile.mkdtemp(prefix='eda_faststart_bench_')
+    try:
+        print(f"{args.chunks:,} chunks, {'co64' if args.co64 else 'stco'}, first frame estimated at "
+              f"{args.mbps:g} Mbit/s (sequential fetch)\n")
+        print(f"{'size MB':>8} {'remux s':>8} {'MB/s':>8} {'moov KB':>8} {'before: bytes':>14} {'s':>7} "
+              f"{'after: bytes':>13} {'s':>7}")
+        for size_mb in args.size_mb:
+            path = os.path.join(tmp, f'SYS1Cam3--2018-05-14_10_22_27_{size_mb}.mp4')
+            write_camera_mp4(path, size_mb, args.chunks, args.co64)
+            expected = probe_video(path)
+            size = os.path.getsize(path)
+            moov_start, moov_end, _ = moov_layout(path)
+
+            start = time.perf_counter()
+            faststart(path)
+            seconds = time.perf_counter() - start
+            header_bytes = verify(path, expected)
+
+            print(f"{size / 1e6:>8.0f} {seconds:>8.2f} {size / 1e6 / seconds:>8.0f} "
+                  f"{(moov_end - moov_start) / 1e3:>8.0f} {size:>14,} {size / bytes_per_second:>7.2f} "
+                  f"{header_bytes:>13,} {header_bytes / bytes_per_second:>7.2f}")
+            os.remove(path)
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
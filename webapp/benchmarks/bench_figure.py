@@ -0,0 +1,95 @@
+"""
+Figure Serialization Benchmark
+Compares how the plot reaches the browser: the previous go.Figure + to_html
+path (with and without plotly.js inlined), go.Figure + to_json, and the
+figure dict that create_eda_plot now emits directly
+
+Usage (from the webapp/ directory):
+    python benchmarks/bench_figure.py --rows 1000000 --csv ../EDA.csv
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import plotly.graph_objects as go
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app import app, create_eda_plot  # noqa: E402
+from bench_ingest import write_empatica_csv  # noqa: E402
+from dataset_cache import build_entry  # noqa: E402
+from eda_ingest import load_eda_dataset  # noqa: E402
+
+
+def time_call(fn, repeat=5):
+    """(best milliseconds, result) over repeat runs"""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3, result
+
+
+def graph_objects_figure(dataset, stats, lod):
+    """The figure as the previous create_eda_plot built it, on the same LOD points"""
+    _, indices = lod.query(None, None, app.config['PLOT_MAX_POINTS'])
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=dataset.datetimes(indices).tz_localize(None), y=dataset.values[indices],
+        mode='lines', name='EDA Signal', line=dict(color='steelblue', width=2),
+        fill='tozeroy', fillcolor='rgba(70, 130, 180, 0.2)', customdata=indices,
+        hovertemplate='<b>Time:</b> %{x|%I:%M:%S %p}<br><b>EDA:</b> %{y:.3f} µS<extra></extra>'))
+    fig.add_hline(y=stats['mean'], line_dash="dash", line_color="red",
+                  annotation_text=f"Mean: {stats['mean']:.3f} µS", annotation_position="right")
+    fig.update_layout(title=f'Electrodermal Activity - {dataset.participant_id}',
+                      xaxis_title='Time (EST)', yaxis_title='EDA (µSiemens)', hovermode='x unified',
+                      template='plotly_white', height=400, margin=dict(l=50, r=50, t=100, b=50))
+    fig.update_xaxes(tickformat='%I:%M:%S %p', nticks=15, tickangle=-45, rangeslider_visible=True)
+    return fig
+
+
+def bench_file(label, csv_path):
+    entry = build_entry(load_eda_dataset(csv_path))
+    dataset, stats, lod = entry['dataset'], entry['stats'], entry['lod']
+    create_eda_plot(dataset, stats, lod=lod)  # Warm the template cache, as a running server would
+
+    variants = (
+        ('to_html + plotly.js', lambda: graph_objects_figure(dataset, stats, lod).to_html(
+            full_html=False, include_plotlyjs=True, div_id='plotly-chart')),
+        ('to_html', lambda: graph_objects_figure(dataset, stats, lod).to_html(
+            full_html=False, include_plotlyjs=False, div_id='plotly-chart')),
+        ('go.Figure.to_json', lambda: graph_objects_figure(dataset, stats, lod).to_json()),
+        ('figure dict', lambda: json.dumps(create_eda_plot(dataset, stats, lod=lod))),
+    )
+
+    print(f"{label:<22} {len(dataset):>12,} rows")
+    for name, fn in variants:
+        elapsed, body = time_call(fn)
+        print(f"{'':<22} {name:<20} {len(body.encode('utf-8')) / 1e3:10.1f} KB   {elapsed:8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000])
+    parser.add_argument('--csv', nargs='*', default=[], help='Real recordings to include')
+    args = parser.parse_args()
+
+    with app.app_context():
+        for path in args.csv:
+            bench_file(os.path.basename(path), path)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            for rows in args.rows:
+                csv_path = os.path.join(tmp, f'empatica_{rows}.csv')
+                write_empatica_csv(csv_path, rows)
+                bench_file(f'empatica {rows:,}', csv_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""
+Ingestion Benchmark
+Compares rows/sec of the single-pass engine (eda_ingest) against the
+legacy process_eda_file on synthetic files and the bundled EDA.csv
+
+Usage (from the webapp/ directory):
+    python benchmarks/bench_ingest.py --rows 100000 1000000
+"""
+
+import argparse
+import contextlib
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from eda_ingest import load_eda_dataset  # noqa: E402
+from legacy_ingest import legacy_process_eda_file  # noqa: E402
+
+BUNDLED_CSV = Path(__file__).resolve().parents[2] / 'EDA.csv'
+
+
+def write_empatica_csv(path, rows, rate=4.0):
+    """Headerless Empatica layout: start timestamp, sample rate, then samples"""
+    values = np.abs(np.random.default_rng(0).normal(1.0, 0.3, rows))
+    with open(path, 'w') as f:
+        f.write(f"{1526304383.0:f}\n{rate:f}\n")
+        np.savetxt(f, values, fmt='%f')
+
+
+def write_headered_csv(path, rows):
+    """Headered layout with timestamp_unix (ms) and eda_scl_usiemens columns"""
+    rng = np.random.default_rng(0)
+    ts = 1526304383000 + np.arange(rows, dtype=np.int64) * 250
+    values = np.abs(rng.normal(1.0, 0.3, rows))
+    with open(path, 'w') as f:
+        f.write('timestamp_unix,participant_full_id,eda_scl_usiemens\n')
+        for chunk in range(0, rows, 100_000):
+            part = slice(chunk, chunk + 100_000)
+            f.writelines(
+                f"{t},2414-1-1-BENCH,{v:.6f}\n" for t, v in zip(ts[part], values[part])
+            )
+
+
+def time_call(fn, *args, repeat=3):
+    """Best wall-clock time over a few runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run_legacy(path):
+    result, error = legacy_process_eda_file(path)
+    if error:
+        raise RuntimeError(error)
+    return result
+
+
+def run_engine(path):
+    dataset = load_eda_dataset(path)
+    dataset.stats()
+    return dataset
+
+
+def bench_file(label, path, repeat):
+    # Silence the legacy parser's DEBUG prints so they don't skew timings
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        rows = len(run_engine(path))
+        legacy = time_call(run_legacy, path, repeat=repeat)
+        engine = time_call(run_engine, path, repeat=repeat)
+    print(f"{label:<28} {rows:>10,} rows  "
+          f"legacy {rows / legacy:>12,.0f} rows/s  "
+          f"engine {rows / engine:>12,.0f} rows/s  "
+          f"speedup {legacy / engine:6.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = [('EDA.csv (bundled)', str(BUNDLED_CSV))] if BUNDLED_CSV.exists() else []
+        for rows in args.rows:
+            empatica = os.path.join(tmp, f'empatica_{rows}.csv')
+            headered = os.path.join(tmp, f'headered_{rows}.csv')
+            write_empatica_csv(empatica, rows)
+            write_headered_csv(headered, rows)
+            cases.append((f'empatica {rows:,}', empatica))
+            cases.append((f'headered {rows:,}', headered))
+
+        for label, path in cases:
+            bench_file(label, path, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
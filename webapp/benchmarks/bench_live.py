@@ -0,0 +1,137 @@
+"""
+Live Ingestion Benchmark
+A synthetic wristband (slow tonic drift, SCR bumps, sensor noise) appending
+batches to an eda_live stream: shows per-batch append cost and ring memory
+stay flat as the stream grows, and that window queries stay bounded
+
+With --url it acts as a local device bridge instead, feeding a running app
+in real time (open the page's Live Monitor with the printed stream id)
+
+Usage (from the webapp/ directory):
+    python benchmarks/bench_live.py --batch 32 --samples 20000000
+    python benchmarks/bench_live.py --url http://127.0.0.1:5000 --rate 4 --batch 4
+"""
+
+import argparse
+import http.client
+import json
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from eda_live import LiveStream  # noqa: E402
+
+
+class SyntheticWristband:
+    """Continuous EDA-like samples, one batch at a time"""
+
+    def __init__(self, rate, seed=0):
+        self.rate = rate
+        self.rng = np.random.default_rng(seed)
+        self.tonic = 2.0
+        self.phasic = 0.0
+
+    def batch(self, n):
+        steps = self.rng.normal(0, 0.002, n).cumsum()
+        tonic = np.clip(self.tonic + steps, 0.05, None)
+        self.tonic = float(tonic[-1])
+        # SCRs about every 20 s, each decaying over a few seconds
+        onsets = self.rng.random(n) < 1 / (20 * self.rate)
+        decay = np.exp(-1 / (2 * self.rate))
+        phasic = np.empty(n)
+        level = self.phasic
+        for i in range(n):
+            level = level * decay + (self.rng.uniform(0.1, 0.8) if onsets[i] else 0)
+            phasic[i] = level
+        self.phasic = level
+        return tonic + phasic + self.rng.normal(0, 0.005, n)
+
+
+def ring_bytes(stream):
+    rings = [stream.raw] + stream.levels
+    return sum(column.nbytes for ring in rings for column in ring.columns.values())
+
+
+def bench_in_process(args):
+    stream = LiveStream('Bench', args.rate)
+    band = SyntheticWristband(args.rate)
+    batches = [band.batch(args.batch) for _ in range(256)]  # Generated up front, outside the timing
+    checkpoints = np.unique(np.geomspace(args.batch * 1000, args.samples, 8).astype(np.int64) // args.batch)
+
+    print(f"batch {args.batch} samples at {args.rate:g} Hz; ring memory {ring_bytes(stream) / 1e6:.1f} MB\n")
+    print(f"{'samples':>12} {'hours':>8} {'append us':>10} {'window ms':>10} {'level':>6} {'points':>7}")
+    done = 0
+    for target in checkpoints:
+        # Fill up to just before the checkpoint untimed, then time the last 1000 batches
+        while done < target - 1000:
+            stream.append(batches[done % len(batches)])
+            done += 1
+        start = time.perf_counter()
+        while done < target:
+            stream.append(batches[done % len(batches)])
+            done += 1
+        append_us = (time.perf_counter() - start) / 1000 * 1e6
+
+        start = time.perf_counter()
+        level, seconds, _ = stream.window(None, 4000)
+        window_ms = (time.perf_counter() - start) * 1e3
+        print(f"{stream.count:>12,} {stream.count / args.rate / 3600:>8.1f} {append_us:>10.0f} "
+              f"{window_ms:>10.2f} {level:>6} {len(seconds):>7}")
+    print(f"\nring memory after {stream.count:,} samples: {ring_bytes(stream) / 1e6:.1f} MB")
+
+
+def feed_server(args):
+    """Create a live stream on the app and append batches in real time until interrupted"""
+    url = urlsplit(args.url)
+    conn = http.client.HTTPConnection(url.hostname, url.port or 80)
+
+    def post(path, body):
+        conn.request('POST', path, json.dumps(body), {'Content-Type': 'application/json'})
+        response = conn.getresponse()
+        payload = json.loads(response.read())
+        if response.status >= 400:
+            raise SystemExit(f"{path}: {response.status} {payload.get('error')}")
+        return payload
+
+    stream = post('/api/live', {'participant_id': 'Synthetic', 'rate': args.rate})
+    print(f"stream id {stream['stream_id']} (paste into the Live Monitor); Ctrl+C to stop")
+    band = SyntheticWristband(args.rate)
+    interval = args.batch / args.rate
+    next_send = time.monotonic()
+    latencies = []
+    try:
+        while True:
+            values = band.batch(args.batch)
+            start = time.perf_counter()
+            result = post(f"/api/live/{stream['stream_id']}/samples", {'values': values.tolist()})
+            latencies.append(time.perf_counter() - start)
+            if len(latencies) % max(1, int(10 / interval)) == 0:
+                print(f"{result['stats']['count']:>10,} samples, append p50 "
+                      f"{np.percentile(latencies, 50) * 1e3:.1f} ms, p99 {np.percentile(latencies, 99) * 1e3:.1f} ms")
+            next_send += interval
+            time.sleep(max(0, next_send - time.monotonic()))
+    except KeyboardInterrupt:
+        conn.request('DELETE', f"/api/live/{stream['stream_id']}")
+        conn.getresponse().read()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rate', type=float, default=4, help='Samples per second (E4 EDA is 4 Hz)')
+    parser.add_argument('--batch', type=int, default=32, help='Samples per appended batch')
+    parser.add_argument('--samples', type=int, default=20_000_000, help='Stream length to grow to (in-process)')
+    parser.add_argument('--url', help='Feed a running app at this base URL instead')
+    args = parser.parse_args()
+    if args.url:
+        feed_server(args)
+    else:
+        bench_in_process(args)
+
+
+if __name__ == '__main__':
+    main()
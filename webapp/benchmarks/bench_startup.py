@@ -0,0 +1,98 @@
+"""
+Startup Benchmark
+What a fresh app process pays before it can serve the pages: `import app` time,
+resident memory, and which heavy modules (pandas, plotly, ...) are loaded
+after the index/about pages, a health check and a video request, and after
+the first dataset is parsed
+- Every run is a new interpreter, so nothing is shared with the parent;
+  import time is the median of --repeat runs
+- --preload imports the heavy modules first, the way gunicorn.conf.py does in
+  the master with EDA_PRELOAD_HEAVY=1 (the worker then starts with them loaded)
+
+Usage (from the webapp/ directory):
+    python benchmarks/bench_startup.py --repeat 5
+    python benchmarks/bench_startup.py --preload
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+WEBAPP_DIR = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ['numpy', 'pandas', 'plotly.offline', 'plotly.io', 'plotly.graph_objects', 'plotly.express',
+                 'pyarrow']
+SAMPLE_CSV = WEBAPP_DIR.parent / 'EDA.csv'
+
+PROBE = r'''
+import json, sys, time
+
+def rss_mb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+heavy, preload, csv_path = json.loads(sys.argv[1])
+
+def loaded():
+    return [name for name in heavy if name in sys.modules]
+
+steps = []
+if preload:
+    start = time.perf_counter()
+    import warmup
+    warmup.preload()
+    steps.append({'step': 'preload (master)', 'seconds': time.perf_counter() - start, 'rss_mb': rss_mb(),
+                  'heavy': loaded()})
+
+start = time.perf_counter()
+import app
+steps.append({'step': 'import app', 'seconds': time.perf_counter() - start, 'rss_mb': rss_mb(), 'heavy': loaded()})
+
+client = app.app.test_client()
+for path in ['/', '/about', '/healthz', '/static/videos/startup-probe.mp4']:
+    start = time.perf_counter()
+    status = client.get(path).status_code
+    steps.append({'step': f'GET {path} ({status})', 'seconds': time.perf_counter() - start, 'rss_mb': rss_mb(),
+                  'heavy': loaded()})
+
+if csv_path:
+    from eda_service import process_eda_file
+    start = time.perf_counter()
+    process_eda_file(csv_path)
+    steps.append({'step': 'first CSV parse', 'seconds': time.perf_counter() - start, 'rss_mb': rss_mb(),
+                  'heavy': loaded()})
+print(json.dumps(steps))
+'''
+
+
+def run_probe(preload):
+    argument = json.dumps([HEAVY_MODULES, preload, str(SAMPLE_CSV) if SAMPLE_CSV.exists() else None])
+    result = subprocess.run([sys.executable, '-c', PROBE, argument], cwd=WEBAPP_DIR, capture_output=True,
+                            text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--preload', action='store_true', help='Import the heavy modules first (pre-fork master)')
+    parser.add_argument('--output', help='Also write the runs as JSON')
+    args = parser.parse_args()
+
+    runs = [run_probe(args.preload) for _ in range(args.repeat)]
+    print(f"{'step':<40} {'ms (median)':>12} {'RSS MB':>8}  heavy modules loaded")
+    for i, step in enumerate(runs[0]):
+        seconds = statistics.median(run[i]['seconds'] for run in runs)
+        rss = statistics.median(run[i]['rss_mb'] for run in runs)
+        print(f"{step['step']:<40} {seconds * 1e3:>12.1f} {rss:>8.1f}  {', '.join(step['heavy']) or '-'}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(runs, indent=2))
+
+
+if __name__ == '__main__':
+    main()
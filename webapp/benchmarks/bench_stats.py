@@ -0,0 +1,73 @@
+"""
+Window Statistics Benchmark
+Compares answering mean/std/min/max/count for random windows from the
+WindowStatsIndex (prefix sums + LOD buckets) against rescanning the samples
+
+Usage (from the webapp/ directory):
+    python benchmarks/bench_stats.py --rows 100000 10000000 --queries 2000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from eda_index import TimeIndex  # noqa: E402
+from eda_lod import LODPyramid  # noqa: E402
+from eda_stats import WindowStatsIndex  # noqa: E402
+
+
+def scan_stats(values, lo, hi):
+    """What window stats cost before the index: a pass over every sample"""
+    window = values[lo:hi]
+    return window.mean(), window.std(ddof=1), window.min(), window.max()
+
+
+def bench(rows, queries):
+    rng = np.random.default_rng(0)
+    values = np.abs(rng.normal(1.0, 0.3, rows))
+    epoch_ns = 1526304383 * 10 ** 9 + np.arange(rows, dtype=np.int64) * 250_000_000
+
+    start = time.perf_counter()
+    lod = LODPyramid(values, TimeIndex(epoch_ns))
+    build_lod = time.perf_counter() - start
+    start = time.perf_counter()
+    index = WindowStatsIndex(values, lod)
+    build_index = time.perf_counter() - start
+
+    # Window sizes spread log-uniformly from 10 samples to the whole series
+    sizes = np.exp(rng.uniform(np.log(10), np.log(rows), queries)).astype(np.int64)
+    los = (rng.random(queries) * (rows - sizes)).astype(np.int64)
+    windows = list(zip(los.tolist(), (los + sizes).tolist()))
+
+    start = time.perf_counter()
+    for lo, hi in windows:
+        index.stats(lo, hi)
+    indexed = (time.perf_counter() - start) / queries
+
+    start = time.perf_counter()
+    for lo, hi in windows:
+        scan_stats(values, lo, hi)
+    scanned = (time.perf_counter() - start) / queries
+
+    print(f"{rows:>12,} rows  build {build_index * 1e3:>8.1f} ms (LOD {build_lod * 1e3:.1f} ms)  "
+          f"index {index.nbytes / 1e6:>7.1f} MB  query {indexed * 1e6:>7.1f} µs  "
+          f"scan {scanned * 1e6:>9.1f} µs  speedup {scanned / indexed:>7.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000, 10_000_000])
+    parser.add_argument('--queries', type=int, default=1000)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        bench(rows, args.queries)
+
+
+if __name__ == '__main__':
+    main()
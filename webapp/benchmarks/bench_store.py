@@ -0,0 +1,75 @@
+"""
+Columnar Store Benchmark
+Compares reloading a recording from CSV text against opening its .edac store
+(memory-mapped), for a full reload and for a one-minute windowed read
+
+Usage (from the webapp/ directory):
+    python benchmarks/bench_store.py --rows 1000000 10000000
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_ingest import write_empatica_csv, write_headered_csv  # noqa: E402
+from eda_index import TimeIndex  # noqa: E402
+from eda_ingest import load_eda_dataset  # noqa: E402
+from eda_store import open_store, write_store  # noqa: E402
+
+
+def measure(fn):
+    """(seconds, peak heap bytes) for one call"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def window_mean(dataset, start, end):
+    lo, hi = TimeIndex(dataset.epoch_ns).sample_range(start, end)
+    return float(dataset.values[lo:hi].mean())
+
+
+def bench_file(label, csv_path, store_file):
+    dataset = load_eda_dataset(csv_path)
+    write_store(store_file, dataset, dataset.stats())
+    mid = dataset.seconds_at(len(dataset) // 2)
+
+    csv_reload, csv_mem = measure(lambda: load_eda_dataset(csv_path))
+    store_reload, store_mem = measure(lambda: open_store(store_file))
+    csv_window, _ = measure(lambda: window_mean(load_eda_dataset(csv_path), mid, mid + 60))
+    store_window, _ = measure(lambda: window_mean(open_store(store_file)[0], mid, mid + 60))
+
+    csv_size = os.path.getsize(csv_path)
+    store_size = os.path.getsize(store_file)
+    print(f"{label:<22} csv {csv_size / 1e6:8.1f} MB  store {store_size / 1e6:8.1f} MB")
+    print(f"{'':<22} reload   csv {csv_reload * 1e3:9.1f} ms {csv_mem / 1e6:8.1f} MB heap   "
+          f"store {store_reload * 1e3:7.2f} ms {store_mem / 1e6:6.2f} MB heap")
+    print(f"{'':<22} 60s read csv {csv_window * 1e3:9.1f} ms                  "
+          f"store {store_window * 1e3:7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            for layout, writer in (('empatica', write_empatica_csv), ('headered', write_headered_csv)):
+                csv_path = os.path.join(tmp, f'{layout}_{rows}.csv')
+                writer(csv_path, rows)
+                bench_file(f'{layout} {rows:,}', csv_path, csv_path + '.edac')
+
+
+if __name__ == '__main__':
+    main()
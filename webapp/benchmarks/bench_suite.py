@@ -0,0 +1,344 @@
+"""
+Benchmark Suite
+Repeatable end-to-end benchmark of ingestion, analysis, plotting and request latency
+- Generates synthetic recordings in every layout the parser accepts, from 10k
+  up to 50M rows (cached between runs in --data-dir)
+- Times each stage (best of --repeat) and measures its peak heap separately
+  with tracemalloc, so tracing overhead never lands in the timings
+- Drives the Flask app through its test client: /upload (cold and cache-hit),
+  the job result as JSON and binary, and zoom-window requests
+- Writes one machine-readable JSON file per run; --compare prints the change
+  against an earlier run
+
+Usage (from the webapp/ directory):
+    python benchmarks/bench_suite.py --sizes 10000 100000 1000000
+    python benchmarks/bench_suite.py --full --output before.json
+    python benchmarks/bench_suite.py --full --compare before.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import app as webapp  # noqa: E402
+import wire_format  # noqa: E402
+from dataset_cache import DatasetCache, build_entry  # noqa: E402
+from eda_analysis import analyze  # noqa: E402
+from eda_service import process_eda_file  # noqa: E402
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+FULL_SIZES = [10_000, 100_000, 1_000_000, 10_000_000, 50_000_000]
+FORMATS = ['headered_unix', 'headered_iso', 'empatica', 'two_column', 'single_column']
+WRITE_CHUNK_ROWS = 1_000_000
+START_SECONDS = 1526304383  # Same session start as the bundled EDA.csv
+SAMPLE_RATE = 4.0
+WINDOW_REQUESTS = 20
+RESULTS_DIR = Path(__file__).resolve().parent / 'results'
+
+
+# ========== Synthetic recordings ==========
+
+def synthetic_chunk(start, rows, rng):
+    """(epoch seconds, EDA values) for rows starting at sample index start"""
+    seconds = START_SECONDS + (start + np.arange(rows)) / SAMPLE_RATE
+    values = np.abs(0.4 + np.cumsum(rng.normal(0, 0.002, rows)) + rng.normal(0, 0.01, rows))
+    return seconds, values
+
+
+def write_recording(path, layout, rows):
+    """Write a synthetic recording in one of FORMATS, a chunk at a time"""
+    rng = np.random.default_rng(rows)
+    with open(path, 'w', newline='') as f:
+        if layout == 'headered_unix':
+            f.write('timestamp_unix,participant_full_id,eda_scl_usiemens\n')
+        elif layout == 'headered_iso':
+            f.write('timestamp_iso,participant_full_id,eda_scl_usiemens,missing_value_reason\n')
+        elif layout == 'empatica':
+            f.write(f"{START_SECONDS:f}\n{SAMPLE_RATE:f}\n")
+
+        for start in range(0, rows, WRITE_CHUNK_ROWS):
+            seconds, values = synthetic_chunk(start, min(WRITE_CHUNK_ROWS, rows - start), rng)
+            if layout == 'headered_unix':
+                frame = pd.DataFrame({'t': np.rint(seconds * 1000).astype(np.int64), 'p': 'BENCH-1', 'v': values})
+            elif layout == 'headered_iso':
+                iso = np.datetime_as_string((seconds * 1000).astype(np.int64).astype('datetime64[ms]'), unit='ms')
+                frame = pd.DataFrame({'t': np.char.add(iso, 'Z'), 'p': 'BENCH-1', 'v': values, 'm': ''})
+            elif layout == 'two_column':
+                frame = pd.DataFrame({'t': seconds, 'v': values})
+            else:
+                frame = pd.DataFrame({'v': values})
+            frame.to_csv(f, header=False, index=False, float_format='%.6f')
+
+
+def recording_path(data_dir, layout, rows):
+    """Cached synthetic file for (layout, rows), generated on first use"""
+    path = Path(data_dir) / f'{layout}_{rows}.csv'
+    if not path.exists():
+        print(f"  generating {path.name} ...", flush=True)
+        partial = path.with_suffix('.part')
+        write_recording(partial, layout, rows)
+        partial.replace(path)
+    return str(path)
+
+
+# ========== Measurement ==========
+
+def best_time(fn, repeat):
+    """(best seconds, last result) over repeat calls"""
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def peak_memory(fn):
+    """Peak traced heap bytes during one call (numpy buffers included)"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def measure(fn, repeat, memory=True):
+    seconds, result = best_time(fn, repeat)
+    return {'seconds': seconds, 'peak_bytes': peak_memory(fn) if memory else None}, result
+
+
+class Isolated:
+    """
+    Point the app at throwaway upload/cache folders with an empty dataset cache,
+    so request timings are cold and the run leaves nothing behind
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.reset()
+
+    def reset(self):
+        uploads = os.path.join(self.root, 'uploads')
+        shutil.rmtree(uploads, ignore_errors=True)
+        os.makedirs(uploads)
+        webapp.app.config['UPLOAD_FOLDER'] = uploads
+        webapp.dataset_cache = DatasetCache(webapp.app.config['DATASET_CACHE_MAX_BYTES'], uploads)
+
+
+def upload(client, path):
+    """POST /upload and wait for the job; returns (status, result metadata)"""
+    with open(path, 'rb') as f:
+        response = client.post('/upload', data={'file': (f, os.path.basename(path))},
+                               content_type='multipart/form-data')
+    if response.status_code != 202:
+        raise RuntimeError(f"/upload returned {response.status_code}: {response.get_json()}")
+    job = webapp.job_queue.get(response.get_json()['job_id'])
+    job.wait()
+    status = job.to_dict()
+    if status['status'] != 'done':
+        raise RuntimeError(f"Upload job failed: {status['error']}")
+    return status, job.result
+
+
+# ========== Stages ==========
+
+def bench_stages(path, repeat, memory):
+    """Parse, stats, index, analysis, plot and serialization for one recording"""
+    results = {}
+
+    def parse():
+        result, error = process_eda_file(path)
+        if error:
+            raise RuntimeError(error)
+        return result['dataset']
+
+    results['parse'], dataset = measure(parse, repeat, memory)
+    results['stats'], stats = measure(dataset.stats, repeat, memory)
+    results['index'], entry = measure(lambda: build_entry(dataset, stats), repeat, memory)
+    results['analysis'], analysis = measure(lambda: analyze(dataset.epoch_ns, dataset.values), repeat, memory)
+
+    def plot():
+        return webapp.create_eda_plot(dataset, stats, lod=entry['lod'], analysis=analysis,
+                                      stats_index=entry['window_stats'])
+
+    results['plot'], figure = measure(plot, repeat, memory)
+    results['serialize_json'], body = measure(lambda: json.dumps(figure).encode('utf-8'), repeat, memory)
+    results['serialize_json']['bytes'] = len(body)
+
+    def binary():
+        meta, columns = webapp.window_points(dataset, entry['lod'], binary=True, analysis=analysis,
+                                             stats_index=entry['window_stats'])
+        return wire_format.encode_frame(meta, columns)
+
+    results['serialize_binary'], frame = measure(binary, repeat, memory)
+    results['serialize_binary']['bytes'] = len(frame)
+    results['rows'] = len(dataset)
+    return results
+
+
+def bench_requests(client, isolated, path, repeat):
+    """Upload latency (cold and cache hit), result fetches and window requests"""
+    results = {}
+    cold = []
+    for _ in range(repeat):
+        isolated.reset()
+        start = time.perf_counter()
+        status, result = upload(client, path)
+        cold.append(time.perf_counter() - start)
+    results['upload_cold'] = {'seconds': min(cold), 'server_stages': status['stages']}
+
+    start = time.perf_counter()
+    status, result = upload(client, path)
+    results['upload_cached'] = {'seconds': time.perf_counter() - start, 'server_stages': status['stages']}
+
+    job_url = f"/api/jobs/{status['id']}/result"
+    for label, query, headers in (('result_json', '', {}),
+                                  ('result_binary', '?format=binary', {'Accept-Encoding': 'gzip'})):
+        def fetch():
+            return client.get(job_url + query, headers=headers)
+        seconds, response = best_time(fetch, repeat)
+        results[label] = {'seconds': seconds, 'bytes': len(response.data)}
+
+    # Zoom windows of decreasing width across the recording
+    duration = result['data_points'] / SAMPLE_RATE
+    rng = np.random.default_rng(0)
+    latencies = []
+    for _ in range(WINDOW_REQUESTS):
+        width = duration * 10 ** rng.uniform(-3, 0)
+        lo = rng.uniform(0, duration - width)
+        start = time.perf_counter()
+        response = client.get(f"/api/datasets/{result['dataset_id']}/window?start={lo}&end={lo + width}&format=binary")
+        latencies.append(time.perf_counter() - start)
+        if response.status_code != 200:
+            raise RuntimeError(f"Window request returned {response.status_code}")
+    results['window'] = {
+        'seconds': float(np.median(latencies)),
+        'p95_seconds': float(np.percentile(latencies, 95)),
+        'requests': WINDOW_REQUESTS
+    }
+    return results
+
+
+# ========== Reporting ==========
+
+def environment():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=Path(__file__).resolve().parent).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count()
+    }
+
+
+def print_case(layout, rows, stages):
+    parts = []
+    for name, result in stages.items():
+        if isinstance(result, dict) and 'seconds' in result:
+            text = f"{name} {result['seconds'] * 1e3:.1f} ms"
+            if result.get('peak_bytes'):
+                text += f" ({result['peak_bytes'] / 1e6:.1f} MB)"
+            parts.append(text)
+    print(f"{layout:<14} {rows:>11,} rows  " + ', '.join(parts), flush=True)
+
+
+def compare(current, baseline_path):
+    """Print per-stage time ratios against an earlier run (<1 is faster)"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    before = {(c['format'], c['rows']): c['stages'] for c in baseline['cases']}
+    print(f"\nChange vs {baseline_path} ({(baseline['environment'].get('commit') or '?')[:10]}):")
+    for case in current['cases']:
+        old = before.get((case['format'], case['rows']))
+        if not old:
+            continue
+        ratios = []
+        for name, result in case['stages'].items():
+            if isinstance(result, dict) and name in old and old[name].get('seconds'):
+                ratios.append(f"{name} {result['seconds'] / old[name]['seconds']:.2f}x")
+        print(f"{case['format']:<14} {case['rows']:>11,} rows  " + ', '.join(ratios))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES)
+    parser.add_argument('--full', action='store_true', help='Run every size from 10k to 50M rows')
+    parser.add_argument('--formats', nargs='+', default=FORMATS, choices=FORMATS)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true', help='Skip the tracemalloc pass')
+    parser.add_argument('--no-requests', action='store_true', help='Skip the Flask test-client requests')
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'eda_bench_data'),
+                        help='Where generated recordings are cached between runs')
+    parser.add_argument('--output', default=None, help='Results file (default: benchmarks/results/<time>.json)')
+    parser.add_argument('--compare', default=None, help='Earlier results file to compare against')
+    args = parser.parse_args()
+
+    sizes = FULL_SIZES if args.full else args.sizes
+    os.makedirs(args.data_dir, exist_ok=True)
+    output = args.output or str(RESULTS_DIR / f"bench-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+
+    report = {'environment': environment(), 'repeat': args.repeat, 'cases': []}
+    scratch = tempfile.mkdtemp(prefix='eda_bench_app_')
+    original_folder = webapp.app.config['UPLOAD_FOLDER']
+    original_cache = webapp.dataset_cache
+    try:
+        isolated = Isolated(scratch)
+        client = webapp.app.test_client()
+        for rows in sizes:
+            for layout in args.formats:
+                path = recording_path(args.data_dir, layout, rows)
+                # Silence the app's DEBUG prints so they don't skew timings
+                with open(os.devnull, 'w') as devnull:
+                    stdout, sys.stdout = sys.stdout, devnull
+                    try:
+                        stages = bench_stages(path, args.repeat, not args.no_memory)
+                        if not args.no_requests:
+                            stages.update(bench_requests(client, isolated, path, args.repeat))
+                    finally:
+                        sys.stdout = stdout
+                case = {'format': layout, 'rows': rows, 'parsed_rows': stages.pop('rows'),
+                        'file_bytes': os.path.getsize(path), 'stages': stages}
+                report['cases'].append(case)
+                print_case(layout, rows, stages)
+    finally:
+        webapp.app.config['UPLOAD_FOLDER'] = original_folder
+        webapp.dataset_cache = original_cache
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    report['max_rss_bytes'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,187 @@
+"""
+Video Range Benchmark
+Many concurrent scrubbing clients firing random byte-range requests at one
+video, served by the old send_file(conditional=True) path and by video_delivery
+(cached stat, immutable validators, file-wrapper ranges)
+
+The built-in server is werkzeug's threaded dev server, which has no sendfile;
+point --url at the app running under gunicorn/uWSGI to measure the zero-copy path
+
+Usage (from the webapp/ directory):
+    python benchmarks/bench_video.py --clients 1 8 32 --seconds 5 --size-mb 256
+    python benchmarks/bench_video.py --url http://127.0.0.1:8000/static/videos/<name>.mp4
+"""
+
+import argparse
+import http.client
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import video_delivery  # noqa: E402
+
+VIDEO_NAME = '20180514_102227_SYS1Cam3--2018-05-14_10_22_27.mp4'
+
+
+def make_app(folder):
+    """Minimal app with the legacy and the new video route side by side"""
+    from flask import Flask, request, send_file
+
+    app = Flask(__name__)
+    catalog = video_delivery.VideoCatalog(folder)
+
+    @app.route('/legacy/<filename>')
+    def legacy(filename):
+        return send_file(os.path.join(folder, filename), mimetype='video/mp4', conditional=True)
+
+    @app.route('/video/<filename>')
+    def video(filename):
+        found = catalog.lookup(filename)
+        return video_delivery.serve(found, request) if found else ('', 404)
+
+    return app
+
+
+def start_server(folder):
+    """Threaded HTTP/1.1 (keep-alive) werkzeug server in a forked process; returns (process, port)"""
+    from werkzeug.serving import WSGIRequestHandler, make_server
+
+    class KeepAliveHandler(WSGIRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def log_request(self, *args, **kwargs):
+            pass
+
+    server = make_server('127.0.0.1', 0, make_app(folder), threaded=True, request_handler=KeepAliveHandler)
+    process = multiprocessing.get_context('fork').Process(target=server.serve_forever, daemon=True)
+    process.start()
+    server.socket.close()
+    return process, server.server_port
+
+
+def client(url, size, range_bytes, seconds, seed, results):
+    """One scrubbing client: random ranges over a keep-alive connection until the deadline"""
+    parts = urlsplit(url)
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+    latencies, received, errors = [], 0, 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = rng.randrange(0, max(1, size - range_bytes))
+        t0 = time.perf_counter()
+        try:
+            conn.request('GET', parts.path, headers={'Range': f'bytes={start}-{start + range_bytes - 1}'})
+            response = conn.getresponse()
+            body = response.read()
+            if response.status != 206 or len(body) != min(range_bytes, size - start):
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - t0)
+        received += len(body)
+    conn.close()
+    results.put((latencies, received, errors))
+
+
+def run_load(url, size, clients, range_bytes, seconds):
+    """Requests/s, MB/s and latency percentiles with clients concurrent processes"""
+    ctx = multiprocessing.get_context('fork')
+    results = ctx.Queue()
+    workers = [ctx.Process(target=client, args=(url, size, range_bytes, seconds, i, results))
+               for i in range(clients)]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    collected = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = np.concatenate([np.asarray(lat, dtype=np.float64) for lat, _, _ in collected])
+    received = sum(r for _, r, _ in collected)
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1e3 if len(latencies) else (0, 0, 0)
+    return {
+        'requests_per_second': len(latencies) / elapsed,
+        'mb_per_second': received / elapsed / 1e6,
+        'p50_ms': p50,
+        'p95_ms': p95,
+        'p99_ms': p99,
+        'errors': sum(e for _, _, e in collected)
+    }
+
+
+def check(url, data):
+    """Spot-check a single-range and a HEAD answer against the file"""
+    parts = urlsplit(url)
+    conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+    conn.request('GET', parts.path, headers={'Range': 'bytes=1000-1999'})
+    response = conn.getresponse()
+    assert response.status == 206 and response.read() == data[1000:2000], 'single range mismatch'
+    conn.request('HEAD', parts.path)
+    response = conn.getresponse()
+    response.read()
+    assert int(response.getheader('Content-Length')) == len(data), 'HEAD length mismatch'
+    conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--size-mb', type=int, default=256, help='Size of the synthetic video')
+    parser.add_argument('--range-kb', type=int, default=512, help='Bytes per scrub request')
+    parser.add_argument('--url', help='Benchmark an already running server instead (GET this video URL)')
+    args = parser.parse_args()
+    range_bytes = args.range_kb * 1024
+
+    if args.url:
+        parts = urlsplit(args.url)
+        conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=30)
+        conn.request('HEAD', parts.path)
+        size = int(conn.getresponse().getheader('Content-Length'))
+        conn.close()
+        targets, server, tmp = [('url', args.url)], None, None
+    else:
+        tmp = tempfile.mkdtemp(prefix='eda_video_bench_')
+        data = np.random.default_rng(0).integers(0, 256, args.size_mb << 20, dtype=np.uint8).tobytes()
+        Path(tmp, VIDEO_NAME).write_bytes(data)
+        size = len(data)
+        server, port = start_server(tmp)
+        targets = [(name, f'http://127.0.0.1:{port}/{name}/{VIDEO_NAME}') for name in ('legacy', 'video')]
+        for _, url in targets:
+            check(url, data)
+        del data
+
+    try:
+        print(f"{size / 1e6:.0f} MB video, {args.range_kb} KB ranges, {args.seconds:g} s per run, "
+              f"{os.cpu_count()} cores\n")
+        print(f"{'path':<8} {'clients':>7} {'req/s':>9} {'MB/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+              f"{'errors':>6}")
+        for clients in args.clients:
+            for name, url in targets:
+                result = run_load(url, size, clients, range_bytes, args.seconds)
+                print(f"{name:<8} {clients:>7} {result['requests_per_second']:>9.0f} "
+                      f"{result['mb_per_second']:>9.1f} {result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} "
+                      f"{result['p99_ms']:>8.2f} {result['errors']:>6}")
+    finally:
+        if server is not None:
+            server.terminate()
+        if tmp:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
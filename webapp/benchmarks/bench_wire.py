@@ -0,0 +1,90 @@
+"""
+Wire Format Benchmark
+Compares the size and decode time of the sample payload sent to the browser:
+every row as JSON lists (the original /upload response), the LOD-capped JSON
+lists, and the binary frame with and without gzip
+
+Usage (from the webapp/ directory):
+    python benchmarks/bench_wire.py --rows 1000000 --csv ../EDA.csv
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import wire_format  # noqa: E402
+from app import window_points  # noqa: E402
+from bench_ingest import write_empatica_csv, write_headered_csv  # noqa: E402
+from dataset_cache import build_entry  # noqa: E402
+from eda_ingest import load_eda_dataset  # noqa: E402
+
+MAX_POINTS = 4000
+
+
+def time_decode(fn, repeat=5):
+    """Best of repeat runs, in milliseconds"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e3
+
+
+def full_json(dataset):
+    """The original response shape: one list entry per row for every column"""
+    return json.dumps({
+        'timestamps': dataset.time_display(slice(None)).tolist(),
+        'timestamps_seconds': dataset.seconds.tolist(),
+        'eda_values': np.asarray(dataset.values).tolist()
+    }).encode('utf-8')
+
+
+def bench_file(label, csv_path):
+    entry = build_entry(load_eda_dataset(csv_path))
+    dataset, lod = entry['dataset'], entry['lod']
+
+    legacy = full_json(dataset)
+    meta, _ = window_points(dataset, lod, max_points=MAX_POINTS)
+    capped = json.dumps(meta).encode('utf-8')
+    meta, columns = window_points(dataset, lod, max_points=MAX_POINTS, binary=True)
+    frame = wire_format.encode_frame(meta, columns)
+    compressed = gzip.compress(frame, compresslevel=wire_format.GZIP_LEVEL)
+
+    print(f"{label:<22} {len(dataset):>12,} rows")
+    for name, body, decode in (
+            ('full json', legacy, lambda: json.loads(legacy)),
+            ('capped json', capped, lambda: json.loads(capped)),
+            ('binary', frame, lambda: wire_format.decode_frame(frame)),
+            ('binary+gzip', compressed, lambda: wire_format.decode_frame(gzip.decompress(compressed)))):
+        print(f"{'':<22} {name:<12} {len(body) / 1e3:12.1f} KB   decode {time_decode(decode):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000])
+    parser.add_argument('--csv', nargs='*', default=[], help='Real recordings to include')
+    args = parser.parse_args()
+
+    for path in args.csv:
+        bench_file(os.path.basename(path), path)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            for layout, writer in (('empatica', write_empatica_csv), ('headered', write_headered_csv)):
+                csv_path = os.path.join(tmp, f'{layout}_{rows}.csv')
+                writer(csv_path, rows)
+                bench_file(f'{layout} {rows:,}', csv_path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,183 @@
+"""
+Legacy EDA parser kept as a benchmark baseline
+This is the original row-by-row process_eda_file from app.py, unchanged
+apart from the function name, so new ingestion code can be compared against it
+"""
+
+import pandas as pd
+import pytz
+
+
+def legacy_process_eda_file(filepath):
+    """
+    Process EDA CSV file and extract data
+    Similar to a Service/Repository pattern in ASP.NET
+    """
+    try:
+        # First, try to read with headers
+        df = pd.read_csv(filepath)
+        
+        # Check if the file has no headers (all columns are numeric)
+        if all(df.columns.astype(str).str.match(r'^\d+\.?\d*$')):
+            print("DEBUG: File has no headers, treating as headerless data")
+            # Re-read without headers
+            df = pd.read_csv(filepath, header=None)
+            
+            # If there's only one column, assume it's EDA data with metadata in first rows
+            if len(df.columns) == 1:
+                # Check if first value is a UNIX timestamp (very large number)
+                first_val = df.iloc[0, 0]
+                
+                if first_val > 1000000000:  # Likely a UNIX timestamp
+                    print(f"DEBUG: First value is UNIX timestamp: {first_val}")
+                    base_timestamp = first_val
+                    
+                    # Second value might be sampling rate (Hz)
+                    sampling_rate = df.iloc[1, 0] if len(df) > 1 else 4.0
+                    print(f"DEBUG: Sampling rate: {sampling_rate} Hz")
+                    
+                    # Skip first 2 rows (metadata)
+                    df = df.iloc[2:].reset_index(drop=True)
+                    eda_column = 0
+                    
+                    # Generate timestamps based on sampling rate
+                    # Convert Hz to seconds between samples
+                    seconds_per_sample = 1.0 / sampling_rate
+                    
+                    # Create timestamps for each sample
+                    timestamps = [base_timestamp + (i * seconds_per_sample) for i in range(len(df))]
+                    df['datetime'] = pd.to_datetime(timestamps, unit='s', utc=True)
+                    df['datetime'] = df['datetime'].dt.tz_convert('US/Eastern')
+                else:
+                    # No metadata, just EDA values
+                    eda_column = 0
+                    # Generate timestamps based on row index (assuming 1-minute intervals)
+                    df['datetime'] = pd.date_range(start='2025-01-01 00:00:00', periods=len(df), freq='1min')
+                    df['datetime'] = df['datetime'].dt.tz_localize('UTC').dt.tz_convert('US/Eastern')
+            else:
+                # Multiple columns - assume first is timestamp, second is EDA
+                timestamp_column = 0
+                eda_column = 1 if len(df.columns) > 1 else 0
+                
+                # Try to parse first column as timestamp
+                try:
+                    # Check if it's UNIX timestamp
+                    if df[timestamp_column].dtype in ['int64', 'float64']:
+                        df['datetime'] = pd.to_datetime(df[timestamp_column], unit='s', utc=True)
+                        df['datetime'] = df['datetime'].dt.tz_convert('US/Eastern')
+                    else:
+                        df['datetime'] = pd.to_datetime(df[timestamp_column], utc=True)
+                        df['datetime'] = df['datetime'].dt.tz_convert('US/Eastern')
+                except:
+                    # If timestamp parsing fails, use index
+                    df['datetime'] = pd.date_range(start='2025-01-01 00:00:00', periods=len(df), freq='1min')
+                    df['datetime'] = df['datetime'].dt.tz_localize('UTC').dt.tz_convert('US/Eastern')
+        else:
+            # File has headers - use existing logic
+            # Detect EDA column (flexible naming)
+            eda_column = None
+            possible_columns = ['eda_scl_usiemens', 'eda', 'EDA', 'skin_conductance', 'scl', 'electrodermal']
+            
+            for col in possible_columns:
+                if col in df.columns:
+                    eda_column = col
+                    break
+            
+            if not eda_column:
+                # Try to find any column with 'eda' in the name
+                for col in df.columns:
+                    if 'eda' in str(col).lower():
+                        eda_column = col
+                        break
+            
+            if not eda_column:
+                # Show available columns to help user
+                available_cols = ', '.join(df.columns.tolist())
+                return None, f"No EDA column found in CSV file. Available columns: {available_cols}"
+            
+            # Detect timestamp column
+            timestamp_column = None
+            timestamp_unix_column = None
+            possible_ts = ['timestamp_iso', 'timestamp', 'time', 'datetime']
+            
+            # Check for UNIX timestamp column first
+            if 'timestamp_unix' in df.columns:
+                timestamp_unix_column = 'timestamp_unix'
+            
+            for col in possible_ts:
+                if col in df.columns:
+                    timestamp_column = col
+                    break
+            
+            # Convert timestamps to EST 12-hour format
+            est = pytz.timezone('US/Eastern')
+            
+            if timestamp_unix_column:
+                # Convert UNIX timestamps (milliseconds) to datetime in EST
+                df['datetime'] = pd.to_datetime(df[timestamp_unix_column], unit='ms', utc=True)
+                df['datetime'] = df['datetime'].dt.tz_convert(est)
+            elif timestamp_column:
+                # Parse ISO or other timestamp formats
+                try:
+                    df['datetime'] = pd.to_datetime(df[timestamp_column], utc=True)
+                    df['datetime'] = df['datetime'].dt.tz_convert(est)
+                except:
+                    df['datetime'] = pd.to_datetime(df[timestamp_column])
+                    # If no timezone info, assume UTC and convert to EST
+                    if df['datetime'].dt.tz is None:
+                        df['datetime'] = df['datetime'].dt.tz_localize('UTC').dt.tz_convert(est)
+            else:
+                # Use index as timestamp
+                df['datetime'] = pd.date_range(start='2025-01-01 00:00:00', periods=len(df), freq='1min')
+                df['datetime'] = df['datetime'].dt.tz_localize('UTC').dt.tz_convert('US/Eastern')
+        
+        # Format datetime as 12-hour EST time
+        if hasattr(df['datetime'].iloc[0], 'strftime'):
+            df['time_display'] = df['datetime'].dt.strftime('%I:%M:%S %p EST')
+            df['date_display'] = df['datetime'].dt.strftime('%m/%d/%Y')
+        else:
+            df['time_display'] = df['datetime'].astype(str)
+            df['date_display'] = 'N/A'
+        
+        # Convert EDA to numeric
+        df[eda_column] = pd.to_numeric(df[eda_column], errors='coerce')
+        
+        # Remove missing values
+        df_clean = df[df[eda_column].notna()].copy()
+        
+        if len(df_clean) == 0:
+            return None, "No valid EDA data found in file"
+        
+        # Calculate statistics
+        stats = {
+            'mean': float(df_clean[eda_column].mean()),
+            'std': float(df_clean[eda_column].std()),
+            'min': float(df_clean[eda_column].min()),
+            'max': float(df_clean[eda_column].max()),
+            'count': len(df_clean),
+            'missing': len(df) - len(df_clean),
+            'start_time': df_clean['time_display'].iloc[0] if len(df_clean) > 0 else 'N/A',
+            'end_time': df_clean['time_display'].iloc[-1] if len(df_clean) > 0 else 'N/A',
+            'date': df_clean['date_display'].iloc[0] if len(df_clean) > 0 else 'N/A'
+        }
+        
+        # Calculate seconds from start for video sync
+        first_datetime = df_clean['datetime'].iloc[0]
+        df_clean['seconds_from_start'] = (df_clean['datetime'] - first_datetime).dt.total_seconds()
+        
+        # Prepare data for plotting
+        plot_data = {
+            'timestamps': df_clean['time_display'].tolist(),
+            'timestamps_raw': df_clean['datetime'].astype(str).tolist(),
+            'seconds_from_start': df_clean['seconds_from_start'].tolist(),
+            'eda_values': df_clean[eda_column].tolist(),
+            'participant_id': df_clean['participant_full_id'].iloc[0] if 'participant_full_id' in df_clean.columns else 'Unknown',
+            'first_datetime': first_datetime  # Store for offset calculation
+        }
+        
+        return {'data': plot_data, 'stats': stats}, None
+        
+    except Exception as e:
+        import traceback
+        print(f"ERROR in process_eda_file: {traceback.format_exc()}")
+        return None, f"Error processing file: {str(e)}"
@@ -0,0 +1,291 @@
+"""
+Chunked Video Uploads
+Resumable, checksum-verified uploads of large videos in fixed-size chunks
+- init creates a session and preallocates <upload_id>.part in the video
+  folder; the final name gets an id suffix if another upload already claims it
+- Chunks are PUT by index, in any order and concurrently; each request body is
+  streamed straight into its slot of the .part file while being hashed, with
+  no temp file or in-memory copy
+- A chunk whose SHA-256 does not match is not marked received and can be resent
+- Session state lives in a small JSON manifest next to the .part file, so an
+  upload resumes after a dropped connection or a server restart
+- finalize runs an optional prepare step on the assembled .part file (the
+  app's faststart), then links it into place (no copy, never over an existing file)
+"""
+
+import hashlib
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024  # 8 MB
+MIN_CHUNK_SIZE = 256 * 1024
+MAX_CHUNK_SIZE = 64 * 1024 * 1024
+COPY_BUFFER_SIZE = 1024 * 1024
+SESSION_TTL_SECONDS = 24 * 3600  # Unfinished uploads older than this are discarded
+PART_SUFFIX = '.part'
+MANIFEST_SUFFIX = '.upload.json'
+
+
+class ChunkError(ValueError):
+    """Raised for malformed chunks, unknown indices and incomplete uploads"""
+
+
+class UploadSession:
+    """
+    One chunked upload: target path, chunk layout and the set of verified chunks
+    completed is a Future resolved with the session once it is finalized
+    (or failed if the session is aborted or expires)
+    """
+
+    def __init__(self, folder, upload_id, stored_name, filename, size, chunk_size,
+                 sha256=None, received=(), created=None):
+        self.folder = folder
+        self.upload_id = upload_id
+        self.stored_name = stored_name
+        self.filename = filename
+        self.size = int(size)
+        self.chunk_size = int(chunk_size)
+        self.sha256 = sha256.lower() if sha256 else None
+        self.received = set(received)
+        self.created = created or time.time()
+        self.complete = False
+        self.discarded = False
+        self.completed = Future()
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        return os.path.join(self.folder, self.stored_name)
+
+    @property
+    def part_path(self):
+        # Named by id, so uploads of the same file never share a .part file
+        return os.path.join(self.folder, self.upload_id + PART_SUFFIX)
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.folder, self.upload_id + MANIFEST_SUFFIX)
+
+    @property
+    def chunk_count(self):
+        return math.ceil(self.size / self.chunk_size)
+
+    def chunk_bounds(self, index):
+        """(offset, length) of chunk index"""
+        if not 0 <= index < self.chunk_count:
+            raise ChunkError(f"Chunk index {index} is out of range (0-{self.chunk_count - 1})")
+        offset = index * self.chunk_size
+        return offset, min(self.chunk_size, self.size - offset)
+
+    def missing(self):
+        with self._lock:
+            return [i for i in range(self.chunk_count) if i not in self.received]
+
+    def to_dict(self):
+        missing = self.missing()
+        return {
+            'upload_id': self.upload_id,
+            'filename': self.filename,
+            'size': self.size,
+            'chunk_size': self.chunk_size,
+            'chunk_count': self.chunk_count,
+            'received_count': self.chunk_count - len(missing),
+            'missing': missing,
+            'complete': self.complete
+        }
+
+    def write_chunk(self, index, stream, checksum):
+        """
+        Stream one chunk body into its slot, verifying length and SHA-256
+        Chunks touch disjoint byte ranges, so concurrent writers never overlap
+        """
+        if self.complete:
+            raise ChunkError("Upload is already complete")
+        if not checksum:
+            raise ChunkError("Missing chunk checksum")
+        offset, length = self.chunk_bounds(index)
+
+        sha = hashlib.sha256()
+        written = 0
+        with open(self.part_path, 'r+b') as out:
+            out.seek(offset)
+            while written < length:
+                data = stream.read(min(COPY_BUFFER_SIZE, length - written))
+                if not data:
+                    break
+                sha.update(data)
+                out.write(data)
+                written += len(data)
+            overflow = stream.read(1)
+        if written != length or overflow:
+            raise ChunkError(f"Chunk {index} should be {length} bytes")
+        if sha.hexdigest() != checksum.lower():
+            raise ChunkError(f"Checksum mismatch for chunk {index}")
+
+        with self._lock:
+            # A concurrent finalize or discard has already removed the manifest
+            if self.discarded:
+                raise ChunkError("Upload was cancelled")
+            if self.complete:
+                raise ChunkError("Upload is already complete")
+            self.received.add(index)
+            self._save_manifest()
+
+    def finalize(self, prepare=None):
+        """
+        Verify the upload is whole and move it into place; returns the final path
+        prepare(session) runs on the assembled .part file first, so anything that
+        rewrites the file (e.g. faststart) is done before its name is published
+        """
+        with self._lock:
+            if self.complete:
+                return self.path
+            if self.discarded:
+                raise ChunkError("Upload was cancelled")
+            missing = self.chunk_count - len(self.received)
+            if missing:
+                raise ChunkError(f"{missing} of {self.chunk_count} chunks have not been received")
+            if self.sha256 and _file_sha256(self.part_path) != self.sha256:
+                raise ChunkError("Checksum mismatch for the assembled file")
+            if prepare is not None:
+                prepare(self)
+            try:
+                os.link(self.part_path, self.path)  # Fails rather than replace an existing video
+            except FileExistsError:
+                raise ChunkError(f"A video named {self.stored_name} already exists")
+            os.remove(self.part_path)
+            os.remove(self.manifest_path)
+            self.complete = True
+        self.completed.set_result(self)
+        return self.path
+
+    def discard(self, reason):
+        """Delete partial data and fail anyone waiting on the upload"""
+        with self._lock:
+            self.discarded = True
+            for path in (self.part_path, self.manifest_path):
+                if os.path.exists(path):
+                    os.remove(path)
+        if not self.completed.done():
+            self.completed.set_exception(ChunkError(reason))
+
+    def _save_manifest(self):
+        state = {
+            'upload_id': self.upload_id,
+            'stored_name': self.stored_name,
+            'filename': self.filename,
+            'size': self.size,
+            'chunk_size': self.chunk_size,
+            'sha256': self.sha256,
+            'received': sorted(self.received),
+            'created': self.created
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.folder, suffix='.tmp')
+        with os.fdopen(fd, 'w') as out:
+            json.dump(state, out)
+        os.replace(tmp_path, self.manifest_path)
+
+
+def _file_sha256(path):
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(COPY_BUFFER_SIZE), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+class ChunkedUploads:
+    """
+    Registry of upload sessions, backed by manifests on disk
+    Similar to the tus resumable-upload protocol, reduced to init/PUT/finalize
+    """
+
+    def __init__(self, folder, ttl=SESSION_TTL_SECONDS):
+        self.folder = folder
+        self.ttl = ttl
+        self._sessions = {}
+        self._lock = threading.Lock()
+        os.makedirs(folder, exist_ok=True)
+
+    def create(self, stored_name, filename, size, chunk_size=None, sha256=None):
+        """Start a session and preallocate its .part file (sparse where supported)"""
+        size = int(size)
+        chunk_size = int(chunk_size or DEFAULT_CHUNK_SIZE)
+        if size <= 0:
+            raise ChunkError("File size must be positive")
+        if not MIN_CHUNK_SIZE <= chunk_size <= MAX_CHUNK_SIZE:
+            raise ChunkError(f"Chunk size must be between {MIN_CHUNK_SIZE} and {MAX_CHUNK_SIZE} bytes")
+        self.expire()
+
+        upload_id = uuid.uuid4().hex
+        with self._lock:
+            # Same-second uploads of one file would otherwise finalize onto one path
+            claimed = {s.stored_name for s in self._sessions.values() if not s.complete}
+            if stored_name in claimed or os.path.exists(os.path.join(self.folder, stored_name)):
+                base, ext = os.path.splitext(stored_name)
+                stored_name = f"{base}_{upload_id[:8]}{ext}"
+            session = UploadSession(self.folder, upload_id, stored_name, filename, size,
+                                    chunk_size, sha256=sha256)
+            self._sessions[upload_id] = session
+        try:
+            with open(session.part_path, 'wb') as out:
+                out.truncate(size)
+            session._save_manifest()
+        except OSError:
+            with self._lock:
+                self._sessions.pop(upload_id, None)
+            raise
+        return session
+
+    def get(self, upload_id):
+        """Session by id, reloaded from its manifest if needed; None if unknown"""
+        with self._lock:
+            session = self._sessions.get(upload_id)
+            if session is not None:
+                return session
+            session = self._load(upload_id)
+            if session is not None:
+                self._sessions[upload_id] = session
+            return session
+
+    def _load(self, upload_id):
+        if not upload_id.isalnum():
+            return None  # Ids are hex; never build paths from anything else
+        try:
+            with open(os.path.join(self.folder, upload_id + MANIFEST_SUFFIX)) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        session = UploadSession(self.folder, state['upload_id'], state['stored_name'], state['filename'],
+                                state['size'], state['chunk_size'], sha256=state.get('sha256'),
+                                received=state['received'], created=state['created'])
+        return session if os.path.exists(session.part_path) else None
+
+    def discard(self, upload_id, reason="Upload was cancelled"):
+        session = self.get(upload_id)
+        if session is not None and not session.complete:
+            session.discard(reason)
+            with self._lock:
+                self._sessions.pop(upload_id, None)
+        return session
+
+    def expire(self):
+        """Discard unfinished sessions older than the TTL; returns how many"""
+        cutoff = time.time() - self.ttl
+        expired = 0
+        with self._lock:
+            for upload_id in [i for i, s in self._sessions.items() if s.complete and s.created < cutoff]:
+                del self._sessions[upload_id]
+        for name in os.listdir(self.folder):
+            if name.endswith(MANIFEST_SUFFIX):
+                session = self.get(name[:-len(MANIFEST_SUFFIX)])
+                if session is not None and not session.complete and session.created < cutoff:
+                    self.discard(session.upload_id, "Upload expired before it was finished")
+                    expired += 1
+        return expired
@@ -0,0 +1,304 @@
+"""
+Dataset Cache
+Content-addressed cache of parsed EDA datasets
+- Incoming CSVs are hashed (SHA-256) while they stream to disk
+- Parsed arrays, stats and LOD levels live in an in-process LRU bounded by bytes,
+  along with derived results (e.g. the analysis stage) computed on first use
+- An optional on-disk tier keeps parsed columns in the memory-mappable .edac
+  format (eda_store), so a restart or re-upload skips CSV parsing
+- Upload storage is pruned oldest-first so uploads/ stays within a byte budget;
+  files still being written and files leased by running jobs are skipped
+"""
+
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import Counter, OrderedDict
+
+import numpy as np
+
+from eda_index import TimeIndex
+from eda_lod import LODPyramid
+from eda_stats import WindowStatsIndex
+from eda_store import open_store, store_path, write_store
+
+HASH_CHUNK_SIZE = 1024 * 1024  # 1 MB
+DIGEST_LENGTH = 32  # Hex characters of the SHA-256 digest used as dataset id
+TEMP_SUFFIXES = ('.part', '.tmp')  # Files still being written (HashingSink, .edac writes)
+TEMP_GRACE_SECONDS = 3600  # Older temp files are leftovers of a crash and may be pruned
+
+
+class HashingSink:
+    """
+    Writable upload target that hashes bytes while spooling them to disk
+    close() stores the file under its content digest, so identical uploads share one copy
+    """
+
+    def __init__(self, folder, suffix='.csv'):
+        self.folder = folder
+        self.suffix = suffix
+        self.digest = None
+        self.path = None
+        self._sha = hashlib.sha256()
+        fd, self._tmp_path = tempfile.mkstemp(dir=folder, suffix='.part')
+        self._out = os.fdopen(fd, 'wb')
+
+    def write(self, chunk):
+        self._sha.update(chunk)
+        self._out.write(chunk)
+
+    def close(self):
+        """Finish the file; returns (digest, path)"""
+        self._out.close()
+        self.digest = self._sha.hexdigest()[:DIGEST_LENGTH]
+        self.path = os.path.join(self.folder, self.digest + self.suffix)
+        os.replace(self._tmp_path, self.path)  # Same content, same name: re-uploads overwrite in place
+        return self.digest, self.path
+
+    def abort(self):
+        """Discard a partially written upload"""
+        self._out.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+
+def save_and_hash(stream, folder, suffix='.csv', chunk_size=HASH_CHUNK_SIZE):
+    """
+    Stream an upload to disk while hashing it
+    Returns (digest, path)
+    """
+    sink = HashingSink(folder, suffix)
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            sink.write(chunk)
+    except BaseException:
+        sink.abort()
+        raise
+    return sink.close()
+
+
+def build_entry(dataset, stats=None):
+    """Everything the app keeps per dataset: arrays, time index, LOD levels, window stats index and stats"""
+    index = TimeIndex(dataset.epoch_ns)
+    lod = LODPyramid(dataset.values, index)
+    return {
+        'dataset': dataset,
+        'index': index,
+        'lod': lod,
+        'window_stats': WindowStatsIndex(dataset.values, lod),
+        'stats': stats or dataset.stats()
+    }
+
+
+def _resident_nbytes(array):
+    """Heap bytes held by a column; memory-mapped columns live in the page cache"""
+    return 0 if isinstance(array, np.memmap) else array.nbytes
+
+
+def entry_nbytes(entry):
+    """Approximate resident (heap) size of a cache entry"""
+    dataset = entry['dataset']
+    return (_resident_nbytes(dataset.epoch_ns) + _resident_nbytes(dataset.values)
+            + entry['lod'].nbytes + entry['window_stats'].nbytes)
+
+
+class DiskTier:
+    """
+    Parsed columns persisted as .edac store files keyed by content digest
+    Loading one memory-maps the columns instead of parsing the CSV again
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+
+    def load(self, key):
+        """(dataset, stats) with memory-mapped columns, or None if not stored"""
+        path = store_path(self.folder, key)
+        if not os.path.exists(path):
+            return None
+        result = open_store(path)
+        os.utime(path)  # Mark as recently used for pruning
+        return result
+
+    def store(self, key, dataset, stats):
+        """Write the columns, then hand back the memory-mapped copy"""
+        path = write_store(store_path(self.folder, key), dataset, stats)
+        return open_store(path)
+
+
+class DatasetCache:
+    """
+    Thread-safe LRU of parsed datasets, bounded by resident bytes
+    Similar to IMemoryCache with a size limit in ASP.NET Core
+    """
+
+    def __init__(self, max_bytes, disk_folder=None):
+        self.max_bytes = max_bytes
+        self.disk = DiskTier(disk_folder) if disk_folder else None
+        self._entries = OrderedDict()
+        self._sizes = {}
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key, count=True):
+        """
+        Entry for key, falling back to the disk tier; None on a miss
+        Pass count=False for follow-up API lookups that shouldn't skew hit rates
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += count
+                return entry
+
+        stored = self.disk.load(key) if self.disk else None
+        if stored is None:
+            with self._lock:
+                self.misses += count
+            return None
+
+        with self._lock:
+            self.disk_hits += count
+        return self._insert(key, build_entry(*stored))
+
+    def put(self, key, dataset, stats=None):
+        """
+        Build and cache the entry for a freshly parsed dataset
+        With a disk tier the cached copy is memory-mapped from the store file,
+        so the parsed in-memory arrays can be freed
+        Pass stats when the caller already computed them (process_eda_file does)
+        """
+        stats = stats or dataset.stats()
+        if self.disk:
+            dataset, stats = self.disk.store(key, dataset, stats)
+        return self._insert(key, build_entry(dataset, stats))
+
+    def _insert(self, key, entry):
+        size = entry_nbytes(entry)
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._sizes[key]
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            self._sizes[key] = size
+            self.current_bytes += size
+            self._evict()
+        return entry
+
+    def derived(self, key, entry, name, build):
+        """
+        entry[name], computed by build(entry) on first use and kept with the entry
+        Its nbytes count toward the byte budget. Concurrent first calls may both
+        build; the first result stored wins
+        """
+        value = entry.get(name)
+        if value is not None:
+            return value
+        value = build(entry)
+        with self._lock:
+            if name in entry:
+                return entry[name]
+            entry[name] = value
+            if self._entries.get(key) is entry:
+                self._sizes[key] += value.nbytes
+                self.current_bytes += value.nbytes
+                self._evict()
+        return value
+
+    def _evict(self):
+        # Evict least recently used entries, but always keep the newest one
+        while self.current_bytes > self.max_bytes and len(self._entries) > 1:
+            old_key, _ = self._entries.popitem(last=False)
+            self.current_bytes -= self._sizes.pop(old_key)
+            self.evictions += 1
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+class PathLeases:
+    """
+    Files that running jobs still need, counted per path (identical uploads
+    share one content-addressed file); pass paths() to prune_folder as keep
+    """
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def acquire(self, path):
+        with self._lock:
+            self._counts[os.path.abspath(path)] += 1
+
+    def release(self, path):
+        with self._lock:
+            path = os.path.abspath(path)
+            self._counts[path] -= 1
+            if self._counts[path] <= 0:
+                del self._counts[path]
+
+    def paths(self):
+        with self._lock:
+            return set(self._counts)
+
+
+def prune_folder(folder, max_bytes, keep=()):
+    """
+    Delete least recently modified files under folder until it fits in max_bytes
+    Paths in keep and temp files younger than TEMP_GRACE_SECONDS (uploads and
+    stores still being written) are never removed. Returns the number of files deleted
+    """
+    temp_cutoff = time.time() - TEMP_GRACE_SECONDS
+    files = []
+    for root, _, names in os.walk(folder):
+        for name in names:
+            if name.startswith('.'):
+                continue  # .gitkeep and friends
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+
+    total = sum(size for _, size, _ in files)
+    keep = {os.path.abspath(p) for p in keep}
+    removed = 0
+    for mtime, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        if os.path.abspath(path) in keep:
+            continue
+        if path.endswith(TEMP_SUFFIXES) and mtime > temp_cutoff:
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # Already gone, or still mapped on platforms that forbid deletion
+        total -= size
+        removed += 1
+    return removed
@@ -0,0 +1,236 @@
+"""
+EDA Analysis
+Tonic/phasic decomposition and skin conductance response (SCR) detection
+- Tonic (SCL): rolling median over TONIC_WINDOW_SECONDS; phasic = signal - tonic
+- SCRs: trough-to-peak rises of the smoothed phasic signal of at least
+  SCR_MIN_AMPLITUDE µS within SCR_MAX_RISE_SECONDS
+- Vectorized with NumPy and run over fixed-size chunks whose overlap covers
+  every window involved, so chunk edges never change the result and memory
+  stays bounded however long the recording is
+- Epoch statistics: mean/std/min/max, mean SCL and SCR count per EPOCH_SECONDS
+"""
+
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from eda_stats import prefix_sums
+
+TONIC_WINDOW_SECONDS = 8.0
+SMOOTH_WINDOW_SECONDS = 1.0  # Moving average applied to the phasic signal before peak picking
+SCR_MIN_AMPLITUDE = 0.01  # µS
+SCR_MAX_RISE_SECONDS = 7.0  # Longer rises are drift, not a response
+EPOCH_SECONDS = 60.0
+CHUNK_SAMPLES = 1 << 16
+MAX_WINDOW_ELEMENTS = 1 << 23  # Caps the rolling-median scratch buffer (chunk x window)
+
+
+class EDAAnalysis:
+    """
+    Per-dataset analysis results
+    tonic is a float32 column aligned with the samples (with prefix sums for
+    window means); SCRs are parallel arrays sorted by peak index; epochs holds
+    per-epoch statistic columns
+    """
+
+    def __init__(self, tonic, scr_onsets, scr_peaks, scr_amplitudes, scr_rise_times, sample_period, epochs):
+        self.tonic = tonic
+        self.tonic_sums = prefix_sums(tonic)
+        self.scr_onsets = scr_onsets
+        self.scr_peaks = scr_peaks
+        self.scr_amplitudes = scr_amplitudes
+        self.scr_rise_times = scr_rise_times
+        self.sample_period = sample_period
+        self.epochs = epochs
+
+    @property
+    def nbytes(self):
+        return (self.tonic.nbytes + self.tonic_sums.nbytes + self.scr_onsets.nbytes + self.scr_peaks.nbytes + self.scr_amplitudes.nbytes
+                + self.scr_rise_times.nbytes + sum(column.nbytes for column in self.epochs.values()))
+
+    def phasic(self, values, key=slice(None)):
+        """Phasic component for a slice or index array (derived, not stored)"""
+        return values[key] - self.tonic[key]
+
+    def scr_range(self, lo, hi):
+        """Slice of the SCR arrays whose peaks fall in samples [lo, hi)"""
+        return slice(int(self.scr_peaks.searchsorted(lo)), int(self.scr_peaks.searchsorted(hi)))
+
+    def scr_summary(self, lo, hi, duration):
+        """SCR count, rate and amplitude plus mean SCL over samples [lo, hi)"""
+        window = self.scr_range(lo, hi)
+        amplitudes = self.scr_amplitudes[window]
+        count = len(amplitudes)
+        return {
+            'scr_count': count,
+            'scr_per_minute': count * 60 / duration if duration > 0 else 0,
+            'scr_mean_amplitude': float(amplitudes.mean()) if count else 0,
+            'scl_mean': float((self.tonic_sums[hi] - self.tonic_sums[lo]) / (hi - lo)) if hi > lo else 0
+        }
+
+
+class AnalysisError(ValueError):
+    """Raised when a recording's time axis gives no usable sample period"""
+
+
+def sample_period_of(epoch_ns):
+    """
+    Sample period in seconds: exact for regular axes, else the median spacing of the first chunk
+    Repeated timestamps (e.g. 4 Hz samples stamped to whole seconds) can make the median 0;
+    the mean spacing over the whole recording is used then. None if that is unusable too
+    """
+    period_ns = getattr(epoch_ns, 'period_ns', None)
+    if period_ns:
+        return period_ns / 1e9
+    n = len(epoch_ns)
+    if n < 2:
+        return 1.0
+    period = float(np.median(np.diff(np.asarray(epoch_ns[:CHUNK_SAMPLES + 1], dtype=np.int64)))) / 1e9
+    if not (math.isfinite(period) and period > 0):
+        period = (int(epoch_ns[-1]) - int(epoch_ns[0])) / (n - 1) / 1e9
+    return period if math.isfinite(period) and period > 0 else None
+
+
+def _odd(n):
+    n = max(1, int(round(n)))
+    return n if n % 2 else n + 1
+
+
+def _rolling(x, width, reduce):
+    """Centered rolling reduction, edge-padded so the output aligns with x"""
+    half = width // 2
+    padded = np.pad(x, half, mode='edge')
+    return reduce(sliding_window_view(padded, width), axis=1)
+
+
+def _rolling_median(x, width):
+    # Bound the (len x width) view's median scratch by splitting long inputs
+    step = max(1, MAX_WINDOW_ELEMENTS // width)
+    if len(x) <= step:
+        return _rolling(x, width, np.median)
+    half = width // 2
+    padded = np.pad(x, half, mode='edge')
+    out = np.empty(len(x))
+    for start in range(0, len(x), step):
+        stop = min(start + step, len(x))
+        out[start:stop] = np.median(sliding_window_view(padded[start:stop + 2 * half], width), axis=1)
+    return out
+
+
+def _moving_average(x, width):
+    # Direct convolution rather than a running sum: each output depends only on
+    # its own window, so overlapping chunks agree bit for bit on shared samples
+    return np.convolve(np.pad(x, width // 2, mode='edge'), np.full(width, 1.0 / width), mode='valid')
+
+
+def _scrs(smoothed, epoch_ns, first, last, earliest):
+    """
+    SCRs in the smoothed phasic signal whose peak lies in [first, last)
+    (positions local to the chunk context); onsets before earliest are dropped
+    Returns (onsets, peaks, amplitudes, rise_times) as local positions
+    """
+    s = smoothed
+    rising = s[1:-1] > s[:-2]
+    # Peak: strictly rising into it and not rising out of it; trough: the reverse
+    peaks = np.flatnonzero(rising & (s[1:-1] >= s[2:])) + 1
+    troughs = np.flatnonzero((s[1:-1] <= s[:-2]) & (s[2:] > s[1:-1])) + 1
+    peaks = peaks[(peaks >= first) & (peaks < last)]
+
+    # Each peak's onset is the last trough before it
+    slot = troughs.searchsorted(peaks) - 1
+    has_onset = slot >= 0
+    peaks = peaks[has_onset]
+    onsets = troughs[slot[has_onset]]
+
+    amplitudes = s[peaks] - s[onsets]
+    rise_times = (epoch_ns[peaks] - epoch_ns[onsets]) / 1e9
+    keep = (amplitudes >= SCR_MIN_AMPLITUDE) & (rise_times <= SCR_MAX_RISE_SECONDS) & (onsets >= earliest)
+    return onsets[keep], peaks[keep], amplitudes[keep], rise_times[keep]
+
+
+def epoch_stats(epoch_ns, values, tonic, scr_peaks, epoch_seconds=EPOCH_SECONDS, chunk_samples=CHUNK_SAMPLES):
+    """
+    Statistics for consecutive epoch_seconds windows from the first sample
+    Each column has one entry per epoch; empty epochs (gaps) have count 0 and NaN stats
+    Epochs are reduced a block at a time, so scratch memory stays near chunk_samples
+    """
+    origin = int(epoch_ns[0])
+    step = int(epoch_seconds * 1e9)
+    count = (int(epoch_ns[-1]) - origin) // step + 1
+    starts = epoch_ns.searchsorted(origin + np.arange(count, dtype=np.int64) * step)
+    counts = np.diff(np.append(starts, len(values)))
+    occupied = counts > 0
+    # reduceat needs in-bounds, non-empty segments: reduce occupied epochs only
+    seg = starts[occupied]
+    bounds = np.append(seg, len(values))
+    n = counts[occupied]
+
+    sums, squares, mins, maxs, tonic_sums = (np.empty(len(seg)) for _ in range(5))
+    per_block = max(1, chunk_samples // int(n.max()))
+    for first in range(0, len(seg), per_block):
+        last = min(first + per_block, len(seg))
+        lo, hi = bounds[first], bounds[last]
+        x = np.asarray(values[lo:hi], dtype=np.float64)
+        offsets = seg[first:last] - lo
+        sums[first:last] = np.add.reduceat(x, offsets)
+        squares[first:last] = np.add.reduceat(np.square(x), offsets)
+        mins[first:last] = np.minimum.reduceat(x, offsets)
+        maxs[first:last] = np.maximum.reduceat(x, offsets)
+        tonic_sums[first:last] = np.add.reduceat(tonic[lo:hi], offsets, dtype=np.float64)
+
+    def per_epoch(reduced):
+        column = np.full(count, np.nan)
+        column[occupied] = reduced
+        return column
+
+    means = sums / n
+    variances = np.where(n > 1, (squares - sums * means) / np.maximum(n - 1, 1), np.nan)
+    return {
+        'start_seconds': np.arange(count) * epoch_seconds,
+        'count': counts,
+        'mean': per_epoch(means),
+        'std': per_epoch(np.sqrt(np.maximum(variances, 0))),
+        'min': per_epoch(mins),
+        'max': per_epoch(maxs),
+        'scl_mean': per_epoch(tonic_sums / n),
+        'scr_count': np.bincount(starts.searchsorted(scr_peaks, side='right') - 1, minlength=count)
+    }
+
+
+def analyze(epoch_ns, values, chunk_samples=CHUNK_SAMPLES):
+    """
+    Decompose a recording and detect SCRs, one overlapping chunk at a time
+    Returns an EDAAnalysis; raises AnalysisError if the time axis has no usable period
+    """
+    n = len(values)
+    period = sample_period_of(epoch_ns)
+    if period is None:
+        raise AnalysisError("All samples share one timestamp; no sample period to analyze with")
+    tonic_width = _odd(TONIC_WINDOW_SECONDS / period)
+    smooth_width = _odd(SMOOTH_WINDOW_SECONDS / period)
+    rise_samples = int(math.ceil(SCR_MAX_RISE_SECONDS / period))
+    # Context either side of a chunk: enough that every tonic, smoothing and
+    # rise window touching the chunk is computed from real samples
+    overlap = tonic_width // 2 + smooth_width // 2 + rise_samples + 2
+
+    tonic = np.empty(n, dtype=np.float32)
+    found = []
+    for start in range(0, n, chunk_samples):
+        stop = min(start + chunk_samples, n)
+        lo, hi = max(0, start - overlap), min(n, stop + overlap)
+        x = np.asarray(values[lo:hi], dtype=np.float64)
+        context_tonic = _rolling_median(x, tonic_width)
+        tonic[start:stop] = context_tonic[start - lo:stop - lo]
+
+        smoothed = _moving_average(x - context_tonic, smooth_width)
+        # Onsets inside the leading margin may rest on edge-affected values
+        earliest = 0 if lo == 0 else tonic_width // 2 + smooth_width // 2 + 1
+        onsets, peaks, amplitudes, rise_times = _scrs(
+            smoothed, np.asarray(epoch_ns[lo:hi], dtype=np.int64), start - lo, stop - lo, earliest)
+        found.append((onsets + lo, peaks + lo, amplitudes, rise_times))
+
+    onsets, peaks, amplitudes, rise_times = (np.concatenate(parts) for parts in zip(*found)) if found else (
+        np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0), np.empty(0))
+    epochs = epoch_stats(epoch_ns, values, tonic, peaks, chunk_samples=chunk_samples)
+    return EDAAnalysis(tonic, onsets, peaks, amplitudes, rise_times, period, epochs)
@@ -0,0 +1,209 @@
+"""
+EDA Export
+Streams the video-aligned window of a dataset back out as CSV, Parquet or NPZ
+- The window is read in CHUNK_ROWS slices of the cached arrays (memory-mapped
+  for .edac-backed datasets); each slice is encoded and yielded on its own, so
+  memory stays flat however long the recording is
+- Sample mode: every raw sample in [offset, offset + duration] seconds from
+  the data start, with its time relative to the video start
+- Frame mode: one row per video frame with the EDA value at the frame's time
+  (the nearest sample, as the player shows it, or linear interpolation); one
+  binary search per frame, no resampled copy of the recording
+- NPZ is a zip stream of .npy members whose headers are known up front (the
+  row count is known before the first chunk); Parquet writes one row group
+  per chunk and needs the optional pyarrow (available_formats() says whether
+  it is installed)
+"""
+
+import importlib.util
+import io
+import math
+import zipfile
+
+import numpy as np
+
+CHUNK_ROWS = 65536
+MAX_FRAME_RATE = 1000
+FORMATS = {
+    'csv': 'text/csv',
+    'parquet': 'application/vnd.apache.parquet',
+    'npz': 'application/octet-stream'
+}
+INTERPOLATIONS = ('nearest', 'linear')
+CSV_FORMATS = {'frame': '%d', 'video_seconds': '%.6f', 'timestamp_unix': '%.3f', 'eda_scl_usiemens': '%.6f'}
+
+
+class ExportError(ValueError):
+    """Raised for export parameters that don't describe a window"""
+
+
+class ExportWindow:
+    """
+    Rows of one export: raw samples [lo, hi) of the window, or one row per
+    video frame when frame_rate is given
+    """
+
+    def __init__(self, dataset, index, offset=0.0, duration=None, frame_rate=None, interpolation='nearest'):
+        last_seconds = (int(dataset.epoch_ns[-1]) - dataset.origin_ns) / 1e9
+        if duration is None:
+            duration = last_seconds - offset
+        if not (math.isfinite(offset) and math.isfinite(duration)) or duration <= 0:
+            raise ExportError("The window needs a finite offset and a positive duration")
+        if frame_rate is not None and not 0 < frame_rate <= MAX_FRAME_RATE:
+            raise ExportError(f"frame_rate must be between 0 and {MAX_FRAME_RATE} frames per second")
+        if interpolation not in INTERPOLATIONS:
+            raise ExportError(f"interpolation must be one of: {', '.join(INTERPOLATIONS)}")
+
+        self.dataset = dataset
+        self.offset = offset
+        self.duration = duration
+        self.frame_rate = frame_rate
+        self.interpolation = interpolation
+        if frame_rate:
+            # Frames starting inside the video: 0, 1/fps, ... < duration
+            self.rows = int(math.ceil(duration * frame_rate - 1e-9))
+            self.columns = [('frame', np.int64), ('video_seconds', np.float64),
+                            ('timestamp_unix', np.float64), ('eda_scl_usiemens', np.float64)]
+        else:
+            self.lo, self.hi = index.sample_range(offset, offset + duration)
+            self.rows = self.hi - self.lo
+            self.columns = [('video_seconds', np.float64), ('timestamp_unix', np.float64),
+                            ('eda_scl_usiemens', np.float64)]
+
+    def chunks(self, chunk_rows=CHUNK_ROWS):
+        """{column: array} for consecutive slices of at most chunk_rows rows"""
+        for start in range(0, self.rows, chunk_rows):
+            stop = min(start + chunk_rows, self.rows)
+            yield self._frame_rows(start, stop) if self.frame_rate else self._sample_rows(start, stop)
+
+    def _sample_rows(self, start, stop):
+        dataset = self.dataset
+        epoch_ns = np.asarray(dataset.epoch_ns[self.lo + start:self.lo + stop], dtype=np.int64)
+        return {
+            'video_seconds': (epoch_ns - dataset.origin_ns) / 1e9 - self.offset,
+            'timestamp_unix': epoch_ns / 1e6,
+            'eda_scl_usiemens': np.asarray(dataset.values[self.lo + start:self.lo + stop], dtype=np.float64)
+        }
+
+    def _frame_rows(self, start, stop):
+        dataset = self.dataset
+        epoch_ns, values = dataset.epoch_ns, dataset.values
+        frames = np.arange(start, stop, dtype=np.int64)
+        video_seconds = frames / self.frame_rate
+        target = dataset.origin_ns + np.round((self.offset + video_seconds) * 1e9).astype(np.int64)
+
+        n = len(epoch_ns)
+        after = np.clip(epoch_ns.searchsorted(target, side='left'), 0, n - 1)
+        before = np.clip(after - 1, 0, n - 1)
+        t0 = np.asarray(epoch_ns[before], dtype=np.int64)
+        t1 = np.asarray(epoch_ns[after], dtype=np.int64)
+        v0, v1 = values[before], values[after]
+        if self.interpolation == 'linear':
+            span = np.maximum(t1 - t0, 1)
+            eda = v0 + (v1 - v0) * np.clip((target - t0) / span, 0, 1)
+        else:
+            # Ties go to the earlier sample, like TimeIndex.nearest
+            eda = np.where(target - t0 <= t1 - target, v0, v1)
+        # Frames outside the recording have no EDA value
+        eda = np.where((target < epoch_ns[0]) | (target > epoch_ns[n - 1]), np.nan, eda)
+        return {
+            'frame': frames,
+            'video_seconds': video_seconds,
+            'timestamp_unix': target / 1e6,
+            'eda_scl_usiemens': eda
+        }
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable file that hands back what was written since the last take()"""
+
+    def __init__(self):
+        super().__init__()
+        self._parts = []
+        self._position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._parts.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def take(self):
+        data = b''.join(self._parts)
+        self._parts = []
+        return data
+
+
+def _csv_chunks(window):
+    names = [name for name, _ in window.columns]
+    row = ','.join(CSV_FORMATS[name] for name in names) + '\n'
+    yield (','.join(names) + '\n').encode()
+    for columns in window.chunks():
+        # One %-format over the whole chunk: ~2x faster than np.savetxt's per-row loop
+        cells = np.column_stack([columns[name] for name in names]).ravel().tolist()
+        yield ((row * (len(cells) // len(names))) % tuple(cells)).replace('nan', '').encode()
+
+
+def _npz_chunks(window):
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_STORED, allowZip64=True) as archive:
+        for name, dtype in window.columns:
+            with archive.open(f'{name}.npy', 'w', force_zip64=True) as member:
+                np.lib.format.write_array_header_1_0(member, {
+                    'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)),
+                    'fortran_order': False,
+                    'shape': (window.rows,)
+                })
+                for columns in window.chunks():
+                    member.write(np.ascontiguousarray(columns[name], dtype=dtype).tobytes())
+                    yield sink.take()
+    yield sink.take()
+
+
+def _parquet_chunks(window):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportError("Parquet export needs pyarrow (pip install pyarrow)")
+
+    def chunks():
+        schema = pa.schema([(name, pa.from_numpy_dtype(dtype)) for name, dtype in window.columns])
+        sink = _ChunkSink()
+        with pq.ParquetWriter(sink, schema) as writer:
+            for columns in window.chunks():
+                writer.write_table(pa.table(columns, schema=schema))
+                yield sink.take()
+        yield sink.take()
+    return chunks()
+
+
+def available_formats():
+    """Formats that can be encoded here: Parquet only when pyarrow is installed (found, not imported)"""
+    return [fmt for fmt in FORMATS if fmt != 'parquet' or importlib.util.find_spec('pyarrow') is not None]
+
+
+def encode(window, fmt):
+    """
+    Generator of the encoded window's bytes
+    Raises ExportError up front (before any bytes) for unknown or unavailable formats
+    """
+    if fmt == 'csv':
+        return _csv_chunks(window)
+    if fmt == 'npz':
+        return _npz_chunks(window)
+    if fmt == 'parquet':
+        return _parquet_chunks(window)
+    raise ExportError(f"format must be one of: {', '.join(FORMATS)}")
+
+
+def export_filename(window, fmt):
+    """e.g. P001_eda_600s-900s_frames29.97.csv"""
+    end = window.offset + window.duration
+    mode = f"_frames{window.frame_rate:g}" if window.frame_rate else ''
+    return f"{window.dataset.participant_id}_eda_{window.offset:g}s-{end:g}s{mode}.{fmt}"
@@ -0,0 +1,49 @@
+"""
+EDA Time Index
+Binary search over the monotonic int64 epoch-nanosecond time axis
+- Window lookups and nearest-sample lookups are O(log n)
+- Works directly on memory-mapped or arithmetic time axes (no seconds copy)
+- Shared by the LOD pyramid, the plot builder and the dataset API
+"""
+
+import numpy as np
+
+
+class TimeIndex:
+    """
+    Sorted time column with O(log n) range and nearest queries
+    Queries take seconds from the first sample; the axis stays in int64 nanoseconds
+    Similar to a clustered index on a time column
+    """
+
+    def __init__(self, epoch_ns):
+        self.epoch_ns = epoch_ns
+        self.origin_ns = int(epoch_ns[0])
+
+    def __len__(self):
+        return len(self.epoch_ns)
+
+    @property
+    def duration(self):
+        return (int(self.epoch_ns[-1]) - self.origin_ns) / 1e9
+
+    def sample_range(self, start=None, end=None):
+        """Half-open sample index range [lo, hi) covering seconds in [start, end]"""
+        n = len(self.epoch_ns)
+        lo = 0 if start is None else int(self.epoch_ns.searchsorted(
+            self.origin_ns + int(np.ceil(start * 1e9)), side='left'))
+        hi = n if end is None else int(self.epoch_ns.searchsorted(
+            self.origin_ns + int(np.floor(end * 1e9)), side='right'))
+        return lo, max(lo, hi)
+
+    def nearest(self, t):
+        """Index of the sample closest in time to t (ties go to the earlier sample)"""
+        n = len(self.epoch_ns)
+        target = self.origin_ns + int(round(t * 1e9))
+        i = int(self.epoch_ns.searchsorted(target, side='left'))
+        if i <= 0:
+            return 0
+        if i >= n:
+            return n - 1
+        before, after = int(self.epoch_ns[i - 1]), int(self.epoch_ns[i])
+        return i - 1 if target - before <= after - target else i
@@ -0,0 +1,274 @@
+"""
+EDA Ingestion Engine
+Single-pass, vectorized CSV parsing for EDA recordings
+- Sniffs header/metadata rows from the first bytes of the file
+- Parses the file once with explicit dtypes
+- Builds the time axis arithmetically as an int64 nanosecond array
+- Formats display strings only when a caller asks for them
+- pandas (CSV reader, time zones) is imported on first parse or display
+  string, not when the module loads
+"""
+
+import csv
+import re
+from datetime import datetime, timezone
+from functools import cached_property
+
+import numpy as np
+
+DISPLAY_TIMEZONE = 'US/Eastern'
+TIME_DISPLAY_FORMAT = '%I:%M:%S %p EST'
+DATE_DISPLAY_FORMAT = '%m/%d/%Y'
+
+# Fallback start used when a file carries no time information at all
+INDEX_START_NS = int(datetime(2025, 1, 1, tzinfo=timezone.utc).timestamp()) * 1_000_000_000
+INDEX_STEP_NS = 60 * 1_000_000_000  # 1-minute intervals
+
+EDA_COLUMN_CANDIDATES = ['eda_scl_usiemens', 'eda', 'EDA', 'skin_conductance', 'scl', 'electrodermal']
+TIMESTAMP_COLUMN_CANDIDATES = ['timestamp_iso', 'timestamp', 'time', 'datetime']
+UNIX_TIMESTAMP_COLUMN = 'timestamp_unix'
+PARTICIPANT_COLUMN = 'participant_full_id'
+
+NUMERIC_HEADER_PATTERN = re.compile(r'^\d+\.?\d*$')
+SNIFF_BYTES = 64 * 1024
+
+
+class IngestError(ValueError):
+    """Raised when a CSV file cannot be turned into an EDA dataset"""
+
+
+class EDADataset:
+    """
+    Parsed EDA recording held as flat NumPy columns
+    Similar to a read-only Model/Entity in ASP.NET
+    """
+
+    def __init__(self, epoch_ns, values, participant_id='Unknown', missing=0):
+        self.epoch_ns = epoch_ns  # int64 nanoseconds since the UNIX epoch (UTC)
+        self.values = values  # float64 EDA samples (µS)
+        self.participant_id = participant_id
+        self.missing = missing
+        self.origin_ns = int(epoch_ns[0])
+
+    def __len__(self):
+        return len(self.values)
+
+    def seconds_at(self, key=slice(None)):
+        """Seconds from the first sample for a slice or index array"""
+        return (np.asarray(self.epoch_ns[key], dtype=np.int64) - self.origin_ns) / 1e9
+
+    @cached_property
+    def seconds(self):
+        """Full float64 seconds-from-start column (materialized on first use)"""
+        return self.seconds_at()
+
+    @property
+    def first_datetime(self):
+        """Timestamp of the first valid sample in the display timezone"""
+        import pandas as pd
+        return pd.Timestamp(self.origin_ns, tz='UTC').tz_convert(DISPLAY_TIMEZONE)
+
+    def datetimes(self, key=slice(None)):
+        """DatetimeIndex in the display timezone for a slice or index array"""
+        import pandas as pd
+        return pd.DatetimeIndex(np.asarray(self.epoch_ns[key], dtype=np.int64), tz='UTC').tz_convert(DISPLAY_TIMEZONE)
+
+    def time_display(self, key=slice(None)):
+        """12-hour EST time strings, formatted on demand for the requested samples"""
+        return np.asarray(self.datetimes(key).strftime(TIME_DISPLAY_FORMAT), dtype=object)
+
+    def date_display(self, index=0):
+        """Session date string for a single sample"""
+        return self.datetimes(slice(index, index + 1)).strftime(DATE_DISPLAY_FORMAT)[0]
+
+    def stats(self):
+        """Summary statistics over the whole recording"""
+        values = self.values
+        return {
+            'mean': float(values.mean()),
+            'std': float(values.std(ddof=1)) if len(values) > 1 else float('nan'),
+            'min': float(values.min()),
+            'max': float(values.max()),
+            'count': len(values),
+            'missing': self.missing,
+            'start_time': self.time_display(slice(0, 1))[0],
+            'end_time': self.time_display(slice(-1, None))[0],
+            'date': self.date_display(0)
+        }
+
+
+def sniff_csv(filepath, sniff_bytes=SNIFF_BYTES):
+    """
+    Inspect the first bytes of a CSV file without parsing the whole thing
+    Returns a dict describing the layout ('headered', 'empatica' or 'headerless')
+    """
+    with open(filepath, 'r', newline='', encoding='utf-8-sig') as f:
+        head = f.read(sniff_bytes)
+
+    lines = [line for line in head.splitlines() if line.strip()]
+    if not lines:
+        raise IngestError("CSV file is empty")
+
+    first_row = next(csv.reader([lines[0]]))
+    header = [field.strip() for field in first_row]
+
+    if not all(NUMERIC_HEADER_PATTERN.match(field) for field in header):
+        return {'layout': 'headered', 'columns': header}
+
+    if len(header) == 1:
+        first_val = float(header[0])
+        if first_val > 1000000000 and len(lines) > 1:
+            # Empatica layout: start timestamp, sampling rate, then samples
+            return {
+                'layout': 'empatica',
+                'base_timestamp': first_val,
+                'sampling_rate': float(lines[1].split(',')[0])
+            }
+        if first_val > 1000000000:
+            return {'layout': 'empatica', 'base_timestamp': first_val, 'sampling_rate': 4.0}
+
+    return {'layout': 'headerless', 'n_columns': len(header)}
+
+
+def _index_time_axis(n):
+    """1-minute synthetic time axis for files without timestamps"""
+    return INDEX_START_NS + np.arange(n, dtype=np.int64) * INDEX_STEP_NS
+
+
+def _float_to_ns(timestamps, unit_ns):
+    """
+    Float epoch timestamps (seconds or ms) to int64 nanoseconds
+    Whole and fractional parts are scaled separately; multiplying the full value
+    by unit_ns first would round away hundreds of nanoseconds at epoch magnitudes
+    """
+    whole = np.floor(timestamps)
+    fraction = np.rint((timestamps - whole) * unit_ns)
+    return whole.astype(np.int64) * unit_ns + fraction.astype(np.int64)
+
+
+def _parse_datetime_column(column):
+    """Parse a timestamp column to int64 UTC nanoseconds"""
+    import pandas as pd
+    try:
+        parsed = pd.to_datetime(column, utc=True, format='ISO8601')
+    except (ValueError, TypeError):
+        parsed = pd.to_datetime(column, utc=True, format='mixed')
+    return parsed.to_numpy(dtype='datetime64[ns]').view(np.int64)
+
+
+def _read_empatica(filepath, layout):
+    import pandas as pd
+    values = pd.read_csv(
+        filepath, header=None, skiprows=2, usecols=[0],
+        dtype={0: np.float64}, engine='c'
+    )[0].to_numpy()
+    rate = layout['sampling_rate'] or 4.0
+    base_ns = int(_float_to_ns(np.float64(layout['base_timestamp']), 1_000_000_000))
+    offsets = np.rint(np.arange(len(values), dtype=np.float64) * (1e9 / rate)).astype(np.int64)
+    return base_ns + offsets, values, None
+
+
+def _read_headerless(filepath, layout):
+    import pandas as pd
+    if layout['n_columns'] == 1:
+        values = pd.read_csv(
+            filepath, header=None, usecols=[0], dtype={0: np.float64}, engine='c'
+        )[0].to_numpy()
+        return _index_time_axis(len(values)), values, None
+
+    # Multiple columns - first is timestamp, second is EDA
+    df = pd.read_csv(filepath, header=None, usecols=[0, 1], engine='c')
+    values = pd.to_numeric(df[1], errors='coerce').to_numpy(dtype=np.float64)
+    ts = df[0]
+    try:
+        if ts.dtype.kind in 'if':
+            epoch_ns = _float_to_ns(ts.to_numpy(dtype=np.float64), 1_000_000_000)
+        else:
+            epoch_ns = _parse_datetime_column(ts)
+    except (ValueError, TypeError):
+        epoch_ns = _index_time_axis(len(df))
+    return epoch_ns, values, None
+
+
+def _find_eda_column(columns):
+    for col in EDA_COLUMN_CANDIDATES:
+        if col in columns:
+            return col
+    for col in columns:
+        if 'eda' in str(col).lower():
+            return col
+    return None
+
+
+def _read_headered(filepath, layout):
+    import pandas as pd
+    columns = layout['columns']
+    eda_column = _find_eda_column(columns)
+    if not eda_column:
+        raise IngestError(
+            f"No EDA column found in CSV file. Available columns: {', '.join(columns)}"
+        )
+
+    ts_column = UNIX_TIMESTAMP_COLUMN if UNIX_TIMESTAMP_COLUMN in columns else next(
+        (col for col in TIMESTAMP_COLUMN_CANDIDATES if col in columns), None
+    )
+    usecols = [c for c in (eda_column, ts_column, PARTICIPANT_COLUMN) if c and c in columns]
+    dtypes = {PARTICIPANT_COLUMN: 'category'}
+    if ts_column == UNIX_TIMESTAMP_COLUMN:
+        dtypes[ts_column] = np.float64
+
+    df = pd.read_csv(filepath, usecols=usecols, dtype=dtypes, engine='c', encoding='utf-8-sig')
+    values = pd.to_numeric(df[eda_column], errors='coerce').to_numpy(dtype=np.float64)
+
+    if ts_column == UNIX_TIMESTAMP_COLUMN:
+        # UNIX timestamps in milliseconds
+        epoch_ns = _float_to_ns(df[ts_column].to_numpy(), 1_000_000)
+    elif ts_column:
+        epoch_ns = _parse_datetime_column(df[ts_column])
+    else:
+        epoch_ns = _index_time_axis(len(df))
+
+    participants = df[PARTICIPANT_COLUMN] if PARTICIPANT_COLUMN in df.columns else None
+    return epoch_ns, values, participants
+
+
+READERS = {
+    'empatica': _read_empatica,
+    'headerless': _read_headerless,
+    'headered': _read_headered,
+}
+
+
+def load_eda_dataset(filepath):
+    """
+    Parse an EDA CSV file into an EDADataset in a single pass
+    Raises IngestError when the file holds no usable EDA samples
+    """
+    layout = sniff_csv(filepath)
+    epoch_ns, values, participants = READERS[layout['layout']](filepath, layout)
+
+    valid = ~np.isnan(values)
+    n_valid = int(valid.sum())
+    if n_valid == 0:
+        raise IngestError("No valid EDA data found in file")
+
+    participant_id = 'Unknown'
+    if participants is not None:
+        participant_id = str(participants.iloc[int(np.argmax(valid))])
+
+    if n_valid != len(values):
+        epoch_ns = epoch_ns[valid]
+        values = values[valid]
+
+    # Downstream lookups binary-search the time axis, so it must be monotonic
+    if len(epoch_ns) > 1 and (np.diff(epoch_ns) < 0).any():
+        order = np.argsort(epoch_ns, kind='stable')
+        epoch_ns = epoch_ns[order]
+        values = values[order]
+
+    return EDADataset(
+        np.ascontiguousarray(epoch_ns, dtype=np.int64),
+        np.ascontiguousarray(values, dtype=np.float64),
+        participant_id=participant_id,
+        missing=len(valid) - n_valid
+    )
@@ -0,0 +1,341 @@
+"""
+Live EDA Streams
+Append-only ingestion of sample batches while a session is running (e.g. from
+a local device bridge), pushed to open browsers as server-sent events
+- Stats are merged per batch (count/mean/M2, Chan et al.), never recomputed
+- The level-of-detail structure is updated in place: level k holds min/max
+  buckets of 2**k samples and a batch only touches the buckets it falls in
+- Raw samples and every level live in fixed-size rings, so memory is bounded
+  however long the session runs: fine levels cover the recent past, coarse
+  levels the whole session
+- Per-batch cost depends only on the batch size, not on the stream's length
+- Each batch is decimated to a few points once and the encoded event is kept
+  in a bounded backlog that subscribers read from (and resume with Last-Event-ID)
+"""
+
+import json
+import threading
+import time
+import uuid
+from collections import deque
+
+import numpy as np
+
+RAW_CAPACITY = 1 << 16  # Most recent raw samples kept
+LEVEL_CAPACITY = 1 << 12  # Buckets kept per level
+NUM_LEVELS = 20  # Coarsest buckets hold 2**20 samples
+MAX_BATCH_SAMPLES = 100_000
+EVENT_BACKLOG = 256  # Encoded batch events kept for subscribers
+EVENT_MAX_POINTS = 200  # A batch is decimated to about this many points per event
+MAX_TIMESTAMP_NS = 1 << 62  # About the year 2116; keeps every timestamp (and its differences) inside int64
+
+
+class LiveError(ValueError):
+    """Raised for batches that can't be appended (bad shape, time going backwards, closed stream)"""
+
+
+class Ring:
+    """Fixed-capacity columns; appending past capacity overwrites the oldest rows"""
+
+    def __init__(self, capacity, **dtypes):
+        self.capacity = capacity
+        self.columns = {name: np.empty(capacity, dtype=dtype) for name, dtype in dtypes.items()}
+        self.count = 0  # Rows ever appended
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    @property
+    def complete(self):
+        """True while nothing has been overwritten yet"""
+        return self.count <= self.capacity
+
+    def append(self, **columns):
+        n = len(next(iter(columns.values())))
+        skip = max(0, n - self.capacity)
+        positions = (self.count + np.arange(skip, n)) % self.capacity
+        for name, values in columns.items():
+            self.columns[name][positions] = values[skip:]
+        self.count += n
+
+    def last(self, name):
+        return self.columns[name][(self.count - 1) % self.capacity]
+
+    def set_last(self, **values):
+        for name, value in values.items():
+            self.columns[name][(self.count - 1) % self.capacity] = value
+
+    def ordered(self, name):
+        """Column oldest-first (a copy of at most capacity rows)"""
+        column = self.columns[name]
+        if self.complete:
+            return column[:self.count].copy()
+        split = self.count % self.capacity
+        return np.concatenate([column[split:], column[:split]])
+
+
+def minmax_buckets(ids, t, v):
+    """
+    Per run of equal ids: (id, t_min, v_min, t_max, v_max), the first
+    occurrence winning ties; ids must be non-decreasing
+    """
+    n = len(ids)
+    starts = np.concatenate(([0], np.flatnonzero(ids[1:] != ids[:-1]) + 1))
+    segment = np.repeat(np.arange(len(starts)), np.diff(starts, append=n))
+    positions = np.arange(n)
+    v_min = np.minimum.reduceat(v, starts)
+    v_max = np.maximum.reduceat(v, starts)
+    i_min = np.minimum.reduceat(np.where(v == v_min[segment], positions, n), starts)
+    i_max = np.minimum.reduceat(np.where(v == v_max[segment], positions, n), starts)
+    return ids[starts], t[i_min], v_min, t[i_max], v_max
+
+
+def _interleave(t_min, v_min, t_max, v_max):
+    """Bucket min/max pairs as one time-ordered point list"""
+    t = np.stack([t_min, t_max], axis=1)
+    v = np.stack([v_min, v_max], axis=1)
+    order = np.argsort(t, axis=1, kind='stable')
+    t = np.take_along_axis(t, order, axis=1).ravel()
+    v = np.take_along_axis(v, order, axis=1).ravel()
+    keep = np.r_[True, t[1:] != t[:-1]]  # Min and max may be the same sample
+    return t[keep], v[keep]
+
+
+class LiveStream:
+    """
+    One live recording: bounded raw tail, in-place LOD levels, running stats
+    and a backlog of encoded batch events
+    Similar to a SignalR hub fed by a device gateway in ASP.NET Core
+    """
+
+    def __init__(self, participant_id='Live', rate=None):
+        self.id = uuid.uuid4().hex
+        self.participant_id = participant_id
+        self.period_ns = int(round(1e9 / rate)) if rate else None
+        self.created = time.time()
+        self.closed = False
+        self.raw = Ring(RAW_CAPACITY, t=np.int64, v=np.float64)
+        self.levels = [Ring(LEVEL_CAPACITY, bucket=np.int64, t_min=np.int64, v_min=np.float64,
+                            t_max=np.int64, v_max=np.float64) for _ in range(NUM_LEVELS)]
+        self.count = 0
+        self.first_ns = None
+        self.last_ns = None
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._min = np.inf
+        self._max = -np.inf
+        self.events = deque(maxlen=EVENT_BACKLOG)  # (id, encoded JSON)
+        self.event_id = 0
+        self.subscribers = 0  # Open event connections, counted by LiveRegistry
+        self._changed = threading.Condition()
+
+    def append(self, values, timestamps_ns=None):
+        """
+        Add a batch (timestamps in epoch ns, or continuing at the stream's rate)
+        Returns the batch event (decimated points and updated stats)
+        """
+        values = np.asarray(values, dtype=np.float64)
+        n = len(values)
+        if values.ndim != 1 or not 0 < n <= MAX_BATCH_SAMPLES:
+            raise LiveError(f"A batch needs 1 to {MAX_BATCH_SAMPLES:,} values")
+        if not np.isfinite(values).all():
+            raise LiveError("Values must be finite numbers")
+
+        with self._changed:
+            if self.closed:
+                raise LiveError("Stream is closed")
+            if timestamps_ns is None:
+                if self.period_ns is None:
+                    raise LiveError("Stream has no sample rate; send timestamps with each batch")
+                start = self.last_ns + self.period_ns if self.last_ns is not None else time.time_ns()
+                t = start + np.arange(n, dtype=np.int64) * self.period_ns
+            else:
+                t = np.asarray(timestamps_ns)
+                if t.shape != values.shape:
+                    raise LiveError("timestamps and values must have the same length")
+                # Checked before the int64 cast: NaN or huge floats would turn into garbage times
+                if not (np.isfinite(t).all() and (t >= 0).all() and (t < MAX_TIMESTAMP_NS).all()):
+                    raise LiveError("Timestamps must be finite epoch times between 1970 and 2116")
+                t = t.astype(np.int64)
+                if np.any(np.diff(t) < 0) or (self.last_ns is not None and t[0] < self.last_ns):
+                    raise LiveError("Timestamps must not go backwards")
+
+            first_index = self.count
+            self.raw.append(t=t, v=values)
+            indices = first_index + np.arange(n, dtype=np.int64)
+            lo, hi = int(values.argmin()), int(values.argmax())
+            for k, ring in enumerate(self.levels, 1):
+                if first_index >> k == (first_index + n - 1) >> k:
+                    # The whole batch falls in one bucket (every coarser level too, beyond small k)
+                    buckets = (indices[:1] >> k, t[lo:lo + 1], values[lo:lo + 1], t[hi:hi + 1], values[hi:hi + 1])
+                else:
+                    buckets = minmax_buckets(indices >> k, t, values)
+                self._update_level(ring, buckets)
+            self._update_stats(values)
+            if self.first_ns is None:
+                self.first_ns = int(t[0])
+            self.last_ns = int(t[-1])
+
+            event = self._batch_event(indices, t, values)
+            self.event_id += 1
+            event['id'] = self.event_id
+            self.events.append((self.event_id, json.dumps(event)))
+            self._changed.notify_all()
+        return event
+
+    @staticmethod
+    def _update_level(ring, buckets):
+        bucket, t_min, v_min, t_max, v_max = buckets
+        if len(ring) and ring.last('bucket') == bucket[0]:
+            # The batch continues the level's open bucket
+            if v_min[0] < ring.last('v_min'):
+                ring.set_last(t_min=t_min[0], v_min=v_min[0])
+            if v_max[0] > ring.last('v_max'):
+                ring.set_last(t_max=t_max[0], v_max=v_max[0])
+            bucket, t_min, v_min, t_max, v_max = bucket[1:], t_min[1:], v_min[1:], t_max[1:], v_max[1:]
+        if len(bucket):
+            ring.append(bucket=bucket, t_min=t_min, v_min=v_min, t_max=t_max, v_max=v_max)
+
+    def _update_stats(self, values):
+        n = len(values)
+        mean = float(values.mean())
+        m2 = float(np.square(values - mean).sum())
+        total = self.count + n
+        delta = mean - self._mean
+        self._mean += delta * n / total
+        self._m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+        self._min = min(self._min, float(values.min()))
+        self._max = max(self._max, float(values.max()))
+
+    def _batch_event(self, indices, t, values):
+        if len(values) > EVENT_MAX_POINTS:
+            width = -(-len(values) // (EVENT_MAX_POINTS // 2))
+            _, t_min, v_min, t_max, v_max = minmax_buckets(indices // width, t, values)
+            t, values = _interleave(t_min, v_min, t_max, v_max)
+        return {
+            'seconds': ((t - self.first_ns) / 1e9).tolist(),
+            'values': values.tolist(),
+            'stats': self.stats()
+        }
+
+    def stats(self):
+        """Running summary over every sample received"""
+        if not self.count:
+            return {'count': 0, 'mean': 0, 'std': 0, 'min': 0, 'max': 0, 'duration': 0}
+        return {
+            'count': self.count,
+            'mean': self._mean,
+            'std': float(np.sqrt(self._m2 / (self.count - 1))) if self.count > 1 else 0,
+            'min': self._min,
+            'max': self._max,
+            'duration': (self.last_ns - self.first_ns) / 1e9
+        }
+
+    def window(self, seconds=None, max_points=4000):
+        """
+        Decimated points for the last seconds of the stream (everything retained if None)
+        Returns (level, seconds from the first sample, values); level 0 is raw samples
+        """
+        with self._changed:
+            if not self.count:
+                return 0, [], []
+            since = self.first_ns if seconds is None else self.last_ns - int(seconds * 1e9)
+
+            t = self.raw.ordered('t')
+            if self.raw.complete or t[0] <= since:
+                lo = int(t.searchsorted(since, side='left'))
+                if len(t) - lo <= max_points:
+                    return 0, ((t[lo:] - self.first_ns) / 1e9).tolist(), self.raw.ordered('v')[lo:].tolist()
+
+            for level, ring in enumerate(self.levels, 1):
+                t_max = ring.ordered('t_max')
+                t_min = ring.ordered('t_min')
+                covers = ring.complete or min(t_min[0], t_max[0]) <= since or level == NUM_LEVELS
+                lo = int(np.maximum(t_min, t_max).searchsorted(since, side='left'))
+                if covers and 2 * (len(t_max) - lo) <= max_points:
+                    t, v = _interleave(t_min[lo:], ring.ordered('v_min')[lo:], t_max[lo:], ring.ordered('v_max')[lo:])
+                    return level, ((t - self.first_ns) / 1e9).tolist(), v.tolist()
+            return NUM_LEVELS, [], []
+
+    def events_after(self, last_id, timeout):
+        """
+        Encoded events with id > last_id, waiting up to timeout for one
+        Returns None if the client fell behind the backlog and must reload the window
+        """
+        with self._changed:
+            if self.event_id <= last_id and not self.closed:
+                self._changed.wait(timeout)
+            if self.events and last_id < self.events[0][0] - 1:
+                return None
+            return [(event_id, data) for event_id, data in self.events if event_id > last_id]
+
+    def close(self):
+        with self._changed:
+            self.closed = True
+            self._changed.notify_all()
+
+    def to_dict(self):
+        with self._changed:
+            return {
+                'stream_id': self.id,
+                'participant_id': self.participant_id,
+                'sample_rate': 1e9 / self.period_ns if self.period_ns else None,
+                'first_ns': self.first_ns,
+                'closed': self.closed,
+                'last_event_id': self.event_id,
+                'stats': self.stats()
+            }
+
+
+class LiveRegistry:
+    """
+    Open live streams; creating more than max_streams is refused
+    Event subscribers are capped too, in total and per stream: each one holds a
+    server thread for as long as it is connected
+    """
+
+    def __init__(self, max_streams=16, max_subscribers=8, max_subscribers_per_stream=4):
+        self.max_streams = max_streams
+        self.max_subscribers = max_subscribers
+        self.max_subscribers_per_stream = max_subscribers_per_stream
+        self.subscribers = 0
+        self._streams = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._streams)
+
+    def create(self, participant_id='Live', rate=None):
+        with self._lock:
+            if len(self._streams) >= self.max_streams:
+                raise LiveError(f"At most {self.max_streams} live streams at a time")
+            stream = LiveStream(participant_id, rate)
+            self._streams[stream.id] = stream
+        return stream
+
+    def get(self, stream_id):
+        with self._lock:
+            return self._streams.get(stream_id)
+
+    def subscribe(self, stream):
+        """Count a new event subscriber of stream; raises LiveError if either cap is reached"""
+        with self._lock:
+            if self.subscribers >= self.max_subscribers:
+                raise LiveError(f"At most {self.max_subscribers} live event connections at a time")
+            if stream.subscribers >= self.max_subscribers_per_stream:
+                raise LiveError(f"At most {self.max_subscribers_per_stream} event connections per live stream")
+            self.subscribers += 1
+            stream.subscribers += 1
+
+    def unsubscribe(self, stream):
+        with self._lock:
+            self.subscribers -= 1
+            stream.subscribers -= 1
+
+    def discard(self, stream_id):
+        with self._lock:
+            stream = self._streams.pop(stream_id, None)
+        if stream is not None:
+            stream.close()
+        return stream
@@ -0,0 +1,74 @@
+"""
+EDA Level-of-Detail Pyramid
+Min/max decimation at power-of-two levels so plots never ship every sample
+- Level k summarises buckets of 2**k samples by the index of their min and max
+- Built once per dataset in O(n) with vectorized pairwise reductions
+- Queries pick the finest level that fits the point budget for a time window
+"""
+
+import numpy as np
+
+DEFAULT_MAX_POINTS = 4000
+
+
+class LODPyramid:
+    """
+    Power-of-two min/max pyramid over a sorted time series
+    Only sample indices are stored; times and values are looked up on demand
+    """
+
+    def __init__(self, values, index):
+        self.index = index
+        self.values = values
+        self.levels = self._build(values)
+
+    @staticmethod
+    def _build(values):
+        """Pairwise-reduce argmin/argmax indices until one bucket remains"""
+        n = len(values)
+        index_dtype = np.int32 if n < 2 ** 31 else np.int64
+        min_idx = max_idx = np.arange(n, dtype=index_dtype)
+        levels = [None]  # Level 0 is the raw series itself
+
+        while len(min_idx) > 1:
+            if len(min_idx) % 2:
+                # Pad odd-length levels with their last bucket
+                min_idx = np.append(min_idx, min_idx[-1])
+                max_idx = np.append(max_idx, max_idx[-1])
+            left_min, right_min = min_idx[0::2], min_idx[1::2]
+            left_max, right_max = max_idx[0::2], max_idx[1::2]
+            min_idx = np.where(values[right_min] < values[left_min], right_min, left_min)
+            max_idx = np.where(values[right_max] > values[left_max], right_max, left_max)
+            levels.append((min_idx, max_idx))
+
+        return levels
+
+    @property
+    def nbytes(self):
+        return sum(mn.nbytes + mx.nbytes for mn, mx in self.levels[1:])
+
+    def query(self, start=None, end=None, max_points=DEFAULT_MAX_POINTS):
+        """
+        Sample indices to plot for a time window, capped at about max_points
+        Returns (level, indices) where indices are sorted positions into the series
+        """
+        lo, hi = self.index.sample_range(start, end)
+        if hi - lo <= max_points:
+            return 0, np.arange(lo, hi)
+
+        # Each bucket contributes two points (its min and its max)
+        max_buckets = max(1, max_points // 2)
+        level = 1
+        while level < len(self.levels) - 1 and ((hi - 1) >> level) - (lo >> level) + 1 > max_buckets:
+            level += 1
+
+        first, last = lo >> level, ((hi - 1) >> level) + 1
+        min_idx, max_idx = self.levels[level]
+        pairs = np.sort(np.stack([min_idx[first:last], max_idx[first:last]], axis=1), axis=1)
+        indices = pairs.ravel()
+        # Edge buckets may straddle the window; keep only samples inside it
+        indices = indices[(indices >= lo) & (indices < hi)]
+        # Buckets whose min and max are the same sample only need one point
+        keep = np.ones(len(indices), dtype=bool)
+        np.not_equal(indices[1:], indices[:-1], out=keep[1:])
+        return level, indices[keep]
@@ -0,0 +1,128 @@
+"""
+EDA Service Layer
+Recording processing shared by the web app, background jobs and batch runs
+- Kept free of Flask so process-pool workers can import it cheaply
+- Parse and stats time is recorded in the metrics registry; diagnostics go to
+  the module logger (debug level) instead of stdout
+- Similar to a Service/Repository pattern in ASP.NET
+"""
+
+import logging
+import re
+from datetime import datetime
+
+import pytz
+
+import metrics
+from eda_ingest import load_eda_dataset, IngestError
+
+log = logging.getLogger(__name__)
+
+EST = pytz.timezone('US/Eastern')
+
+# YYYY-MM-DD_HH_MM_SS in video filenames; handles both underscore and dash separators
+VIDEO_TIMESTAMP_PATTERN = re.compile(r'(\d{4})-(\d{2})-(\d{2})[_-](\d{2})[_-](\d{2})[_-](\d{2})')
+
+
+def process_eda_file(filepath):
+    """
+    Process EDA CSV file and extract data
+    Similar to a Service/Repository pattern in ASP.NET
+    Parsing is delegated to the single-pass ingestion engine (eda_ingest)
+    """
+    try:
+        with metrics.timer('stage_seconds', stage='parse'):
+            dataset = load_eda_dataset(filepath)
+        with metrics.timer('stage_seconds', stage='stats'):
+            stats = dataset.stats()
+        return {'dataset': dataset, 'stats': stats}, None
+
+    except IngestError as e:
+        return None, str(e)
+    except Exception as e:
+        log.exception("process_eda_file failed for %s", filepath)
+        return None, f"Error processing file: {str(e)}"
+
+
+def window_stats(dataset, lo, hi, index=None):
+    """
+    Mean/std/min/max/count over the raw samples in [lo, hi)
+    With a WindowStatsIndex (eda_stats) this is answered from prefix sums and
+    the LOD buckets; without one the window is scanned (fine for one-off windows)
+    """
+    if index is not None:
+        return index.stats(lo, hi)
+    window_values = dataset.values[lo:hi]
+    return {
+        'mean': float(window_values.mean()) if hi > lo else 0,
+        'std': float(window_values.std(ddof=1)) if hi - lo > 1 else 0,
+        'min': float(window_values.min()) if hi > lo else 0,
+        'max': float(window_values.max()) if hi > lo else 0,
+        'count': hi - lo
+    }
+
+
+def parse_video_start_time_from_filename(filename):
+    """
+    Parse video start time from filename format:
+    Example: "SYS1Cam3--2018-05-14_10_22_27_frames_1-9470.mp4"
+    Returns: "10:22:27" (HH:MM:SS format) or None if not found
+    """
+    match = VIDEO_TIMESTAMP_PATTERN.search(filename)
+    
+    if match:
+        year, month, day, hour, minute, second = match.groups()
+        # Return just the time portion in HH:MM:SS format
+        time_str = f"{hour}:{minute}:{second}"
+        log.debug("Parsed video start time from filename %r: %s", filename, time_str)
+        return time_str
+    else:
+        log.debug("Could not parse video start time from filename %r", filename)
+        return None
+
+
+def parse_video_start_datetime_from_filename(filename):
+    """
+    Full video start (date and time, EST-aware) from the same filename format
+    Used to pair videos with recordings when there is no date to borrow
+    Returns None if the filename carries no timestamp
+    """
+    match = VIDEO_TIMESTAMP_PATTERN.search(filename)
+    if not match:
+        return None
+    try:
+        naive = datetime(*(int(part) for part in match.groups()))
+    except ValueError:
+        return None  # e.g. month 13
+    return EST.localize(naive)
+
+
+def video_offset_for(dataset, video_start_time):
+    """Seconds between the first EDA sample and the video start (HH:MM[:SS] EST)"""
+    try:
+        # Get the date from the first data point (already EST-aware)
+        first_data_time = dataset.first_datetime.to_pydatetime()
+        
+        video_date = first_data_time.date()
+        
+        # Parse the video start time (could be HH:MM:SS or HH:MM)
+        if len(video_start_time.split(':')) == 2:
+            video_start_time += ':00'  # Add seconds if not provided
+        
+        # Create a datetime object for video start (timezone-naive first)
+        video_start_dt = datetime.strptime(f"{video_date} {video_start_time}", '%Y-%m-%d %H:%M:%S')
+        # Then localize to EST
+        video_start_dt = EST.localize(video_start_dt)
+        
+        # Calculate offset in seconds: how many seconds after data start did video start?
+        # Positive = video started after data collection began
+        # Negative = video started before data collection (unusual)
+        video_offset_seconds = (video_start_dt - first_data_time).total_seconds()
+        
+        log.debug("Video offset %.3f s (data start %s, video start %s)",
+                  video_offset_seconds, first_data_time, video_start_dt)
+        return video_offset_seconds
+        
+    except Exception:
+        log.warning("Could not parse video start time %r", video_start_time, exc_info=True)
+        return 0
@@ -0,0 +1,230 @@
+"""
+EDA Sessions
+Several EDA streams (wristbands) and camera videos on one shared time axis
+- Each stream keeps its own cached arrays, time index and LOD levels; a session
+  only records where every stream and video starts (epoch ns), so nothing is
+  copied or merged up front
+- A window on the session axis is shifted into each stream's own seconds and
+  answered by that stream's binary search and LOD pyramid: O(log n) per
+  stream plus the points returned, however long the recordings are
+- 'resample' mode puts all streams on one common time grid instead: each grid
+  cell is the mean of the raw samples in it, from the stream's prefix sums
+  (one binary search per cell boundary, no rescans)
+- Videos get their own start (from the filename, or given) and duration
+"""
+
+import re
+import threading
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+
+from eda_service import EST, parse_video_start_datetime_from_filename, window_stats
+
+MAX_SESSION_STREAMS = 32
+MAX_SESSION_VIDEOS = 16
+CAMERA_LABEL_PATTERN = re.compile(r'(Cam\d+)', re.IGNORECASE)
+
+
+class SessionError(ValueError):
+    """Raised for session definitions that can't be placed on a time axis"""
+
+
+class SessionStream:
+    """One EDA recording in a session: a cached dataset and its time span"""
+
+    def __init__(self, dataset_id, dataset, label=None):
+        self.dataset_id = dataset_id
+        self.label = label or dataset.participant_id
+        self.participant_id = dataset.participant_id
+        self.start_ns = int(dataset.epoch_ns[0])
+        self.end_ns = int(dataset.epoch_ns[-1])
+        self.samples = len(dataset)
+
+
+class SessionVideo:
+    """One camera angle in a session: where it starts and how long it runs"""
+
+    def __init__(self, filename, url, start_ns, duration=None, frame_rate=None, label=None):
+        match = CAMERA_LABEL_PATTERN.search(filename)
+        self.filename = filename
+        self.url = url
+        self.label = label or (match.group(1) if match else filename)
+        self.start_ns = start_ns
+        self.duration = duration
+        self.frame_rate = frame_rate
+
+    @property
+    def end_ns(self):
+        return self.start_ns + int(round((self.duration or 0) * 1e9))
+
+
+def video_start_ns(filename, start_time=None, reference=None):
+    """
+    Epoch ns at which a video starts
+    start_time may be an ISO datetime (naive = EST) or HH:MM[:SS] EST on the
+    reference dataset's date; otherwise the full timestamp in the filename is used
+    """
+    if start_time:
+        try:
+            if re.fullmatch(r'\d{1,2}:\d{2}(:\d{2})?', start_time):
+                if reference is None:
+                    raise SessionError(f"{filename}: a time of day needs at least one EDA stream for its date")
+                date = datetime.fromtimestamp(reference.start_ns / 1e9, tz=EST).date()
+                naive = datetime.strptime(f"{date} {start_time if start_time.count(':') == 2 else start_time + ':00'}",
+                                          '%Y-%m-%d %H:%M:%S')
+            else:
+                naive = datetime.fromisoformat(start_time)
+        except ValueError:
+            raise SessionError(f"{filename}: unrecognized start time {start_time!r}")
+        start = naive if naive.tzinfo else EST.localize(naive)
+    else:
+        start = parse_video_start_datetime_from_filename(filename)
+        if start is None:
+            raise SessionError(f"{filename}: no start time given and none in the filename")
+    return int(round(start.timestamp() * 1e9))
+
+
+class Session:
+    """
+    Streams and videos on a shared axis: seconds from the earliest start among them
+    Similar to a composite view model over several aggregates in ASP.NET
+    """
+
+    def __init__(self, streams, videos=()):
+        if not streams:
+            raise SessionError("A session needs at least one EDA stream")
+        if len(streams) > MAX_SESSION_STREAMS or len(videos) > MAX_SESSION_VIDEOS:
+            raise SessionError(f"At most {MAX_SESSION_STREAMS} streams and {MAX_SESSION_VIDEOS} videos per session")
+        self.id = uuid.uuid4().hex
+        self.streams = list(streams)
+        self.videos = list(videos)
+        members = self.streams + self.videos
+        self.origin_ns = min(m.start_ns for m in members)
+        self.end_ns = max(m.end_ns for m in members)
+
+    def offset(self, start_ns):
+        """Seconds on the session axis at which something starting at start_ns begins"""
+        return (start_ns - self.origin_ns) / 1e9
+
+    def to_dict(self):
+        origin = datetime.fromtimestamp(self.origin_ns / 1e9, tz=EST)
+        return {
+            'session_id': self.id,
+            'time_origin': origin.replace(tzinfo=None).isoformat(),
+            'utc_offset_seconds': origin.utcoffset().total_seconds(),
+            'duration': (self.end_ns - self.origin_ns) / 1e9,
+            'streams': [{
+                'dataset_id': s.dataset_id,
+                'label': s.label,
+                'participant_id': s.participant_id,
+                'offset_seconds': self.offset(s.start_ns),
+                'duration': (s.end_ns - s.start_ns) / 1e9,
+                'samples': s.samples
+            } for s in self.streams],
+            'videos': [{
+                'label': v.label,
+                'url': v.url,
+                'offset_seconds': self.offset(v.start_ns),
+                'duration': v.duration,
+                'frame_rate': v.frame_rate
+            } for v in self.videos]
+        }
+
+
+def _stream_window(session, stream, entry, start, end):
+    """The session window in the stream's own seconds, and its sample range"""
+    offset = session.offset(stream.start_ns)
+    local_start = None if start is None else start - offset
+    local_end = None if end is None else end - offset
+    return local_start, local_end, entry['index'].sample_range(local_start, local_end)
+
+
+def aligned_window(session, entries, start=None, end=None, max_points=4000):
+    """
+    Decimated points of every stream between start and end session seconds
+    entries are the cache entries of session.streams, in order. Each stream's
+    points come from its own LOD pyramid; times are session seconds
+    """
+    streams = []
+    for stream, entry in zip(session.streams, entries):
+        dataset = entry['dataset']
+        local_start, local_end, (lo, hi) = _stream_window(session, stream, entry, start, end)
+        level, indices = entry['lod'].query(local_start, local_end, max_points)
+        streams.append({
+            'dataset_id': stream.dataset_id,
+            'label': stream.label,
+            'level': level,
+            'seconds': ((np.asarray(dataset.epoch_ns[indices], dtype=np.int64) - session.origin_ns) / 1e9).tolist(),
+            'eda_values': dataset.values[indices].tolist(),
+            'stats': window_stats(dataset, lo, hi, entry['window_stats'])
+        })
+    return {'start': start, 'end': end, 'mode': 'lod', 'streams': streams}
+
+
+def resampled_window(session, entries, start, end, points):
+    """
+    Every stream on one grid of points cells between start and end session
+    seconds: the mean of each stream's raw samples per cell (None where a
+    stream has no samples). Cell means come from the prefix sums, so the cost is
+    points binary searches per stream whatever the sample rates
+    """
+    if end is None or start is None or end <= start:
+        raise SessionError("Resampling needs start < end")
+    edges = np.linspace(start, end, points + 1)
+    # Cell boundaries as absolute ns; cell i covers samples [bounds[i], bounds[i + 1])
+    edge_ns = session.origin_ns + np.round(edges * 1e9).astype(np.int64)
+    streams = []
+    for stream, entry in zip(session.streams, entries):
+        dataset = entry['dataset']
+        index = entry['window_stats']
+        _, _, (lo, hi) = _stream_window(session, stream, entry, start, end)
+        bounds = np.clip(dataset.epoch_ns.searchsorted(edge_ns, side='left'), lo, hi)
+        bounds[-1] = hi
+        counts = np.diff(bounds)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = (index.sums[bounds[1:]] - index.sums[bounds[:-1]]) / counts + index.shift
+        streams.append({
+            'dataset_id': stream.dataset_id,
+            'label': stream.label,
+            'eda_values': [None if n == 0 else v for v, n in zip(means.tolist(), counts.tolist())],
+            'counts': counts.tolist(),
+            'stats': window_stats(dataset, lo, hi, index)
+        })
+    return {
+        'start': start,
+        'end': end,
+        'mode': 'resample',
+        'cell_seconds': (end - start) / points,
+        'seconds': ((edges[:-1] + edges[1:]) / 2).tolist(),  # Cell centers
+        'streams': streams
+    }
+
+
+class SessionStore:
+    """In-memory sessions, the least recently used dropped beyond max_sessions"""
+
+    def __init__(self, max_sessions=100):
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, session):
+        with self._lock:
+            self._sessions[session.id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session
+
+    def get(self, session_id):
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is not None:
+                self._sessions.move_to_end(session_id)
+            return session
+
+    def discard(self, session_id):
+        with self._lock:
+            return self._sessions.pop(session_id, None)
@@ -0,0 +1,108 @@
+"""
+Window Statistics Index
+Mean/std/min/max/count for any sample window without rescanning the series
+- Prefix sums of the values and of their squares give sum, mean and variance
+  from two lookups each (O(1)); values are shifted by the series mean first so
+  the variance doesn't suffer from cancellation on long recordings
+- Min/max reuse the LOD pyramid: its power-of-two buckets are the nodes of a
+  bottom-up segment tree, so any window is covered by at most 2*log2(n) buckets
+  (O(log n), and no extra memory)
+- Built once per dataset alongside the time index and LOD levels
+"""
+
+import numpy as np
+
+CHUNK_SAMPLES = 1 << 16
+
+
+def prefix_sums(values, shift=0.0, square=False, chunk_samples=CHUNK_SAMPLES):
+    """
+    float64 running totals of (values - shift) (or its square), with a leading 0
+    so the sum over [lo, hi) is out[hi] - out[lo]. Built chunk by chunk so no
+    full-length temporary is allocated
+    """
+    n = len(values)
+    out = np.empty(n + 1)
+    out[0] = 0.0
+    for start in range(0, n, chunk_samples):
+        stop = min(start + chunk_samples, n)
+        x = np.asarray(values[start:stop], dtype=np.float64) - shift
+        if square:
+            np.square(x, out=x)
+        np.cumsum(x, out=out[start + 1:stop + 1])
+        out[start + 1:stop + 1] += out[start]
+    return out
+
+
+class WindowStatsIndex:
+    """
+    Per-dataset window statistics: prefix sums for mean/std, LOD buckets for min/max
+    Similar to a precomputed aggregate table behind a reporting query
+    """
+
+    def __init__(self, values, lod):
+        self.values = values
+        self.lod = lod
+        self.shift = float(np.mean(values)) if len(values) else 0.0
+        self.sums = prefix_sums(values, self.shift)
+        self.squares = prefix_sums(values, self.shift, square=True)
+
+    @property
+    def nbytes(self):
+        return self.sums.nbytes + self.squares.nbytes
+
+    def mean(self, lo, hi):
+        return (self.sums[hi] - self.sums[lo]) / (hi - lo) + self.shift if hi > lo else 0
+
+    def std(self, lo, hi):
+        """Sample standard deviation (ddof=1, as in the dataset stats); 0 for fewer than 2 samples"""
+        count = hi - lo
+        if count < 2:
+            return 0
+        total = self.sums[hi] - self.sums[lo]
+        variance = (self.squares[hi] - self.squares[lo] - total * total / count) / (count - 1)
+        return float(np.sqrt(max(variance, 0.0)))
+
+    def argmin(self, lo, hi):
+        """Index of the smallest sample in [lo, hi)"""
+        candidates = self._cover(lo, hi, 0)
+        return int(candidates[np.argmin(self.values[candidates])])
+
+    def argmax(self, lo, hi):
+        """Index of the largest sample in [lo, hi)"""
+        candidates = self._cover(lo, hi, 1)
+        return int(candidates[np.argmax(self.values[candidates])])
+
+    def _cover(self, lo, hi, which):
+        """
+        Min (which=0) or max (which=1) sample index of each pyramid bucket that
+        exactly tiles [lo, hi): a bottom-up segment-tree walk over the levels
+        """
+        if hi <= lo:
+            raise ValueError("Empty window")
+        levels = self.lod.levels
+        candidates = []
+        level = 0
+        while lo < hi:
+            if lo & 1:
+                candidates.append(lo if level == 0 else levels[level][which][lo])
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                candidates.append(hi if level == 0 else levels[level][which][hi])
+            lo >>= 1
+            hi >>= 1
+            level += 1
+        return np.asarray(candidates, dtype=np.int64)
+
+    def stats(self, lo, hi):
+        """Mean/std/min/max/count over the raw samples in [lo, hi)"""
+        if hi <= lo:
+            return {'mean': 0, 'std': 0, 'min': 0, 'max': 0, 'count': 0}
+        return {
+            'mean': float(self.mean(lo, hi)),
+            'std': self.std(lo, hi),
+            'min': float(self.values[self.argmin(lo, hi)]),
+            'max': float(self.values[self.argmax(lo, hi)]),
+            'count': hi - lo
+        }
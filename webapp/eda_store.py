@@ -0,0 +1,193 @@
+"""
+EDA Columnar Store
+Compact, memory-mappable on-disk format for parsed recordings
+
+Layout of a .edac file:
+    8 bytes   magic b'EDACOL1\\0'
+    8 bytes   little-endian uint64 header length
+    N bytes   UTF-8 JSON header (rows, metadata, stats, column offsets)
+    columns   raw little-endian arrays, each aligned to 64 bytes
+
+Regularly sampled recordings (e.g. Empatica) store no time column at all;
+their time axis is rebuilt arithmetically from start + i * period
+"""
+
+import json
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+from eda_ingest import EDADataset
+
+MAGIC = b'EDACOL1\0'
+STORE_SUFFIX = '.edac'
+ALIGNMENT = 64
+VALUES_DTYPE = '<f8'
+EPOCH_DTYPE = '<i8'
+
+
+class StoreError(ValueError):
+    """Raised when a store file is missing, truncated or of an unknown version"""
+
+
+class RegularTimeAxis:
+    """
+    Array-like int64 time axis for evenly sampled data: start_ns + rint(i * period_ns)
+    Indexing and searchsorted are computed on demand, so it costs no memory
+    """
+
+    def __init__(self, start_ns, period_ns, length):
+        self.start_ns = int(start_ns)
+        self.period_ns = float(period_ns)
+        self.length = int(length)
+        self.dtype = np.dtype(np.int64)
+        self.nbytes = 0
+
+    def __len__(self):
+        return self.length
+
+    @property
+    def shape(self):
+        return (self.length,)
+
+    def _at(self, i):
+        return self.start_ns + np.rint(np.asarray(i, dtype=np.float64) * self.period_ns).astype(np.int64)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return self._at(np.arange(*key.indices(self.length)))
+        key = np.asarray(key)
+        if key.dtype == bool:
+            return self._at(np.flatnonzero(key))
+        return self._at(np.where(key < 0, key + self.length, key))
+
+    def __array__(self, dtype=None, copy=None):
+        values = self[:]
+        return values if dtype is None else values.astype(dtype)
+
+    def searchsorted(self, v, side='left'):
+        """Same contract as ndarray.searchsorted, computed arithmetically in O(1)"""
+        v = np.asarray(v, dtype=np.int64)
+        if side == 'left':
+            def before(x):
+                return x < v
+        else:
+            def before(x):
+                return x <= v
+
+        last = self.length - 1
+        i = np.clip(np.ceil((v - self.start_ns) / self.period_ns), 0, self.length).astype(np.int64)
+        # rint() in _at can shift the boundary by a sample; nudge until a[i-1] < v <= a[i]
+        while True:
+            forward = (i < self.length) & before(self._at(np.minimum(i, last)))
+            back = (i > 0) & ~before(self._at(np.maximum(i - 1, 0)))
+            if not (forward.any() or back.any()):
+                break
+            i = i + forward - back
+        return i if i.ndim else int(i)
+
+
+def detect_regular_axis(epoch_ns):
+    """RegularTimeAxis equivalent to epoch_ns, or None if the sampling is irregular"""
+    n = len(epoch_ns)
+    if n < 2:
+        return None
+    period = (int(epoch_ns[-1]) - int(epoch_ns[0])) / (n - 1)
+    if period <= 0:
+        return None
+    axis = RegularTimeAxis(epoch_ns[0], period, n)
+    return axis if np.array_equal(axis[:], epoch_ns) else None
+
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_store(path, dataset, stats=None):
+    """Persist a dataset (and optionally its stats) atomically as a .edac file"""
+    regular = detect_regular_axis(dataset.epoch_ns)
+    columns = [('values', np.ascontiguousarray(dataset.values, dtype=VALUES_DTYPE))]
+    if regular is None:
+        columns.append(('epoch_ns', np.ascontiguousarray(dataset.epoch_ns, dtype=EPOCH_DTYPE)))
+
+    header = {
+        'version': 1,
+        'rows': len(dataset),
+        'participant_id': dataset.participant_id,
+        'missing': dataset.missing,
+        'stats': stats,
+        'time': ({'kind': 'regular', 'start_ns': regular.start_ns, 'period_ns': regular.period_ns}
+                 if regular is not None else {'kind': 'column'}),
+        'columns': {}
+    }
+
+    # Column offsets depend on the header length, which depends on the offsets;
+    # reserve a fixed-width header region sized for the worst case
+    header_reserve = _aligned(len(json.dumps(header, default=str)) + 256)
+    offset = _aligned(len(MAGIC) + 8 + header_reserve)
+    for name, array in columns:
+        header['columns'][name] = {'dtype': array.dtype.str, 'offset': offset, 'length': len(array)}
+        offset = _aligned(offset + array.nbytes)
+
+    header_bytes = json.dumps(header, default=str).encode('utf-8')
+    if len(header_bytes) > header_reserve:
+        raise StoreError("Store header does not fit in its reserved space")
+
+    folder = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as out:
+            out.write(MAGIC)
+            out.write(struct.pack('<Q', len(header_bytes)))
+            out.write(header_bytes)
+            for name, array in columns:
+                out.seek(header['columns'][name]['offset'])
+                out.write(array.tobytes())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return path
+
+
+def read_header(path):
+    with open(path, 'rb') as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise StoreError(f"Not an EDA store file: {path}")
+        (length,) = struct.unpack('<Q', f.read(8))
+        header = json.loads(f.read(length).decode('utf-8'))
+    if header.get('version') != 1:
+        raise StoreError(f"Unsupported store version: {header.get('version')}")
+    return header
+
+
+def open_store(path):
+    """
+    Open a .edac file as an EDADataset whose columns are np.memmap views
+    Nothing is read until a slice is touched. Returns (dataset, stats)
+    """
+    header = read_header(path)
+    rows = header['rows']
+
+    def column(name):
+        spec = header['columns'][name]
+        return np.memmap(path, dtype=np.dtype(spec['dtype']), mode='r',
+                         offset=spec['offset'], shape=(spec['length'],))
+
+    values = column('values')
+    time = header['time']
+    if time['kind'] == 'regular':
+        epoch_ns = RegularTimeAxis(time['start_ns'], time['period_ns'], rows)
+    else:
+        epoch_ns = column('epoch_ns')
+
+    dataset = EDADataset(epoch_ns, values, participant_id=header['participant_id'],
+                         missing=header['missing'])
+    return dataset, header.get('stats')
+
+
+def store_path(folder, key):
+    return os.path.join(folder, key + STORE_SUFFIX)
@@ -0,0 +1,30 @@
+"""
+Gunicorn Settings
+Production server for the EDA app: gunicorn -c gunicorn.conf.py app:app
+(from the webapp/ directory)
+- One gthread worker, scaled with EDA_THREADS: the job queue, chunked
+  uploads, live streams (and their SSE subscribers), sessions and the dataset
+  cache are in-process state, so a request routed to a second worker would
+  not find them. Keep EDA_WORKERS at 1 until that state moves out of process
+- EDA_PRELOAD_HEAVY=1 imports pandas/plotly in the master before forking
+  (warmup.preload), so the worker starts with them instead of importing them
+  on the first upload. That only moves latency to startup: with one worker
+  there are no copy-on-write pages to share
+"""
+
+import os
+
+import warmup
+
+bind = os.environ.get('EDA_BIND', '127.0.0.1:8000')
+workers = int(os.environ.get('EDA_WORKERS', 1))  # See above: state is per process
+worker_class = 'gthread'
+# Every open live-monitor event connection holds one of these threads; app.py caps
+# them at LIVE_MAX_SUBSCRIBERS (8), so keep EDA_THREADS well above that
+threads = int(os.environ.get('EDA_THREADS', 16))
+timeout = 120  # Large uploads are streamed within a request
+
+
+def on_starting(server):
+    if os.environ.get('EDA_PRELOAD_HEAVY') == '1':
+        server.log.info("Preloaded %s in the master", ', '.join(warmup.preload()))
@@ -0,0 +1,180 @@
+"""
+Background Jobs
+In-process job queue for upload processing (no external broker needed)
+- Work runs on a thread pool, so parsed datasets land in this process's cache
+- Each job records named stages with wall-clock timings as it moves along
+- Finished jobs are kept for a while so clients can poll their status and result
+- An optional on_stage(job, name, seconds) hook sees every stage timing (metrics)
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+log = logging.getLogger(__name__)
+
+
+class JobError(Exception):
+    """Raised inside a job to fail it with a user-facing message"""
+
+
+class Continuation:
+    """
+    Returned by a job function to finish later: fn(job, *args, **kwargs) is
+    queued once future is done, without holding a pool worker while waiting
+    The wait shows up as a stage named stage
+    """
+
+    def __init__(self, stage, future, fn, *args, **kwargs):
+        self.stage = stage
+        self.future = future
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+
+
+class Job:
+    """
+    Status, stage timings and result of one unit of background work
+    Stages can be recorded from any thread (request thread or pool worker)
+    """
+
+    def __init__(self, kind, on_stage=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.status = QUEUED
+        self.created = time.time()
+        self.finished = None
+        self.stage_name = None
+        self.stages = []
+        self.result = None
+        self.error = None
+        self._on_stage = on_stage
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    @contextmanager
+    def stage(self, name):
+        """Time a named stage; the current stage is visible while it runs"""
+        with self._lock:
+            self.stage_name = name
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, time.perf_counter() - start)
+
+    def _record(self, name, seconds):
+        with self._lock:
+            self.stages.append({'name': name, 'seconds': round(seconds, 4)})
+        if self._on_stage:
+            self._on_stage(self, name, seconds)
+
+    def wait(self, timeout=None):
+        """Block until the job has finished; True if it did"""
+        return self._done.wait(timeout)
+
+    def _finish(self, status, result=None, error=None):
+        with self._lock:
+            self.status = status
+            self.result = result
+            self.error = error
+            self.stage_name = None
+            self.finished = time.time()
+        self._done.set()
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'id': self.id,
+                'kind': self.kind,
+                'status': self.status,
+                'stage': self.stage_name,
+                'stages': list(self.stages),
+                'elapsed': round((self.finished or time.time()) - self.created, 4),
+                'error': self.error
+            }
+
+
+class JobQueue:
+    """
+    Thread-pool job runner with a bounded history of finished jobs
+    Similar to a hosted BackgroundService with a Channel<T> queue in ASP.NET Core
+    """
+
+    def __init__(self, max_workers=2, max_history=100, on_stage=None):
+        self.max_history = max_history
+        self.on_stage = on_stage
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='eda-job')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, kind):
+        """Register a job before its work is submitted, so stages can be recorded early"""
+        job = Job(kind, self.on_stage)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._trim()
+        return job
+
+    def submit(self, job, fn, *args, **kwargs):
+        """
+        Run fn(job, *args, **kwargs) on the pool; its return value becomes job.result
+        unless it is a Continuation, in which case the job stays running
+        """
+        def run():
+            with job._lock:
+                job.status = RUNNING
+            try:
+                result = fn(job, *args, **kwargs)
+                if isinstance(result, Continuation):
+                    self._resume_later(job, result)
+                else:
+                    job._finish(DONE, result=result)
+            except JobError as e:
+                job._finish(FAILED, error=str(e))
+            except Exception as e:
+                log.exception("Job %s (%s) failed", job.id, job.kind)
+                job._finish(FAILED, error=f"Job failed: {str(e)}")
+        return self._executor.submit(run)
+
+    def _resume_later(self, job, continuation):
+        with job._lock:
+            job.stage_name = continuation.stage
+        start = time.perf_counter()
+
+        def resume(_):
+            job._record(continuation.stage, time.perf_counter() - start)
+            self.submit(job, continuation.fn, *continuation.args, **continuation.kwargs)
+        continuation.future.add_done_callback(resume)
+
+    def discard(self, job):
+        """Forget a job that was never submitted"""
+        with self._lock:
+            self._jobs.pop(job.id, None)
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _trim(self):
+        # Drop the oldest finished jobs beyond max_history; running ones are kept
+        excess = len(self._jobs) - self.max_history
+        for job_id in [i for i, job in self._jobs.items() if job.finished][:max(0, excess)]:
+            del self._jobs[job_id]
+
+    def stats(self):
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job.status] = counts.get(job.status, 0) + 1
+            return counts
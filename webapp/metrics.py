@@ -0,0 +1,166 @@
+"""
+Metrics
+In-process counters and histograms for stage timings and payload sizes
+- Fixed-bucket histograms (Prometheus-style): observing is a bisect and a few
+  increments under a lock, cheap enough for every request and stage
+- Series are keyed by name plus labels, e.g. stage_seconds{stage="parse"}
+- Rendered as Prometheus text exposition or as JSON with bucket-estimated
+  percentiles, for the /metrics endpoint
+- Free of Flask, so service code (and batch workers) can time themselves
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+SECONDS_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+BYTES_BUCKETS = tuple(1024 * 4 ** i for i in range(11))  # 1 KB .. 1 GB
+
+HELP = {
+    'stage_seconds': 'Wall time of processing stages (parse, stats, plot, serialize, ...)',
+    'job_stage_seconds': 'Wall time of background job stages',
+    'http_request_seconds': 'Request handling time by endpoint',
+    'http_response_bytes': 'Response body size by endpoint',
+    'upload_bytes': 'Size of /upload request bodies',
+    'video_bytes_served_total': 'Video bytes sent by serve_video (full and range responses)',
+    'video_requests_total': 'serve_video responses by status code',
+    'live_samples_total': 'Samples appended to live streams',
+    'export_bytes': 'Size of streamed dataset exports by format',
+}
+
+
+class Histogram:
+    """Cumulative-bucket histogram with count and sum"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-th observation (None past the last bucket)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return None
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else None,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': {str(bound): n for bound, n in zip(self.buckets + ('+Inf',), self.counts)}
+        }
+
+
+class Registry:
+    """
+    Thread-safe store of counters and histograms
+    Similar to System.Diagnostics.Metrics (Meter/Histogram<T>) in .NET
+    """
+
+    def __init__(self):
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def observe(self, name, value, buckets=SECONDS_BUCKETS, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def count(self, name, amount=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe the wall time of a with-block into histogram name"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def snapshot(self):
+        """JSON-ready view: {name: [{'labels': {...}, ...values}]}"""
+        with self._lock:
+            out = {}
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                out.setdefault(name, []).append({'labels': dict(labels), **histogram.to_dict()})
+            for (name, labels), value in sorted(self._counters.items()):
+                out.setdefault(name, []).append({'labels': dict(labels), 'value': value})
+            return out
+
+    def render_prometheus(self, gauges=None):
+        """Prometheus text exposition (format 0.0.4); gauges is an extra {name: value}"""
+        lines = []
+        with self._lock:
+            families = {}
+            for (name, labels), histogram in self._histograms.items():
+                families.setdefault(name, ('histogram', []))[1].append((labels, histogram))
+            for (name, labels), value in self._counters.items():
+                families.setdefault(name, ('counter', []))[1].append((labels, value))
+
+            for name in sorted(families):
+                kind, series = families[name]
+                if name in HELP:
+                    lines.append(f"# HELP {name} {HELP[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, item in sorted(series, key=lambda s: s[0]):
+                    if kind == 'counter':
+                        lines.append(f"{name}{_labels(labels)} {item}")
+                        continue
+                    cumulative = 0
+                    for bound, n in zip(item.buckets + ('+Inf',), item.counts):
+                        cumulative += n
+                        lines.append(f"{name}_bucket{_labels(labels + (('le', str(bound)),))} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(labels)} {item.sum}")
+                    lines.append(f"{name}_count{_labels(labels)} {item.count}")
+
+        for name, value in sorted((gauges or {}).items()):
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (f'{k}="{str(v)}"'.replace('\\', '\\\\').replace('\n', '\\n') for k, v in labels)
+    return '{' + ','.join(escaped) + '}'
+
+
+# Process-wide registry shared by the app and the service layer
+REGISTRY = Registry()
+observe = REGISTRY.observe
+count = REGISTRY.count
+timer = REGISTRY.timer
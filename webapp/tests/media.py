@@ -0,0 +1,106 @@
+"""
+Synthetic Test Media
+Minimal MP4 and AVI files built box by box: just the headers the probe and
+faststart read, plus media chunks tagged with their index so relocated chunk
+offsets can be checked
+"""
+
+import struct
+
+import numpy as np
+
+TIMESCALE = 30000
+FRAME_TICKS = 1001  # 29.97 fps
+MARKER = b'EDACHUNK'
+
+
+def box(kind, *payload):
+    body = b''.join(payload)
+    return struct.pack('>I4s', len(body) + 8, kind) + body
+
+
+def chunk_tag(i):
+    return MARKER + struct.pack('>Q', i)
+
+
+def _trak(handler, chunk_offsets, chunk_size, co64, stts_entries):
+    count = len(chunk_offsets)
+    duration = sum(n * d for n, d in stts_entries)
+    matrix = struct.pack('>9I', 0x10000, 0, 0, 0, 0x10000, 0, 0, 0, 0x40000000)
+    tkhd = box(b'tkhd', struct.pack('>IIIIII8xHHHH', 3, 0, 0, 1, 0, duration, 0, 0, 0, 0), matrix,
+               struct.pack('>II', 1280 << 16, 720 << 16))
+    mdhd = box(b'mdhd', struct.pack('>IIIIIHH', 0, 0, 0, TIMESCALE, duration, 0x55c4, 0))
+    hdlr = box(b'hdlr', struct.pack('>II4s12x', 0, 0, handler), b'Handler\x00')
+    if handler == b'vide':
+        entry = box(b'avc1', bytes(6), struct.pack('>H16xHH', 1, 1920, 1080), bytes(50))
+    else:
+        entry = box(b'mp4a', bytes(28))
+    stsd = box(b'stsd', struct.pack('>II', 0, 1), entry)
+    stts = box(b'stts', struct.pack('>II', 0, len(stts_entries)),
+               b''.join(struct.pack('>II', n, d) for n, d in stts_entries))
+    stsc = box(b'stsc', struct.pack('>IIIII', 0, 1, 1, 1, 1))
+    stsz = box(b'stsz', struct.pack('>III', 0, chunk_size, count))
+    offsets = np.asarray(chunk_offsets, dtype='>u8' if co64 else '>u4').tobytes()
+    stco = box(b'co64' if co64 else b'stco', struct.pack('>II', 0, count), offsets)
+    minf = box(b'minf', box(b'vmhd', bytes(12)), box(b'stbl', stsd, stts, stsc, stsz, stco))
+    return box(b'trak', tkhd, box(b'mdia', mdhd, hdlr, minf))
+
+
+def moov_box(offsets, chunk_size=64, co64=False, stts_entries=None):
+    """moov with an audio track (first chunk only) and a video track over every chunk offset"""
+    stts_entries = stts_entries or [(len(offsets), FRAME_TICKS)]
+    duration = sum(n * d for n, d in stts_entries)
+    mvhd = box(b'mvhd', struct.pack('>IIIII', 0, 0, 0, TIMESCALE, duration), bytes(80))
+    audio = _trak(b'soun', offsets[:1], chunk_size, co64, [(1, duration)])
+    return box(b'moov', mvhd, audio, _trak(b'vide', offsets, chunk_size, co64, stts_entries))
+
+
+def chunk_offsets(data):
+    """Offsets in the video track's stco/co64 table (the last table in the file)"""
+    at = max(data.rfind(b'stco'), data.rfind(b'co64'))
+    (count,) = struct.unpack_from('>I', data, at + 8)
+    dtype = '>u8' if data[at:at + 4] == b'co64' else '>u4'
+    return data[at:at + 4].decode(), np.frombuffer(data, dtype=dtype, count=count, offset=at + 12).astype(np.int64)
+
+
+def write_mp4(path, chunks=50, chunk_size=64, moov_first=False, co64=False, stts_entries=None):
+    """
+    ftyp, then mdat and moov (camera layout: moov last, unless moov_first)
+    An audio track comes before the video track, whose chunks are tagged 0..chunks-1
+    Returns the video chunk offsets
+    """
+    stts_entries = stts_entries or [(chunks, FRAME_TICKS)]
+    ftyp = box(b'ftyp', b'isom', struct.pack('>I', 512), b'isomiso2avc1mp41')
+    media = b''.join(chunk_tag(i) + bytes(chunk_size - len(MARKER) - 8) for i in range(chunks))
+
+    def moov(media_start):
+        offsets = media_start + np.arange(chunks, dtype=np.int64) * chunk_size
+        return moov_box(offsets, chunk_size, co64, stts_entries), offsets
+
+    if moov_first:
+        size = len(moov(0)[0])
+        header, offsets = moov(len(ftyp) + size + 8)
+        data = ftyp + header + box(b'mdat', media)
+    else:
+        header, offsets = moov(len(ftyp) + 8)
+        data = ftyp + box(b'mdat', media) + header
+    with open(path, 'wb') as f:
+        f.write(data)
+    return offsets
+
+
+def write_avi(path, frames=300, rate=30000, scale=1001, width=640, height=480):
+    """RIFF AVI with avih, one video strh and an empty movi list"""
+    def chunk(fourcc, payload):
+        return struct.pack('<4sI', fourcc, len(payload)) + payload + (b'\0' if len(payload) & 1 else b'')
+
+    def riff_list(kind, fourcc, *chunks):
+        return chunk(kind, fourcc + b''.join(chunks))
+
+    avih = chunk(b'avih', struct.pack('<10I', round(1e6 * scale / rate), 0, 0, 0, frames, 0, 1, 0, width, height)
+                 + bytes(16))
+    strh = chunk(b'strh', b'vids' + b'MJPG' + struct.pack('<IHHIIIII', 0, 0, 0, 0, scale, rate, 0, frames)
+                 + bytes(20))
+    hdrl = riff_list(b'LIST', b'hdrl', avih, riff_list(b'LIST', b'strl', strh))
+    with open(path, 'wb') as f:
+        f.write(riff_list(b'RIFF', b'AVI ', hdrl, riff_list(b'LIST', b'movi')))
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from eda_analysis import analyze, AnalysisError, epoch_stats, sample_period_of
+from eda_store import RegularTimeAxis
+
+
+def whole_second_stamps(seconds, rate=4):
+    """4 Hz samples whose timestamps were written with one-second resolution"""
+    return np.repeat(np.arange(seconds, dtype=np.int64) * 1_000_000_000, rate)
+
+
+def test_repeated_timestamps_fall_back_to_mean_spacing():
+    epoch_ns = whole_second_stamps(600)
+    period = sample_period_of(epoch_ns)
+    # Mean spacing over the recording: 599 s over 2399 gaps, close to 0.25 s
+    assert period == pytest.approx(0.25, abs=1e-3)
+
+    values = 2.0 + 0.1 * np.sin(np.arange(len(epoch_ns)) / 40)
+    analysis = analyze(epoch_ns, values)
+    assert analysis.sample_period == period
+    assert np.isfinite(analysis.tonic).all()
+
+
+def test_single_timestamp_raises_analysis_error():
+    epoch_ns = np.full(100, 1_700_000_000_000_000_000, dtype=np.int64)
+    assert sample_period_of(epoch_ns) is None
+    with pytest.raises(AnalysisError):
+        analyze(epoch_ns, np.ones(100))
+
+
+def test_epoch_stats_on_regular_axis_matches_array():
+    axis = RegularTimeAxis(1_700_000_000_000_000_000, 250_000_000, 4 * 600)
+    values = 2.0 + 0.1 * np.sin(np.arange(len(axis)) / 40)
+    tonic = np.full(len(axis), 2.0)
+    peaks = np.array([10, 500, 2000])
+    expected = epoch_stats(np.asarray(axis), values, tonic, peaks)
+    for name, column in epoch_stats(axis, values, tonic, peaks).items():
+        np.testing.assert_array_equal(column, expected[name])
@@ -0,0 +1,69 @@
+import hashlib
+import io
+import os
+
+import pytest
+
+from chunked_upload import ChunkedUploads, ChunkError, MIN_CHUNK_SIZE
+
+
+def test_same_name_uploads_get_their_own_files(tmp_path):
+    uploads = ChunkedUploads(str(tmp_path))
+    first = uploads.create('20240101_120000_clip.mp4', 'clip.mp4', MIN_CHUNK_SIZE, chunk_size=MIN_CHUNK_SIZE)
+    second = uploads.create('20240101_120000_clip.mp4', 'clip.mp4', MIN_CHUNK_SIZE, chunk_size=MIN_CHUNK_SIZE)
+    assert first.part_path != second.part_path
+    assert first.path != second.path
+    assert second.stored_name.endswith('.mp4')
+
+    for session, byte in ((first, b'a'), (second, b'b')):
+        data = byte * MIN_CHUNK_SIZE
+        session.write_chunk(0, io.BytesIO(data), hashlib.sha256(data).hexdigest())
+    first.finalize()
+    second.finalize()
+    with open(first.path, 'rb') as f:
+        assert f.read(1) == b'a'
+    with open(second.path, 'rb') as f:
+        assert f.read(1) == b'b'
+
+
+class DiscardingStream(io.BytesIO):
+    """Chunk body during which the upload is cancelled"""
+
+    def __init__(self, data, uploads, upload_id):
+        super().__init__(data)
+        self.uploads = uploads
+        self.upload_id = upload_id
+
+    def read(self, size=-1):
+        data = super().read(size)
+        if not data:
+            self.uploads.discard(self.upload_id)
+        return data
+
+
+def test_chunk_racing_discard_does_not_restore_manifest(tmp_path):
+    uploads = ChunkedUploads(str(tmp_path))
+    session = uploads.create('clip.mp4', 'clip.mp4', MIN_CHUNK_SIZE, chunk_size=MIN_CHUNK_SIZE)
+    data = b'x' * MIN_CHUNK_SIZE
+    with pytest.raises(ChunkError):
+        session.write_chunk(0, DiscardingStream(data, uploads, session.upload_id), hashlib.sha256(data).hexdigest())
+    assert not os.path.exists(session.manifest_path)
+    assert uploads.get(session.upload_id) is None
+
+
+def test_prepare_runs_before_the_video_is_published(tmp_path):
+    uploads = ChunkedUploads(str(tmp_path))
+    session = uploads.create('clip.mp4', 'clip.mp4', MIN_CHUNK_SIZE, chunk_size=MIN_CHUNK_SIZE)
+    data = b'x' * MIN_CHUNK_SIZE
+    session.write_chunk(0, io.BytesIO(data), hashlib.sha256(data).hexdigest())
+    seen = []
+
+    def prepare(s):
+        seen.append((os.path.exists(s.part_path), os.path.exists(s.path)))
+        with open(s.part_path, 'r+b') as f:
+            f.write(b'rewritten')
+
+    session.finalize(prepare=prepare)
+    assert seen == [(True, False)]
+    with open(session.path, 'rb') as f:
+        assert f.read(9) == b'rewritten'
@@ -0,0 +1,36 @@
+import os
+import time
+
+from dataset_cache import HashingSink, PathLeases, TEMP_GRACE_SECONDS, prune_folder
+
+
+def write(path, size, age):
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+    mtime = time.time() - age
+    os.utime(path, (mtime, mtime))
+    return str(path)
+
+
+def test_prune_skips_leased_files_and_in_progress_uploads(tmp_path):
+    old = write(tmp_path / 'old.csv', 100, 300)
+    leased = write(tmp_path / 'leased.csv', 100, 200)
+    newest = write(tmp_path / 'newest.csv', 100, 0)
+    sink = HashingSink(str(tmp_path))
+    sink.write(b'y' * 100)
+    sink._out.flush()
+    stale = write(tmp_path / 'crashed.part', 100, TEMP_GRACE_SECONDS + 60)
+
+    leases = PathLeases()
+    leases.acquire(leased)
+    leases.acquire(leased)
+    leases.release(leased)
+    prune_folder(str(tmp_path), 0, keep=leases.paths() | {newest})
+
+    assert not os.path.exists(old) and not os.path.exists(stale)
+    assert os.path.exists(leased) and os.path.exists(newest)
+    digest, path = sink.close()  # Its temp file was not pruned
+    assert os.path.getsize(path) == 100
+
+    leases.release(leased)
+    assert leases.paths() == set()
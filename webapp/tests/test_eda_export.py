@@ -0,0 +1,73 @@
+import csv
+import io
+
+import numpy as np
+import pytest
+
+from eda_export import ExportError, ExportWindow, encode, export_filename
+from eda_index import TimeIndex
+from eda_ingest import EDADataset
+from eda_store import RegularTimeAxis
+
+START_NS = 1_526_304_383_000_000_000
+
+
+@pytest.fixture
+def dataset():
+    values = np.round(np.random.default_rng(0).random(4 * 600) + 1, 6)
+    return EDADataset(RegularTimeAxis(START_NS, 250_000_000, len(values)), values, participant_id='P001')
+
+
+def export(window, fmt):
+    return b''.join(encode(window, fmt))
+
+
+def test_sample_mode_csv(dataset):
+    window = ExportWindow(dataset, TimeIndex(dataset.epoch_ns), offset=100, duration=30)
+    rows = list(csv.DictReader(io.StringIO(export(window, 'csv').decode())))
+
+    lo, hi = 400, 521  # Samples at 100 s .. 130 s inclusive
+    assert len(rows) == window.rows == hi - lo
+    np.testing.assert_allclose([float(r['eda_scl_usiemens']) for r in rows], dataset.values[lo:hi])
+    np.testing.assert_allclose([float(r['video_seconds']) for r in rows], np.arange(hi - lo) * 0.25)
+    assert float(rows[0]['timestamp_unix']) == pytest.approx(START_NS / 1e6 + 100_000)
+    assert export_filename(window, 'csv') == 'P001_eda_100s-130s.csv'
+
+
+def test_frame_mode_npz_matches_nearest_and_linear_lookups(dataset):
+    index = TimeIndex(dataset.epoch_ns)
+    seconds = np.asarray(dataset.epoch_ns[:], dtype=np.int64)
+    for interpolation in ('nearest', 'linear'):
+        window = ExportWindow(dataset, index, offset=595, duration=10, frame_rate=29.97, interpolation=interpolation)
+        npz = np.load(io.BytesIO(export(window, 'npz')))
+
+        frames = np.arange(window.rows)
+        assert window.rows == 300
+        np.testing.assert_array_equal(npz['frame'], frames)
+        np.testing.assert_allclose(npz['video_seconds'], frames / 29.97)
+        target = START_NS + np.round((595 + frames / 29.97) * 1e9).astype(np.int64)
+        inside = target <= seconds[-1]
+        assert np.isnan(npz['eda_scl_usiemens'][~inside]).all()  # Past the end of the recording
+        expected = (np.interp(target[inside] - START_NS, seconds - START_NS, dataset.values) if interpolation == 'linear' else
+                    dataset.values[np.round((target[inside] - START_NS) / 250_000_000).astype(int)])
+        np.testing.assert_allclose(npz['eda_scl_usiemens'][inside], expected)
+
+
+def test_long_windows_are_streamed_in_chunks(dataset):
+    window = ExportWindow(dataset, TimeIndex(dataset.epoch_ns))
+    chunks = list(window.chunks(chunk_rows=500))
+    assert [len(c['eda_scl_usiemens']) for c in chunks] == [500] * 4 + [400]
+    npz = np.load(io.BytesIO(export(window, 'npz')))
+    np.testing.assert_array_equal(npz['eda_scl_usiemens'], dataset.values)
+
+
+@pytest.mark.parametrize('kwargs', [{'duration': 0}, {'offset': float('nan')}, {'frame_rate': 5000},
+                                    {'interpolation': 'cubic'}])
+def test_invalid_windows_are_rejected(dataset, kwargs):
+    with pytest.raises(ExportError):
+        ExportWindow(dataset, TimeIndex(dataset.epoch_ns), **kwargs)
+
+
+def test_unknown_format_is_rejected_before_any_bytes(dataset):
+    with pytest.raises(ExportError):
+        encode(ExportWindow(dataset, TimeIndex(dataset.epoch_ns)), 'xlsx')
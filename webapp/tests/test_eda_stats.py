@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+from eda_index import TimeIndex
+from eda_lod import LODPyramid
+from eda_stats import WindowStatsIndex, prefix_sums
+
+
+def build_index(values):
+    epoch_ns = 1_526_304_383_000_000_000 + np.arange(len(values), dtype=np.int64) * 250_000_000
+    return WindowStatsIndex(values, LODPyramid(values, TimeIndex(epoch_ns)))
+
+
+def windows(n, rng, count=300):
+    lo = rng.integers(0, n, count)
+    hi = np.minimum(n, lo + rng.integers(1, n + 1, count))
+    edges = [(0, n), (0, 1), (n - 1, n), (1, n - 1), (n // 2, n // 2 + 2)]
+    return [(lo, hi) for lo, hi in edges if 0 <= lo < hi <= n] + list(zip(lo.tolist(), hi.tolist()))
+
+
+@pytest.mark.parametrize('n', [1, 2, 3, 1000, 1023, 4097])
+def test_window_stats_match_a_brute_force_slice(n):
+    rng = np.random.default_rng(n)
+    # Large offset: the shifted prefix sums must not lose the variance to cancellation
+    values = 1e4 + rng.normal(0, 0.01, n)
+    values[rng.integers(0, n, max(1, n // 50))] = values.max()  # Ties: the first occurrence must not matter
+    index = build_index(values)
+
+    for lo, hi in windows(n, rng):
+        window = values[lo:hi]
+        stats = index.stats(lo, hi)
+        assert stats['count'] == hi - lo
+        assert stats['mean'] == pytest.approx(window.mean(), rel=1e-12)
+        assert stats['min'] == window.min() and stats['max'] == window.max()
+        assert lo <= index.argmin(lo, hi) < hi and lo <= index.argmax(lo, hi) < hi
+        expected_std = window.std(ddof=1) if hi - lo > 1 else 0
+        assert stats['std'] == pytest.approx(expected_std, rel=1e-6, abs=1e-12)
+
+
+def test_empty_window():
+    index = build_index(np.arange(10, dtype=np.float64))
+    assert index.stats(5, 5) == {'mean': 0, 'std': 0, 'min': 0, 'max': 0, 'count': 0}
+
+
+def test_prefix_sums_across_chunks():
+    values = np.random.default_rng(0).random(1000)
+    np.testing.assert_allclose(prefix_sums(values, 0.5, chunk_samples=64)[1:], np.cumsum(values - 0.5))
+    np.testing.assert_allclose(prefix_sums(values, square=True, chunk_samples=64)[1:], np.cumsum(values ** 2))
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from eda_ingest import EDADataset
+from eda_store import RegularTimeAxis, StoreError, open_store, read_header, store_path, write_store
+
+START_NS = 1_526_304_383_000_000_000
+
+
+def roundtrip(tmp_path, dataset, stats=None):
+    path = write_store(store_path(str(tmp_path), 'abc'), dataset, stats)
+    return path, open_store(path)
+
+
+def test_regular_recording_stores_no_time_column(tmp_path):
+    epoch_ns = START_NS + np.arange(1000, dtype=np.int64) * 250_000_000
+    values = np.random.default_rng(0).random(1000)
+    stats = {'mean': 0.5, 'count': 1000}
+    path, (dataset, loaded_stats) = roundtrip(tmp_path, EDADataset(epoch_ns, values, 'P001', missing=3), stats)
+
+    assert set(read_header(path)['columns']) == {'values'}
+    assert isinstance(dataset.epoch_ns, RegularTimeAxis)
+    np.testing.assert_array_equal(np.asarray(dataset.epoch_ns), epoch_ns)
+    assert isinstance(dataset.values, np.memmap)
+    np.testing.assert_array_equal(dataset.values, values)
+    assert (dataset.participant_id, dataset.missing, loaded_stats) == ('P001', 3, stats)
+
+
+def test_irregular_recording_keeps_its_timestamps(tmp_path):
+    epoch_ns = START_NS + np.cumsum(np.random.default_rng(1).integers(1, 10**9, 500)).astype(np.int64)
+    values = np.linspace(0, 5, 500)
+    path, (dataset, stats) = roundtrip(tmp_path, EDADataset(epoch_ns, values))
+
+    assert stats is None
+    for spec in read_header(path)['columns'].values():
+        assert spec['offset'] % 64 == 0
+    np.testing.assert_array_equal(dataset.epoch_ns, epoch_ns)
+    np.testing.assert_array_equal(dataset.values, values)
+
+
+@pytest.mark.parametrize('period_ns', [250_000_000, 1e9 / 64, 1e9 / 3])
+def test_regular_axis_searchsorted_matches_array(period_ns):
+    axis = RegularTimeAxis(START_NS, period_ns, 5000)
+    array = np.asarray(axis)
+    probes = np.concatenate([array[::7], array[::11] + 1, array[::13] - 1, [START_NS - 10, array[-1] + 10]])
+    for side in ('left', 'right'):
+        np.testing.assert_array_equal(axis.searchsorted(probes, side=side), array.searchsorted(probes, side=side))
+
+
+def test_foreign_file_is_rejected(tmp_path):
+    path = tmp_path / 'bogus.edac'
+    path.write_bytes(b'not a store')
+    with pytest.raises(StoreError):
+        open_store(str(path))
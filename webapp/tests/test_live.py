@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+
+from eda_live import EVENT_BACKLOG, LiveError, LiveRegistry, LiveStream
+
+
+@pytest.mark.parametrize('timestamps_ns', [[np.nan], [np.inf], [-1.0], [1e30]])
+def test_invalid_timestamps_are_rejected_before_anything_is_stored(timestamps_ns):
+    stream = LiveStream('Test')
+    with pytest.raises(LiveError):
+        stream.append([0.1], np.array(timestamps_ns))
+    assert stream.count == 0 and stream.first_ns is None
+
+    stream.append([0.1, 0.2], np.array([1.7e18, 1.7e18 + 2.5e8]))
+    assert stream.first_ns == 1_700_000_000_000_000_000
+
+
+def test_subscribers_are_capped_per_stream_and_in_total():
+    registry = LiveRegistry(max_subscribers=3, max_subscribers_per_stream=2)
+    first, second = registry.create('A', 4), registry.create('B', 4)
+    registry.subscribe(first)
+    registry.subscribe(first)
+    with pytest.raises(LiveError):
+        registry.subscribe(first)
+    registry.subscribe(second)
+    with pytest.raises(LiveError):
+        registry.subscribe(second)
+    registry.unsubscribe(first)
+    registry.subscribe(second)
+    assert (registry.subscribers, first.subscribers, second.subscribers) == (3, 1, 2)
+
+
+def test_appends_keep_running_stats_and_min_max_levels():
+    rng = np.random.default_rng(0)
+    stream = LiveStream('Test', rate=4)
+    batches = [rng.random(n) for n in rng.integers(1, 300, 200)]
+    for batch in batches:
+        stream.append(batch)
+    values = np.concatenate(batches)
+
+    stats = stream.stats()
+    assert stats['count'] == len(values)
+    assert stats['mean'] == pytest.approx(values.mean())
+    assert stats['std'] == pytest.approx(values.std(ddof=1))
+    assert (stats['min'], stats['max']) == (values.min(), values.max())
+    assert stats['duration'] == pytest.approx((len(values) - 1) * 0.25)
+
+    # Level k bucket b holds the extremes of samples [b * 2**k, (b + 1) * 2**k)
+    for k in (1, 4, 9):
+        ring = stream.levels[k - 1]
+        buckets = ring.ordered('bucket')
+        for b, v_min, v_max in zip(buckets, ring.ordered('v_min'), ring.ordered('v_max')):
+            chunk = values[b << k:(b + 1) << k]
+            assert (v_min, v_max) == (chunk.min(), chunk.max())
+
+
+def test_window_returns_raw_samples_then_coarser_levels():
+    stream = LiveStream('Test', rate=4)
+    values = np.sin(np.arange(20_000) / 50)
+    for start in range(0, len(values), 500):
+        stream.append(values[start:start + 500])
+
+    level, seconds, window = stream.window(seconds=10, max_points=4000)
+    assert level == 0
+    np.testing.assert_array_equal(window, values[-41:])
+    assert seconds[-1] == pytest.approx((len(values) - 1) * 0.25)
+
+    level, seconds, window = stream.window(max_points=400)
+    assert level > 0 and 0 < len(window) <= 400
+    assert min(window) == values.min() and max(window) == values.max()
+    assert seconds == sorted(seconds)
+
+
+def test_events_resume_and_reset_when_the_backlog_is_gone():
+    stream = LiveStream('Test', rate=4)
+    for _ in range(3):
+        stream.append([0.1, 0.2])
+    assert [event_id for event_id, _ in stream.events_after(1, timeout=0)] == [2, 3]
+    assert stream.events_after(3, timeout=0) == []
+
+    for _ in range(EVENT_BACKLOG + 5):
+        stream.append([0.3])
+    assert stream.events_after(1, timeout=0) is None  # Fell behind: reload the window
+    latest = stream.events_after(stream.event_id - 1, timeout=0)
+    assert [event_id for event_id, _ in latest] == [stream.event_id]
+
+    stream.close()
+    with pytest.raises(LiveError):
+        stream.append([0.1])
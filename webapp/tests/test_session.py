@@ -0,0 +1,17 @@
+import pytest
+
+from app import app
+
+
+@pytest.mark.parametrize('body', [
+    [5],
+    {'streams': [5]},
+    {'streams': {'dataset_id': 'abc'}},
+    {'streams': [{'dataset_id': 7}]},
+    {'videos': ['clip.mp4']},
+    {'videos': [{'filename': 'clip.mp4', 'start_time': 36000}]},
+])
+def test_malformed_session_bodies_are_rejected(body):
+    response = app.test_client().post('/api/sessions', json=body)
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
@@ -0,0 +1,99 @@
+import os
+import re
+
+import pytest
+from werkzeug.test import Client
+from werkzeug.wrappers import Request
+
+from video_delivery import CACHE_CONTROL, VideoCatalog, serve
+
+DATA = bytes(range(256)) * 40  # 10240 bytes
+
+
+@pytest.fixture
+def client(tmp_path):
+    (tmp_path / 'clip.mp4').write_bytes(DATA)
+    (tmp_path / 'clip.mp4.part').write_bytes(b'in progress')
+    catalog = VideoCatalog(str(tmp_path))
+
+    def wsgi(environ, start_response):
+        video = catalog.lookup(os.path.basename(environ['PATH_INFO']))
+        return serve(video, Request(environ))(environ, start_response)
+
+    client = Client(wsgi)
+    client.catalog = catalog
+    return client
+
+
+def test_full_file_with_validators(client):
+    response = client.get('/clip.mp4')
+    assert response.status_code == 200
+    assert response.get_data() == DATA
+    assert response.headers['Content-Type'] == 'video/mp4'
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    assert response.headers['Cache-Control'] == CACHE_CONTROL
+    assert response.headers['ETag'].startswith('"')
+
+
+def test_single_and_suffix_ranges(client):
+    response = client.get('/clip.mp4', headers={'Range': 'bytes=100-199'})
+    assert response.status_code == 206
+    assert response.headers['Content-Range'] == f'bytes 100-199/{len(DATA)}'
+    assert response.get_data() == DATA[100:200]
+
+    response = client.get('/clip.mp4', headers={'Range': 'bytes=-50'})
+    assert response.get_data() == DATA[-50:]
+    response = client.get('/clip.mp4', headers={'Range': 'bytes=10000-'})
+    assert response.get_data() == DATA[10000:]
+
+
+def test_unsatisfiable_range(client):
+    response = client.get('/clip.mp4', headers={'Range': f'bytes={len(DATA)}-'})
+    assert response.status_code == 416
+    assert response.headers['Content-Range'] == f'bytes */{len(DATA)}'
+
+
+def test_ranges_covering_the_whole_file_get_a_plain_200(client):
+    response = client.get('/clip.mp4', headers={'Range': f'bytes=0-99,100-{len(DATA) - 1}'})
+    assert response.status_code == 200 and response.get_data() == DATA
+
+
+def test_multiple_ranges_are_merged_into_multipart_byteranges(client):
+    response = client.get('/clip.mp4', headers={'Range': 'bytes=0-9,10-19,500-599,9000-9099'})
+    assert response.status_code == 206
+    boundary = re.search(r'boundary=(\w+)', response.headers['Content-Type']).group(1)
+    body = response.get_data()
+    assert len(body) == response.content_length
+
+    parts = body.split(f'--{boundary}'.encode())[1:-1]
+    expected = [(0, 20), (500, 600), (9000, 9100)]  # Adjacent 0-9 and 10-19 are merged
+    assert len(parts) == len(expected)
+    for part, (start, stop) in zip(parts, expected):
+        head, payload = part.split(b'\r\n\r\n', 1)
+        assert f'Content-Range: bytes {start}-{stop - 1}/{len(DATA)}'.encode() in head
+        assert payload[:-2] == DATA[start:stop]  # Minus the CRLF before the next boundary
+    assert body.endswith(f'--{boundary}--\r\n'.encode())
+
+
+def test_if_range_only_honours_the_current_etag(client):
+    etag = client.get('/clip.mp4').headers['ETag']
+    response = client.get('/clip.mp4', headers={'Range': 'bytes=0-9', 'If-Range': etag})
+    assert response.status_code == 206 and response.get_data() == DATA[:10]
+
+    response = client.get('/clip.mp4', headers={'Range': 'bytes=0-9', 'If-Range': '"stale"'})
+    assert response.status_code == 200 and response.get_data() == DATA
+
+
+def test_conditional_and_head_requests(client):
+    etag = client.get('/clip.mp4').headers['ETag']
+    response = client.get('/clip.mp4', headers={'If-None-Match': etag})
+    assert response.status_code == 304 and response.get_data() == b''
+
+    response = client.head('/clip.mp4', headers={'Range': 'bytes=0-99'})
+    assert response.status_code == 206
+    assert response.content_length == 100 and response.get_data() == b''
+
+
+def test_files_still_being_written_are_not_served(client):
+    assert client.catalog.lookup('clip.mp4.part') is None
+    assert client.catalog.lookup('../clip.mp4') is None
@@ -0,0 +1,58 @@
+import os
+
+import numpy as np
+import pytest
+
+from media import chunk_offsets, chunk_tag, moov_box, write_mp4
+from video_faststart import MAX_STCO_OFFSET, faststart, moov_layout, relocated_moov
+from video_probe import probe_video
+
+
+def assert_chunks_in_place(path, expected_kind):
+    with open(path, 'rb') as f:
+        data = f.read()
+    kind, offsets = chunk_offsets(data)
+    assert kind == expected_kind
+    for i, offset in enumerate(offsets):
+        assert data[offset:offset + 16] == chunk_tag(i)
+
+
+@pytest.mark.parametrize('co64', [False, True])
+def test_faststart_moves_moov_and_keeps_chunk_offsets(tmp_path, co64):
+    path = str(tmp_path / 'camera.mp4')
+    write_mp4(path, chunks=200, co64=co64)
+    before = probe_video(path)
+    size = os.path.getsize(path)
+    assert moov_layout(path) is not None
+
+    assert faststart(path) is True
+    assert moov_layout(path) is None
+    assert os.path.getsize(path) == size
+    after = probe_video(path)
+    assert {k: after[k] for k in ('duration', 'frame_count', 'frame_rate', 'sample_table')} == \
+        {k: before[k] for k in ('duration', 'frame_count', 'frame_rate', 'sample_table')}
+    assert_chunks_in_place(path, 'co64' if co64 else 'stco')
+    assert not os.path.exists(path + '.faststart.tmp')
+
+
+def test_already_faststart_file_is_untouched(tmp_path):
+    path = str(tmp_path / 'web.mp4')
+    write_mp4(path, moov_first=True)
+    with open(path, 'rb') as f:
+        original = f.read()
+    assert faststart(path) is False
+    with open(path, 'rb') as f:
+        assert f.read() == original
+    assert_chunks_in_place(path, 'stco')
+
+
+def test_stco_that_would_overflow_is_widened_to_co64():
+    offsets = MAX_STCO_OFFSET - 1000 + np.arange(4, dtype=np.int64) * 64
+    moov = moov_box(offsets)
+    media_start = 40
+    moov_start = int(offsets[-1]) + 64
+    new_moov = relocated_moov(moov, moov_start, moov_start + len(moov), media_start)
+
+    kind, moved = chunk_offsets(new_moov)
+    assert kind == 'co64'
+    np.testing.assert_array_equal(moved, offsets + len(new_moov))
@@ -0,0 +1,52 @@
+import pytest
+
+from media import FRAME_TICKS, TIMESCALE, write_avi, write_mp4
+from video_probe import ProbeError, probe_video
+
+
+@pytest.mark.parametrize('moov_first', [False, True])
+def test_mp4_timing_comes_from_the_video_track(tmp_path, moov_first):
+    path = str(tmp_path / 'clip.mp4')
+    write_mp4(path, chunks=300, moov_first=moov_first)
+    probe = probe_video(path)
+
+    assert probe['container'] == 'mp4'
+    assert probe['codec'] == 'avc1'
+    assert (probe['width'], probe['height']) == (1920, 1080)
+    assert probe['frame_count'] == 300
+    assert probe['frame_rate'] == pytest.approx(TIMESCALE / FRAME_TICKS)
+    assert probe['duration'] == pytest.approx(300 * FRAME_TICKS / TIMESCALE)
+    assert probe['sample_table'] == [[300, FRAME_TICKS]]
+
+
+def test_variable_frame_rate_is_averaged(tmp_path):
+    path = str(tmp_path / 'vfr.mp4')
+    write_mp4(path, chunks=30, stts_entries=[(10, 1000), (20, 500)])
+    probe = probe_video(path)
+    assert probe['frame_count'] == 30
+    assert probe['frame_rate'] == pytest.approx(30 * TIMESCALE / 20000)
+
+
+def test_avi_timing_comes_from_the_video_stream_header(tmp_path):
+    path = str(tmp_path / 'clip.avi')
+    write_avi(path, frames=900)
+    probe = probe_video(path)
+    assert probe['container'] == 'avi'
+    assert probe['codec'] == 'MJPG'
+    assert (probe['width'], probe['height']) == (640, 480)
+    assert probe['frame_count'] == 900
+    assert probe['frame_rate'] == pytest.approx(30000 / 1001)
+    assert probe['duration'] == pytest.approx(900 * 1001 / 30000)
+
+
+def test_truncated_and_foreign_files_are_rejected(tmp_path):
+    path = tmp_path / 'clip.mp4'
+    write_mp4(str(path))
+    path.write_bytes(path.read_bytes()[:-40])
+    with pytest.raises(ProbeError):
+        probe_video(str(path))
+
+    other = tmp_path / 'notes.mp4'
+    other.write_bytes(b'plain text, not a video')
+    with pytest.raises(ProbeError):
+        probe_video(str(other))
@@ -0,0 +1,55 @@
+import gzip
+import struct
+
+import numpy as np
+import pytest
+
+from wire_format import DELTA, MAGIC, RAW, compress, decode_frame, encode_frame
+
+
+def test_frame_round_trip():
+    rng = np.random.default_rng(0)
+    indices = np.sort(rng.choice(10**6, 4000, replace=False)).astype(np.uint32)
+    values = rng.random(4000).astype(np.float32)
+    seconds = rng.random(3)
+    meta = {'level': 3, 'stats': {'mean': 1.5}, 'label': 'µS'}
+    decoded_meta, columns = decode_frame(encode_frame(meta, [
+        ('indices', indices, DELTA), ('eda_values', values, RAW), ('seconds', seconds, RAW),
+        ('empty', np.array([], dtype=np.uint32), DELTA)
+    ]))
+
+    assert decoded_meta == meta
+    np.testing.assert_array_equal(columns['indices'], indices)
+    assert columns['indices'].dtype == np.uint32
+    np.testing.assert_array_equal(columns['eda_values'], values)
+    np.testing.assert_array_equal(columns['seconds'], seconds)
+    assert len(columns['empty']) == 0
+
+
+def test_columns_are_aligned_for_typed_array_views():
+    frame = encode_frame({'x': 'odd-length header'}, [('a', np.arange(3, dtype=np.uint8), RAW),
+                                                       ('b', np.arange(5, dtype=np.float64), RAW)])
+    assert frame[:4] == MAGIC
+    (length,) = struct.unpack('<I', frame[4:8])
+    _, columns = decode_frame(frame)
+    for column in columns.values():
+        offset = column.__array_interface__['data'][0] - np.frombuffer(frame, np.uint8).__array_interface__['data'][0]
+        assert offset % 8 == 0 and offset >= 8 + length
+
+
+def test_big_endian_input_is_sent_little_endian():
+    values = np.arange(4, dtype='>f8')
+    _, columns = decode_frame(encode_frame({}, [('v', values, RAW)]))
+    np.testing.assert_array_equal(columns['v'], values)
+
+
+def test_compress_only_when_accepted():
+    frame = encode_frame({}, [('v', np.zeros(1000), RAW)])
+    body, encoding = compress(frame, 'gzip, deflate')
+    assert encoding == 'gzip' and gzip.decompress(body) == frame
+    assert compress(frame, None) == (frame, None)
+
+
+def test_foreign_bytes_are_rejected():
+    with pytest.raises(ValueError):
+        decode_frame(b'{"json": true}')
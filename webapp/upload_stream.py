@@ -0,0 +1,102 @@
+"""
+Upload Streaming
+Incremental multipart/form-data reader for large uploads
+- File parts are handed to sinks chunk by chunk as the request body arrives,
+  instead of being buffered into temporary files first
+- A part's sink is closed as soon as that part ends, so processing of an early
+  part (the CSV) can start while a later part (the video) is still streaming
+"""
+
+import os
+
+from werkzeug.http import parse_options_header
+from werkzeug.sansio.multipart import Data, Epilogue, Field, File, MultipartDecoder, NeedData
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+MAX_FIELD_BYTES = 64 * 1024  # Plain form fields are small (e.g. video_start_time)
+PART_SUFFIX = '.part'
+
+
+class UploadError(ValueError):
+    """Raised when the request body is not a complete multipart form"""
+
+
+class FileSink:
+    """
+    Plain file target for a streamed part
+    Written to <path>.part and renamed into place on close, so a file under
+    its final name is always complete (videos are served as immutable)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._part_path = path + PART_SUFFIX
+        self._out = open(self._part_path, 'wb')
+
+    def write(self, chunk):
+        self._out.write(chunk)
+
+    def close(self):
+        self._out.close()
+        os.replace(self._part_path, self.path)
+        return self.path
+
+    def abort(self):
+        self._out.close()
+        if os.path.exists(self._part_path):
+            os.remove(self._part_path)
+
+
+def stream_multipart(stream, content_type, open_file, on_file_complete=None, chunk_size=CHUNK_SIZE):
+    """
+    Feed a multipart body through werkzeug's decoder without buffering whole parts
+    open_file(name, filename) returns a sink with write/close/abort, or None to
+    skip the part. on_file_complete(name, sink) runs right after a sink is closed.
+    Returns the plain form fields as a dict
+    """
+    mimetype, options = parse_options_header(content_type or '')
+    boundary = options.get('boundary')
+    if mimetype != 'multipart/form-data' or not boundary:
+        raise UploadError("Expected a multipart/form-data upload")
+
+    decoder = MultipartDecoder(boundary.encode('latin-1'))
+    fields = {}
+    part_name = None
+    sink = None
+    field_data = None
+
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            decoder.receive_data(chunk or None)  # None marks the end of the body
+            event = decoder.next_event()
+            while not isinstance(event, (NeedData, Epilogue)):
+                if isinstance(event, File):
+                    part_name, field_data = event.name, None
+                    sink = open_file(event.name, event.filename)
+                elif isinstance(event, Field):
+                    part_name, field_data, sink = event.name, bytearray(), None
+                elif isinstance(event, Data):
+                    if field_data is not None:
+                        field_data += event.data
+                        if len(field_data) > MAX_FIELD_BYTES:
+                            raise UploadError(f"Form field '{part_name}' is too large")
+                    elif sink is not None:
+                        sink.write(event.data)
+                    if not event.more_data:
+                        if field_data is not None:
+                            fields[part_name] = field_data.decode('utf-8', 'replace')
+                        elif sink is not None:
+                            completed, sink = sink, None
+                            completed.close()
+                            if on_file_complete:
+                                on_file_complete(part_name, completed)
+                event = decoder.next_event()
+            if isinstance(event, Epilogue):
+                return fields
+            if not chunk:
+                raise UploadError("Upload ended before the form data was complete")
+    except BaseException:
+        if sink is not None:
+            sink.abort()
+        raise
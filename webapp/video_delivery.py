@@ -0,0 +1,233 @@
+"""
+Video Delivery
+Range-request serving for uploaded videos, tuned for scrubbing
+- Uploaded videos never change under their name (timestamped names, published
+  by atomic rename), so responses carry a strong ETag and are cached as immutable
+- stat results and MIME types are kept per file and only re-checked after
+  STAT_TTL_SECONDS, so a burst of range requests costs no filesystem lookups
+- A byte range is handed to the WSGI server's file wrapper positioned at its
+  start: sendfile-capable servers (gunicorn, uWSGI) copy it kernel-side with
+  os.sendfile; others read it in BLOCK_SIZE blocks
+- Multi-range requests get one multipart/byteranges response; HEAD and 304s
+  never open the file
+"""
+
+import os
+import stat
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from werkzeug.http import http_date
+from werkzeug.wrappers import Response
+from werkzeug.wsgi import wrap_file
+
+STAT_TTL_SECONDS = 2.0
+MAX_CACHED_FILES = 1024
+BLOCK_SIZE = 256 * 1024
+MAX_RANGES = 16  # Requests with more (coalesced) ranges get the whole file
+CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+MIME_TYPES = {
+    'mp4': 'video/mp4',
+    'webm': 'video/webm',
+    'ogg': 'video/ogg',
+    'avi': 'video/x-msvideo',
+    'mov': 'video/quicktime'
+}
+
+# Files still being written next to the published videos
+IN_PROGRESS_SUFFIXES = ('.part', '.tmp', '.upload.json')
+
+
+class VideoFile:
+    """Cached stat result, validators and MIME type of one published video"""
+
+    def __init__(self, path, st):
+        self.path = path
+        self.size = st.st_size
+        self.mtime = int(st.st_mtime)
+        # Strong: a new file under the same name (new inode/size/mtime) never matches
+        self.etag = f"{st.st_ino:x}-{st.st_size:x}-{st.st_mtime_ns:x}"
+        self.last_modified = http_date(self.mtime)
+        ext = path.rsplit('.', 1)[1].lower() if '.' in os.path.basename(path) else ''
+        self.mimetype = MIME_TYPES.get(ext, 'application/octet-stream')
+        self.checked = time.monotonic()
+
+
+class VideoCatalog:
+    """
+    Per-folder LRU of VideoFile entries, re-validated with os.stat after ttl seconds
+    Similar to the PhysicalFileProvider behind UseStaticFiles in ASP.NET Core
+    """
+
+    def __init__(self, folder, ttl=STAT_TTL_SECONDS, max_files=MAX_CACHED_FILES):
+        self.folder = folder
+        self.ttl = ttl
+        self.max_files = max_files
+        self._files = OrderedDict()
+        self._lock = threading.Lock()
+
+    def lookup(self, filename):
+        """VideoFile for filename, or None if it doesn't exist or is still being written"""
+        if filename.startswith('.') or filename.endswith(IN_PROGRESS_SUFFIXES) or os.sep in filename:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            video = self._files.get(filename)
+            if video is not None and now - video.checked < self.ttl:
+                self._files.move_to_end(filename)
+                return video
+
+        path = os.path.join(self.folder, filename)
+        try:
+            st = os.stat(path)
+        except OSError:
+            st = None
+        with self._lock:
+            if st is None or not stat.S_ISREG(st.st_mode):
+                self._files.pop(filename, None)
+                return None
+            video = VideoFile(path, st)
+            self._files[filename] = video
+            self._files.move_to_end(filename)
+            while len(self._files) > self.max_files:
+                self._files.popitem(last=False)
+            return video
+
+
+class _RangeReader:
+    """
+    File object limited to [start, start + length)
+    fileno() is positioned at start, so a sendfile-capable file wrapper sends
+    Content-Length bytes from there without reading them into Python
+    """
+
+    def __init__(self, path, start, length):
+        self._file = open(path, 'rb')
+        self._file.seek(start)
+        self.remaining = length
+
+    def fileno(self):
+        return self._file.fileno()
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        data = self._file.read(self.remaining if size < 0 else min(size, self.remaining))
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self._file.close()
+
+
+def resolve_ranges(byte_range, size):
+    """
+    Absolute (start, stop) pairs for a parsed Range header, sorted and with
+    overlapping/adjacent ranges merged; [] if none of them is satisfiable
+    """
+    spans = []
+    for start, stop in byte_range.ranges:
+        if start < 0:  # Suffix range: the last -start bytes
+            start, stop = max(size + start, 0), size
+        else:
+            stop = size if stop is None else min(stop, size)
+        if start < stop:
+            spans.append((start, stop))
+    spans.sort()
+    merged = []
+    for start, stop in spans:
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], stop))
+        else:
+            merged.append((start, stop))
+    return merged
+
+
+def _multipart_parts(video, spans, boundary):
+    """Part headers for a multipart/byteranges body, and its total length"""
+    headers = [(f"\r\n--{boundary}\r\nContent-Type: {video.mimetype}\r\n"
+                f"Content-Range: bytes {start}-{stop - 1}/{video.size}\r\n\r\n").encode('latin-1')
+               for start, stop in spans]
+    closing = f"\r\n--{boundary}--\r\n".encode('latin-1')
+    length = sum(len(h) for h in headers) + sum(stop - start for start, stop in spans) + len(closing)
+    return headers, closing, length
+
+
+def _multipart_body(video, spans, headers, closing, block_size):
+    fd = os.open(video.path, os.O_RDONLY)
+    try:
+        for header, (start, stop) in zip(headers, spans):
+            yield header
+            while start < stop:
+                block = os.pread(fd, min(block_size, stop - start), start)
+                if not block:
+                    return  # File shrank underneath us; the client sees a short body
+                start += len(block)
+                yield block
+        yield closing
+    finally:
+        os.close(fd)
+
+
+def _is_fresh(video, request):
+    """True if the client's cached copy is current (If-None-Match, else If-Modified-Since)"""
+    if request.if_none_match:
+        return request.if_none_match.contains(video.etag) or request.if_none_match.star_tag
+    since = request.if_modified_since
+    return since is not None and video.mtime <= int(since.timestamp())
+
+
+def _range_applies(video, request):
+    """If-Range: ranges only apply to the representation the client already holds part of"""
+    if_range = request.if_range
+    if if_range.etag is not None:
+        return if_range.etag == video.etag
+    if if_range.date is not None:
+        return video.mtime <= int(if_range.date.timestamp())
+    return True
+
+
+def serve(video, request, block_size=BLOCK_SIZE):
+    """
+    Response for a GET/HEAD of video: 200, 206 (single or multipart ranges),
+    304 for a cached copy or 416 for an unsatisfiable range
+    """
+    headers = {
+        'Accept-Ranges': 'bytes',
+        'ETag': f'"{video.etag}"',
+        'Last-Modified': video.last_modified,
+        'Cache-Control': CACHE_CONTROL
+    }
+    if _is_fresh(video, request):
+        return Response(status=304, headers=headers)
+
+    head = request.method == 'HEAD'
+    spans = None
+    if request.range is not None and request.range.units == 'bytes' and _range_applies(video, request):
+        spans = resolve_ranges(request.range, video.size)
+        if not spans:
+            headers['Content-Range'] = f"bytes */{video.size}"
+            return Response(status=416, headers=headers)
+        if len(spans) > MAX_RANGES or sum(stop - start for start, stop in spans) >= video.size:
+            spans = None  # Cheaper to send the file once than many overlapping pieces
+
+    if spans is not None and len(spans) > 1:
+        boundary = uuid.uuid4().hex
+        part_headers, closing, length = _multipart_parts(video, spans, boundary)
+        body = None if head else _multipart_body(video, spans, part_headers, closing, block_size)
+        response = Response(body, status=206, headers=headers,
+                            content_type=f"multipart/byteranges; boundary={boundary}", direct_passthrough=True)
+        response.content_length = length
+        return response
+
+    start, stop = spans[0] if spans else (0, video.size)
+    if spans:
+        headers['Content-Range'] = f"bytes {start}-{stop - 1}/{video.size}"
+    body = None if head else wrap_file(request.environ, _RangeReader(video.path, start, stop - start), block_size)
+    response = Response(body, status=206 if spans else 200, headers=headers, content_type=video.mimetype,
+                        direct_passthrough=True)
+    response.content_length = stop - start
+    return response
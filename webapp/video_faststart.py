@@ -0,0 +1,194 @@
+"""
+Video Faststart
+Moves an MP4/MOV's moov box ahead of its media data, in pure Python (no ffmpeg)
+- Camera exports often write moov last, so the browser has to fetch the end of
+  the file (or all of it) before it can show a frame or seek to the synced position
+- The file is rewritten as [leading boxes][moov][media][trailing boxes]; every
+  chunk offset (stco/co64) into moved media is shifted by the new moov size,
+  and 32-bit stco tables that would overflow are widened to co64
+- Media bytes are copied kernel-side with os.copy_file_range where available,
+  otherwise streamed in COPY_BUFFER_SIZE blocks; the result replaces the
+  original by rename, so the published name never shows a half-written file
+- Files that already start with moov, fragmented files and other containers
+  are left untouched
+"""
+
+import os
+import struct
+
+import numpy as np
+
+from video_probe import MAX_HEADER_BYTES, ProbeError, _children, _top_level_boxes
+
+FASTSTART_EXTENSIONS = {'mp4', 'mov', 'm4v'}
+COPY_BUFFER_SIZE = 4 * 1024 * 1024
+TMP_SUFFIX = '.faststart.tmp'
+CONTAINER_BOXES = {'moov', 'trak', 'mdia', 'minf', 'stbl'}  # Path from moov down to the chunk offset tables
+MAX_STCO_OFFSET = 0xFFFFFFFF
+
+
+def supports(path):
+    """True for the containers faststart can rewrite (by extension)"""
+    return path.rsplit('.', 1)[-1].lower() in FASTSTART_EXTENSIONS
+
+
+def moov_layout(path):
+    """
+    (moov_start, moov_end, media_start) if moov comes after the first mdat,
+    or None if the file is already faststart (or fragmented)
+    """
+    size = os.path.getsize(path)
+    media_start = None
+    with open(path, 'rb') as f:
+        start = 0
+        for kind, _, box_end in _top_level_boxes(f, size):
+            if kind == 'moof':
+                return None  # Fragmented: playable as it streams
+            if kind == 'mdat' and media_start is None:
+                media_start = start
+            if kind == 'moov':
+                return (start, box_end, media_start) if media_start is not None else None
+            start = box_end
+    raise ProbeError("No moov box found (incomplete or fragmented-only file)")
+
+
+def _parse(data, start, end):
+    """[(type, children or payload bytes)], descending only into CONTAINER_BOXES"""
+    boxes = []
+    for kind, payload, box_end in _children(data, start, end):
+        if kind in CONTAINER_BOXES:
+            boxes.append((kind, _parse(data, payload, box_end)))
+        else:
+            boxes.append((kind, bytes(data[payload:box_end])))
+    return boxes
+
+
+def _serialize(kind, body):
+    payload = b''.join(_serialize(*child) for child in body) if isinstance(body, list) else body
+    size = len(payload) + 8
+    if size > 0xFFFFFFFF:
+        return struct.pack('>I4sQ', 1, kind.encode('latin-1'), size + 8) + payload
+    return struct.pack('>I4s', size, kind.encode('latin-1')) + payload
+
+
+def _chunk_tables(boxes):
+    """(parent list, index) of every stco/co64 box below boxes"""
+    for i, (kind, body) in enumerate(boxes):
+        if isinstance(body, list):
+            yield from _chunk_tables(body)
+        elif kind in ('stco', 'co64'):
+            yield boxes, i
+
+
+def _offsets(kind, payload):
+    (count,) = struct.unpack_from('>I', payload, 4)
+    width = 8 if kind == 'co64' else 4
+    if 8 + width * count > len(payload):
+        raise ProbeError(f"Corrupt {kind} box")
+    return np.frombuffer(payload, dtype='>u8' if width == 8 else '>u4', count=count, offset=8).astype(np.int64)
+
+
+def relocated_moov(moov, moov_start, moov_end, media_start):
+    """
+    moov box bytes for its new position at media_start: chunk offsets into
+    [media_start, moov_start) move by the new moov size, offsets past the old
+    moov by the change in its size
+    """
+    tree = _parse(moov, 0, len(moov))
+    if len(tree) != 1 or tree[0][0] != 'moov':
+        raise ProbeError("Expected a single moov box")
+    boxes = tree[0][1]
+    if any(kind == 'cmov' for kind, _ in boxes):
+        raise ProbeError("Compressed moov (cmov) is not supported")
+
+    tables = []
+    for parent, i in _chunk_tables(boxes):
+        kind, payload = parent[i]
+        tables.append((parent, i, payload[:4], _offsets(kind, payload), kind == 'co64'))
+
+    wide = [is_wide for *_, is_wide in tables]
+    while True:
+        # Widening a table grows moov, which grows the shift; repeat until stable
+        for (parent, i, version_flags, offsets, _), is_wide in zip(tables, wide):
+            dtype, kind = ('>u8', 'co64') if is_wide else ('>u4', 'stco')
+            parent[i] = (kind, version_flags + struct.pack('>I', len(offsets)) + offsets.astype(dtype).tobytes())
+        new_moov = _serialize('moov', boxes)
+
+        growth = len(new_moov) - (moov_end - moov_start)
+        moved = []
+        for parent, i, version_flags, offsets, _ in tables:
+            shifted = offsets.copy()
+            shifted[(offsets >= media_start) & (offsets < moov_start)] += len(new_moov)
+            shifted[offsets >= moov_end] += growth
+            moved.append(shifted)
+        overflow = [not is_wide and len(m) and int(m.max()) > MAX_STCO_OFFSET for m, is_wide in zip(moved, wide)]
+        if not any(overflow):
+            break
+        wide = [is_wide or over for is_wide, over in zip(wide, overflow)]
+
+    for (parent, i, version_flags, _, _), shifted, is_wide in zip(tables, moved, wide):
+        dtype, kind = ('>u8', 'co64') if is_wide else ('>u4', 'stco')
+        parent[i] = (kind, version_flags + struct.pack('>I', len(shifted)) + shifted.astype(dtype).tobytes())
+    return _serialize('moov', boxes)
+
+
+def _write_all(fd, data):
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _copy_range(src_fd, dst_fd, start, stop):
+    """Append src bytes [start, stop) to dst: in the kernel if possible, else in blocks"""
+    offset = start
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while offset < stop:
+                copied = os.copy_file_range(src_fd, dst_fd, min(stop - offset, 1 << 30), offset)
+                if not copied:
+                    break
+                offset += copied
+        except OSError:
+            pass  # Unsupported by this kernel/filesystem; finish in user space
+    while offset < stop:
+        block = os.pread(src_fd, min(COPY_BUFFER_SIZE, stop - offset), offset)
+        if not block:
+            raise ProbeError("File shrank while being rewritten")
+        _write_all(dst_fd, block)
+        offset += len(block)
+
+
+def faststart(path):
+    """
+    Rewrite path in place with moov ahead of the media data
+    Returns True if the file was rewritten, False if it already was faststart
+    """
+    layout = moov_layout(path)
+    if layout is None:
+        return False
+    moov_start, moov_end, media_start = layout
+    if moov_end - moov_start > MAX_HEADER_BYTES:
+        raise ProbeError("moov box is implausibly large")
+
+    size = os.path.getsize(path)
+    tmp_path = path + TMP_SUFFIX
+    src = os.open(path, os.O_RDONLY)
+    try:
+        moov = os.pread(src, moov_end - moov_start, moov_start)
+        new_moov = relocated_moov(moov, moov_start, moov_end, media_start)
+        dst = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            _copy_range(src, dst, 0, media_start)
+            _write_all(dst, new_moov)
+            _copy_range(src, dst, media_start, moov_start)
+            _copy_range(src, dst, moov_end, size)
+        finally:
+            os.close(dst)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    finally:
+        os.close(src)
+    return True
@@ -0,0 +1,279 @@
+"""
+Video Probe
+Duration and frame timing straight from container headers, in pure Python
+- MP4/MOV: walks the box tree, seeking past mdat, and reads mvhd plus the
+  video track's mdhd/tkhd/stsd/stts
+- AVI: reads the hdrl list (avih, the video strh, and dmlh for OpenDML files)
+- Only header bytes are read, so probing a multi-GB recording costs a few reads
+- Results are cached per (path, size, mtime)
+"""
+
+import os
+import struct
+from functools import lru_cache
+
+MAX_HEADER_BYTES = 64 * 1024 * 1024  # moov/hdrl larger than this is treated as corrupt
+PROBE_CACHE_SIZE = 256
+
+
+class ProbeError(ValueError):
+    """Raised when a file is not a supported container or its headers are damaged"""
+
+
+def probe_video(path):
+    """
+    Container metadata for a video file:
+    container, duration (s), frame_rate, frame_count, width, height, codec,
+    and the sample table: [[sample_count, sample_delta], ...] in timescale units
+    """
+    st = os.stat(path)
+    try:
+        # Shallow copy so callers can't alter the cached entry's fields
+        return dict(_probe_cached(os.path.abspath(path), st.st_size, st.st_mtime_ns))
+    except struct.error as e:
+        raise ProbeError(f"Damaged container headers: {e}") from e
+
+
+@lru_cache(maxsize=PROBE_CACHE_SIZE)
+def _probe_cached(path, size, mtime_ns):
+    with open(path, 'rb') as f:
+        magic = f.read(12)
+        if magic[:4] == b'RIFF' and magic[8:12] == b'AVI ':
+            return _probe_avi(f, size)
+        if magic[4:8] in (b'ftyp', b'moov', b'mdat', b'free', b'wide', b'skip'):
+            return _probe_isobmff(f, size)
+    raise ProbeError("Unsupported video container (expected MP4, MOV or AVI)")
+
+
+# ========== MP4 / MOV (ISO base media) ==========
+
+def _box_header(data, pos, end):
+    """(type, payload_start, box_end) for the box at pos in a bytes-like object"""
+    if pos + 8 > end:
+        raise ProbeError("Truncated box header")
+    size, kind = struct.unpack_from('>I4s', data, pos)
+    header = 8
+    if size == 1:
+        (size,) = struct.unpack_from('>Q', data, pos + 8)
+        header = 16
+    elif size == 0:
+        size = end - pos  # Box runs to the end of its parent
+    if size < header or pos + size > end:
+        raise ProbeError(f"Corrupt '{kind.decode('latin-1')}' box")
+    return kind.decode('latin-1'), pos + header, pos + size
+
+
+def _children(data, start, end):
+    pos = start
+    while pos + 8 <= end:
+        kind, payload, box_end = _box_header(data, pos, end)
+        yield kind, payload, box_end
+        pos = box_end
+
+
+def _child(data, start, end, kind):
+    for child_kind, payload, box_end in _children(data, start, end):
+        if child_kind == kind:
+            return payload, box_end
+    return None
+
+
+def _top_level_boxes(f, file_size):
+    """Top-level boxes as (type, payload_offset, box_end), seeking past each payload"""
+    pos = 0
+    while pos + 8 <= file_size:
+        f.seek(pos)
+        header = f.read(16)
+        kind, payload, box_end = _box_header(header + bytes(16 - len(header)), 0, file_size - pos)
+        yield kind, pos + payload, pos + box_end
+        pos += box_end
+
+
+def _full_box_times(data, pos):
+    """(timescale, duration) from an mvhd/mdhd payload"""
+    version = data[pos]
+    if version == 1:
+        return struct.unpack_from('>IQ', data, pos + 20)
+    return struct.unpack_from('>II', data, pos + 12)
+
+
+def _probe_isobmff(f, file_size):
+    brand = None
+    moov = None
+    for kind, payload, box_end in _top_level_boxes(f, file_size):
+        if kind == 'ftyp':
+            f.seek(payload)
+            brand = f.read(4)
+        elif kind == 'moov':
+            if box_end - payload > MAX_HEADER_BYTES:
+                raise ProbeError("moov box is implausibly large")
+            f.seek(payload)
+            moov = f.read(box_end - payload)
+            break
+    if moov is None:
+        raise ProbeError("No moov box found (incomplete or fragmented-only file)")
+    end = len(moov)
+
+    mvhd = _child(moov, 0, end, 'mvhd')
+    if mvhd is None:
+        raise ProbeError("No mvhd box found")
+    movie_timescale, movie_duration = _full_box_times(moov, mvhd[0])
+
+    # Fragmented files carry the overall duration in mvex/mehd
+    mvex = _child(moov, 0, end, 'mvex')
+    mehd = mvex and _child(moov, mvex[0], mvex[1], 'mehd')
+    if not movie_duration and mehd:
+        version = moov[mehd[0]]
+        (movie_duration,) = struct.unpack_from('>Q' if version == 1 else '>I', moov, mehd[0] + 4)
+
+    info = {
+        'container': 'mov' if brand in (None, b'qt  ') else 'mp4',
+        'duration': movie_duration / movie_timescale if movie_timescale else None,
+        'frame_rate': None,
+        'frame_count': None,
+        'width': None,
+        'height': None,
+        'codec': None,
+        'timescale': None,
+        'sample_table': []
+    }
+
+    track = _video_track(moov, end)
+    if track is not None:
+        info.update(track)
+        if not info['duration'] and track['media_duration']:
+            info['duration'] = track['media_duration']
+    info.pop('media_duration', None)
+    return info
+
+
+def _video_track(moov, end):
+    """Timing of the first video track, or None for audio-only files"""
+    for kind, trak, trak_end in _children(moov, 0, end):
+        if kind != 'trak':
+            continue
+        mdia = _child(moov, trak, trak_end, 'mdia')
+        hdlr = mdia and _child(moov, mdia[0], mdia[1], 'hdlr')
+        if not hdlr or moov[hdlr[0] + 8:hdlr[0] + 12] != b'vide':
+            continue
+
+        mdhd = _child(moov, mdia[0], mdia[1], 'mdhd')
+        timescale, media_duration = _full_box_times(moov, mdhd[0]) if mdhd else (None, 0)
+        minf = _child(moov, mdia[0], mdia[1], 'minf')
+        stbl = minf and _child(moov, minf[0], minf[1], 'stbl')
+
+        sample_table = []
+        codec = None
+        width = height = None
+        if stbl:
+            stts = _child(moov, stbl[0], stbl[1], 'stts')
+            if stts:
+                (count,) = struct.unpack_from('>I', moov, stts[0] + 4)
+                if stts[0] + 8 + 8 * count > stts[1]:
+                    raise ProbeError("Corrupt stts box")
+                entries = struct.unpack_from(f'>{2 * count}I', moov, stts[0] + 8)
+                sample_table = [[entries[i], entries[i + 1]] for i in range(0, len(entries), 2)]
+            stsd = _child(moov, stbl[0], stbl[1], 'stsd')
+            if stsd and stsd[0] + 8 + 36 <= stsd[1]:
+                entry = stsd[0] + 8  # Skip version/flags and entry count
+                codec = moov[entry + 4:entry + 8].decode('latin-1')
+                width, height = struct.unpack_from('>HH', moov, entry + 32)
+
+        if not width:
+            tkhd = _child(moov, trak, trak_end, 'tkhd')
+            if tkhd:
+                w, h = struct.unpack_from('>II', moov, tkhd[1] - 8)
+                width, height = w >> 16, h >> 16
+
+        frame_count = sum(c for c, _ in sample_table) or None
+        total_ticks = sum(c * d for c, d in sample_table)
+        if not timescale:
+            frame_rate = None
+        elif len(sample_table) == 1 and sample_table[0][1]:
+            frame_rate = timescale / sample_table[0][1]  # Constant frame rate: exact
+        elif frame_count and total_ticks:
+            frame_rate = frame_count * timescale / total_ticks  # Variable: average
+        else:
+            frame_rate = None
+
+        return {
+            'frame_rate': frame_rate,
+            'frame_count': frame_count,
+            'width': width,
+            'height': height,
+            'codec': codec,
+            'timescale': timescale,
+            'sample_table': sample_table,
+            'media_duration': media_duration / timescale if timescale else None
+        }
+    return None
+
+
+# ========== AVI (RIFF) ==========
+
+def _riff_chunks(data, start, end):
+    """(fourcc, payload_start, payload_end, list_type) for chunks in a RIFF buffer"""
+    pos = start
+    while pos + 8 <= end:
+        fourcc, size = struct.unpack_from('<4sI', data, pos)
+        payload = pos + 8
+        if payload + size > end:
+            raise ProbeError("Truncated RIFF chunk")
+        list_type = data[payload:payload + 4] if fourcc in (b'LIST', b'RIFF') else None
+        yield fourcc, payload, payload + size, list_type
+        pos = payload + size + (size & 1)  # Chunks are padded to even sizes
+
+
+def _probe_avi(f, file_size):
+    # hdrl is the first LIST after the 12-byte RIFF header; read just that list
+    f.seek(12)
+    header = f.read(12)
+    if len(header) < 12 or header[:4] != b'LIST' or header[8:12] != b'hdrl':
+        raise ProbeError("AVI file has no hdrl list")
+    (size,) = struct.unpack_from('<I', header, 4)
+    if size > MAX_HEADER_BYTES:
+        raise ProbeError("hdrl list is implausibly large")
+    hdrl = header[8:12] + f.read(size - 4)
+    end = len(hdrl)
+
+    avih = None
+    video = None
+    total_frames = None
+    for fourcc, payload, chunk_end, list_type in _riff_chunks(hdrl, 4, end):
+        if fourcc == b'avih' and chunk_end - payload >= 40:
+            avih = struct.unpack_from('<10I', hdrl, payload)
+        elif fourcc == b'LIST' and list_type == b'strl' and video is None:
+            for sub, sub_payload, sub_end, _ in _riff_chunks(hdrl, payload + 4, chunk_end):
+                if sub == b'strh' and sub_end - sub_payload >= 36 and hdrl[sub_payload:sub_payload + 4] == b'vids':
+                    handler = hdrl[sub_payload + 4:sub_payload + 8]
+                    scale, rate, start, length = struct.unpack_from('<4I', hdrl, sub_payload + 20)
+                    video = {'codec': handler.decode('latin-1'), 'scale': scale, 'rate': rate, 'length': length}
+        elif fourcc == b'LIST' and list_type == b'odml':
+            for sub, sub_payload, sub_end, _ in _riff_chunks(hdrl, payload + 4, chunk_end):
+                if sub == b'dmlh' and sub_end - sub_payload >= 4:
+                    (total_frames,) = struct.unpack_from('<I', hdrl, sub_payload)
+    if avih is None:
+        raise ProbeError("AVI file has no avih header")
+
+    micro_sec_per_frame, _, _, _, avih_frames, _, _, _, width, height = avih
+    if video and video['scale'] and video['rate']:
+        # OpenDML files (>1 GB) count frames beyond the first RIFF in dmlh
+        frame_count = max(video['length'], total_frames or 0)
+        timescale, delta = video['rate'], video['scale']
+    elif micro_sec_per_frame:
+        frame_count = total_frames or avih_frames
+        timescale, delta = 1_000_000, micro_sec_per_frame
+    else:
+        raise ProbeError("AVI headers carry no frame timing")
+
+    return {
+        'container': 'avi',
+        'duration': frame_count * delta / timescale,
+        'frame_rate': timescale / delta,
+        'frame_count': frame_count,
+        'width': width,
+        'height': height,
+        'codec': video['codec'] if video else None,
+        'timescale': timescale,
+        'sample_table': [[frame_count, delta]]
+    }
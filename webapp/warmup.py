@@ -0,0 +1,27 @@
+"""
+Warm-up
+The heavy third-party modules request handlers import lazily, and a way to
+load them ahead of time
+- app.py and eda_ingest import pandas and plotly on first use, so a worker
+  that only serves pages, videos and health checks never pays for them
+- preload() imports them up front (gunicorn.conf.py with EDA_PRELOAD_HEAVY=1,
+  in the master before the single worker is forked): the import cost moves
+  from the first upload to server startup; memory is the same either way
+"""
+
+import importlib
+import sys
+
+HEAVY_MODULES = ('numpy', 'pandas', 'plotly.io')
+
+
+def preload(modules=HEAVY_MODULES):
+    """Import modules now; returns their names"""
+    for name in modules:
+        importlib.import_module(name)
+    return list(modules)
+
+
+def loaded(modules=HEAVY_MODULES):
+    """Which of modules this process has imported so far"""
+    return [name for name in modules if name in sys.modules]
@@ -0,0 +1,91 @@
+"""
+EDA Wire Format
+Compact binary response frames for sample data
+- Metadata travels as a small JSON header
+- Sample columns travel as raw little-endian typed-array buffers that the
+  browser wraps directly in Float32Array/Float64Array/Uint32Array views
+- Sorted integer columns can be delta-encoded so gzip squeezes them further
+
+Frame layout:
+    4 bytes   magic b'EDAW'
+    4 bytes   little-endian uint32 header length
+    N bytes   UTF-8 JSON header ({'meta': ..., 'columns': [...]})
+    columns   raw buffers, each aligned to 8 bytes from the start of the frame
+"""
+
+import gzip
+import json
+import struct
+
+import numpy as np
+
+MAGIC = b'EDAW'
+ALIGNMENT = 8
+CONTENT_TYPE = 'application/x-eda-frame'
+GZIP_LEVEL = 6
+
+# Encodings a column may carry; the client must undo them in this order
+RAW = 'raw'
+DELTA = 'delta'  # Stored as first value followed by successive differences
+
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def encode_frame(meta, columns):
+    """
+    Pack JSON metadata and named columns into one binary frame
+    columns is a list of (name, ndarray, encoding) tuples
+    """
+    specs = []
+    buffers = []
+    for name, array, encoding in columns:
+        array = np.asarray(array)
+        if encoding == DELTA:
+            array = np.diff(array, prepend=array.dtype.type(0)) if len(array) else array
+        array = np.ascontiguousarray(array, dtype=array.dtype.newbyteorder('<'))
+        specs.append({'name': name, 'dtype': array.dtype.str[1:], 'length': len(array),
+                      'encoding': encoding})
+        buffers.append(array)
+
+    # Offsets depend on the header size, so lay the header out twice
+    header = {'meta': meta, 'columns': specs}
+    for _ in range(2):
+        offset = _aligned(len(MAGIC) + 4 + len(json.dumps(header, default=str).encode('utf-8')))
+        for spec, array in zip(specs, buffers):
+            spec['offset'] = offset
+            offset = _aligned(offset + array.nbytes)
+    header_bytes = json.dumps(header, default=str).encode('utf-8')
+
+    frame = bytearray(offset)
+    frame[:len(MAGIC)] = MAGIC
+    frame[len(MAGIC):len(MAGIC) + 4] = struct.pack('<I', len(header_bytes))
+    frame[len(MAGIC) + 4:len(MAGIC) + 4 + len(header_bytes)] = header_bytes
+    for spec, array in zip(specs, buffers):
+        frame[spec['offset']:spec['offset'] + array.nbytes] = array.tobytes()
+    return bytes(frame)
+
+
+def decode_frame(frame):
+    """Inverse of encode_frame: returns (meta, {name: ndarray})"""
+    if frame[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not an EDA wire frame")
+    (length,) = struct.unpack('<I', frame[len(MAGIC):len(MAGIC) + 4])
+    header = json.loads(frame[len(MAGIC) + 4:len(MAGIC) + 4 + length].decode('utf-8'))
+
+    columns = {}
+    for spec in header['columns']:
+        array = np.frombuffer(frame, dtype='<' + spec['dtype'], count=spec['length'],
+                              offset=spec['offset'])
+        if spec['encoding'] == DELTA:
+            array = np.cumsum(array, dtype=array.dtype)
+        columns[spec['name']] = array
+    return header['meta'], columns
+
+
+def compress(frame, accept_encoding):
+    """gzip a frame when the client advertises support; returns (body, content_encoding)"""
+    if 'gzip' in (accept_encoding or ''):
+        return gzip.compress(frame, compresslevel=GZIP_LEVEL), 'gzip'
+    return frame, None